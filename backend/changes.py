@@ -0,0 +1,90 @@
+"""Row-level change feed behind /api/changes.
+
+Incremental ingests stamp each run, step and transition they write with the
+generation of their commit and log the IDs of rows they delete as
+tombstones, so a client holding data as of generation N fetches only what
+changed since.  Rows a full rebuild writes keep stamp 0: the rebuild raises
+the delta floor to its own generation instead, and a since_generation below
+the floor gets reset=True (refetch everything).  Tombstones older than
+CHANGES_RETENTION_GENERATIONS are pruned, raising the floor the same way.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import ColumnElement, delete, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from backend import config
+from backend.database import begin_snapshot
+from backend.generation import current_generation, delta_floor, set_delta_floor
+from backend.models import Run, Step, Tombstone, Transition
+
+# Tombstone.entity -> model, in response order
+ENTITIES = {"run": Run, "step": Step, "transition": Transition}
+_ENTITY_NAMES = {model: name for name, model in ENTITIES.items()}
+
+
+def record_tombstones(
+    session: Session, model: type, where: ColumnElement[bool], generation: int
+) -> None:
+    """Log the rows of model matching where as deleted at generation.
+
+    Call before deleting them; one INSERT ... SELECT, no rows loaded.
+    """
+    rows = select(literal(_ENTITY_NAMES[model]), model.id, literal(generation)).where(where)
+    session.execute(
+        insert(Tombstone).from_select(["entity", "row_id", "generation"], rows)
+    )
+
+
+def stamp_rows(
+    session: Session, model: type, where: ColumnElement[bool], generation: int
+) -> None:
+    """Mark the rows of model matching where as written at generation."""
+    session.execute(update(model).where(where).values(generation=generation))
+
+
+def prune_tombstones(
+    session: Session,
+    generation: int,
+    retention: int = config.CHANGES_RETENTION_GENERATIONS,
+) -> None:
+    """Drop tombstones more than retention generations old and raise the floor."""
+    horizon = generation - retention
+    if horizon > delta_floor(session):
+        session.execute(delete(Tombstone).where(Tombstone.generation <= horizon))
+        set_delta_floor(session, horizon)
+
+
+def changes_since(db: Session, since: int) -> dict:
+    """Rows written or deleted after generation since, read from one snapshot.
+
+    Deleted IDs exclude rows that exist again (SQLite may reuse a deleted
+    transition's ID), so a client can apply the two lists in any order.
+    """
+    begin_snapshot(db)
+    generation = current_generation(db)
+    result: dict = {
+        "generation": generation,
+        "reset": not delta_floor(db) <= since <= generation,
+        **{f"{name}s": [] for name in ENTITIES},
+        "deleted": {f"{name}s": [] for name in ENTITIES},
+    }
+    if result["reset"] or since == generation:
+        return result
+
+    live: dict[str, set[int]] = {}
+    for name, model in ENTITIES.items():
+        rows = db.query(model).filter(model.generation > since).order_by(model.id).all()
+        result[f"{name}s"] = rows
+        live[name] = {row.id for row in rows}
+    tombstones = db.execute(
+        select(Tombstone.entity, Tombstone.row_id)
+        .where(Tombstone.generation > since)
+        .order_by(Tombstone.row_id)
+        .distinct()
+    )
+    for entity, row_id in tombstones:
+        if row_id not in live[entity]:
+            result["deleted"][f"{entity}s"].append(row_id)
+    return result
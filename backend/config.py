@@ -11,6 +11,23 @@ HOST: str = os.environ.get("HOST", "127.0.0.1")
 PORT: int = int(os.environ.get("PORT", "8000"))
 CORS_ORIGINS: list[str] = os.environ.get("CORS_ORIGINS", "http://localhost:5173").split(",")
 
+# Worker processes IngestWatcher uses for log parsing (0 = one per CPU)
+INGEST_JOBS: int = int(os.environ.get("INGEST_JOBS", "1")) or (os.cpu_count() or 1)
+
+# Byte budget for the in-process cache of serialized /api/stats responses
+STATS_CACHE_MAX_BYTES: int = int(os.environ.get("STATS_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+# Generations of deletions /api/changes keeps; older since_generation values get reset
+CHANGES_RETENTION_GENERATIONS: int = int(os.environ.get("CHANGES_RETENTION_GENERATIONS", "1000"))
+
+# SQLite connection tuning, applied as PRAGMAs on every new connection
+SQLITE_JOURNAL_MODE: str = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS: str = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE: int = int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB: int = int(os.environ.get("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_TEMP_STORE: str = os.environ.get("SQLITE_TEMP_STORE", "MEMORY")
+SQLITE_BUSY_TIMEOUT_MS: int = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
 # Derived from ORDER_DIR — available when ORDER_DIR is set
 EVENTS_FILE: str | None = os.environ.get(
     "EVENTS_FILE",
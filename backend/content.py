@@ -0,0 +1,112 @@
+"""Dispatch content: content-addressed storage and on-demand serving.
+
+Dispatch text is stored once per SHA-256 in dispatch_blobs, zlib-compressed;
+transitions carry only the hash and UTF-8 length.  The text is fetched from
+/api/transitions/{id}/dispatch, which honours single byte ranges and sends
+the stored zlib stream as-is to clients that accept deflate (gzip otherwise).
+The hash doubles as the ETag.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import re
+import zlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Bodies smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = 1024
+
+ZLIB_LEVEL = 6
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def content_digest(text: Optional[str]) -> tuple[Optional[int], Optional[str]]:
+    """(UTF-8 length, SHA-256 hex) of text, or (None, None) without content."""
+    if text is None:
+        return None, None
+    data = text.encode("utf-8")
+    return len(data), hashlib.sha256(data).hexdigest()
+
+
+def compress_content(text: str) -> bytes:
+    """dispatch_blobs.data for text (DispatchBlob.text reverses it)."""
+    return zlib.compress(text.encode("utf-8"), ZLIB_LEVEL)
+
+
+def etag_matches(header: Optional[str], tag: str) -> bool:
+    """If-None-Match check: weak comparison against any listed tag, or *."""
+    if not header:
+        return False
+    candidates = {t.strip().removeprefix("W/") for t in header.split(",")}
+    return "*" in candidates or tag in candidates
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """Inclusive (start, end) for a single-range header.
+
+    None means serve the whole body: no header, or a form we don't handle
+    (multiple ranges, other units).  Raises ValueError if unsatisfiable.
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    if size == 0:
+        raise ValueError("empty body")
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        n = int(last)
+        if n == 0:
+            raise ValueError("empty suffix range")
+        return max(size - n, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or (last and int(last) < start):
+        raise ValueError("range not satisfiable")
+    return start, end
+
+
+def content_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    media_type: str,
+    deflated: Optional[bytes] = None,
+) -> Response:
+    """Serve body honouring If-None-Match, Range and Accept-Encoding.
+
+    deflated, if given, is body as a zlib stream (HTTP's "deflate" coding)
+    and is sent without recompressing.
+    """
+    tag = f'"{etag}"'
+    headers = {"ETag": tag, "Accept-Ranges": "bytes", "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), tag):
+        return Response(status_code=304, headers=headers)
+
+    size = len(body)
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except ValueError:
+        headers["Content-Range"] = f"bytes */{size}"
+        return Response(status_code=416, headers=headers)
+    if byte_range is not None:
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return Response(body[start:end + 1], status_code=206, media_type=media_type, headers=headers)
+
+    accepted = request.headers.get("accept-encoding", "")
+    if size >= COMPRESS_MIN_BYTES:
+        if deflated is not None and "deflate" in accepted:
+            headers["Content-Encoding"] = "deflate"
+            body = deflated
+        elif "gzip" in accepted:
+            headers["Content-Encoding"] = "gzip"
+            body = gzip.compress(body, compresslevel=ZLIB_LEVEL)
+    return Response(body, media_type=media_type, headers=headers)
@@ -1,25 +1,89 @@
+import os
+import sqlite3
 from pathlib import Path
+from urllib.parse import quote
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
+from backend import config
 from backend.config import DB_PATH
+from backend.migrations import run_migrations
 
 
 class Base(DeclarativeBase):
     pass
 
 
-def make_engine(db_path: Path | str = DB_PATH):
-    return create_engine(f"sqlite:///{db_path}", echo=False)
+# Applied to every pooled connection, in order (busy_timeout first so the
+# journal_mode switch waits on a held lock instead of failing).
+WRITER_PRAGMAS: dict[str, object] = {
+    "busy_timeout": config.SQLITE_BUSY_TIMEOUT_MS,
+    "journal_mode": config.SQLITE_JOURNAL_MODE,
+    "synchronous": config.SQLITE_SYNCHRONOUS,
+    "mmap_size": config.SQLITE_MMAP_SIZE,
+    "cache_size": -config.SQLITE_CACHE_SIZE_KB,  # negative = KiB, not pages
+    "temp_store": config.SQLITE_TEMP_STORE,
+}
 
+# A mode=ro connection can't change the journal mode and never commits
+READER_PRAGMAS: dict[str, object] = {
+    k: v for k, v in WRITER_PRAGMAS.items() if k not in ("journal_mode", "synchronous")
+}
 
+
+def make_engine(
+    db_path: Path | str = DB_PATH,
+    *,
+    read_only: bool = False,
+    pragmas: dict[str, object] | None = None,
+):
+    """Create a SQLite engine whose connections are tuned via PRAGMAs.
+
+    read_only opens the file through a mode=ro URI, so connections can never
+    take the write lock.  pragmas overrides the default per-connection set.
+    """
+    if read_only:
+        url = f"sqlite:///file:{quote(Path(db_path).as_posix())}?mode=ro&uri=true"
+    else:
+        url = f"sqlite:///{db_path}"
+    eng = create_engine(url, echo=False)
+
+    if pragmas is None:
+        pragmas = READER_PRAGMAS if read_only else WRITER_PRAGMAS
+
+    @event.listens_for(eng, "connect")
+    def _apply_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return eng
+
+
+# Writes (ingest, create_tables) go through engine; API requests read
+# through read_engine so they never contend for the write lock.
 engine = make_engine()
 SessionLocal = sessionmaker(bind=engine)
 
+read_engine = make_engine(read_only=True)
+ReadSessionLocal = sessionmaker(bind=read_engine)
+
+
+def begin_snapshot(db: Session) -> None:
+    """Read every following statement from one snapshot, until the session ends.
+
+    pysqlite runs SELECTs outside a transaction, so consecutive statements
+    could otherwise straddle an ingest commit.
+    """
+    raw = db.connection().connection.driver_connection
+    if not raw.in_transaction:
+        raw.execute("BEGIN")
+
 
 def get_db():
-    db = SessionLocal()
+    db = ReadSessionLocal()
     try:
         yield db
     finally:
@@ -27,4 +91,45 @@ def get_db():
 
 
 def create_tables(eng=None):
-    Base.metadata.create_all(bind=eng or engine)
+    """Create missing tables, then bring existing ones up to date."""
+    eng = eng or engine
+    Base.metadata.create_all(bind=eng)
+    run_migrations(eng)
+
+
+def is_wal(db_path: Path | str) -> bool:
+    """True if the database file header says it is in WAL mode."""
+    try:
+        with open(db_path, "rb") as f:
+            header = f.read(20)
+    except OSError:
+        return False
+    return len(header) == 20 and header[18] == 2 and header[19] == 2
+
+
+def swap_database(built_path: Path, db_path: Path | str = DB_PATH, eng=None) -> None:
+    """Replace the contents of db_path with a fully built database file.
+
+    A rollback-journal DB is swapped by an atomic rename: connections already
+    open keep reading the old file until they close.  Renaming is not safe in
+    WAL mode (old connections still own db_path's -wal/-shm files), so a WAL
+    DB is instead overwritten in one write transaction with the backup API;
+    open readers keep their snapshot until their transaction ends.  Either
+    way the writer and reader pools are disposed afterwards.
+    """
+    eng = eng or engine
+    if is_wal(db_path):
+        src = sqlite3.connect(built_path)
+        raw = eng.raw_connection()
+        try:
+            src.backup(raw.driver_connection)
+        finally:
+            raw.close()
+            src.close()
+        os.unlink(built_path)
+    else:
+        with open(built_path, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(built_path, db_path)
+    eng.dispose()
+    read_engine.dispose()
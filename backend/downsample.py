@@ -0,0 +1,71 @@
+"""Shape-preserving downsampling for chart series.
+
+Largest-Triangle-Three-Buckets (Steinarsson, 2013): the first and last
+points are kept, the rest are split into equal buckets and from each bucket
+the point forming the largest triangle with the previously kept point and
+the next bucket's average is kept.  Peaks and dips survive where uniform
+striding would skip them.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> list[int]:
+    """Indices of at most threshold points that best keep the series' shape.
+
+    xs must be non-decreasing.  Returns every index when the series already
+    fits, and just the endpoints when threshold < 3.
+    """
+    n = len(xs)
+    if threshold >= n:
+        return list(range(n))
+    if threshold <= 0:
+        return []
+    if threshold < 3:
+        return [0, n - 1][:threshold]
+
+    kept = [0]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = sum(xs[end:next_end]) / (next_end - end)
+        avg_y = sum(ys[end:next_end]) / (next_end - end)
+
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    kept.append(n - 1)
+    return kept
+
+
+def downsample(
+    xs: Sequence[float],
+    ys: Sequence[float],
+    max_points: int,
+    keep: Iterable[int] = (),
+) -> list[int]:
+    """Sorted indices of at most max_points points, always including keep.
+
+    The keep indices use up the budget first; LTTB picks the rest from the
+    other points.  If keep alone exceeds max_points it is returned whole.
+    """
+    keep = set(keep)
+    if len(xs) <= max_points:
+        return list(range(len(xs)))
+
+    others = [i for i in range(len(xs)) if i not in keep]
+    picked = lttb(
+        [xs[i] for i in others], [ys[i] for i in others], max(max_points - len(keep), 0)
+    )
+    return sorted(keep | {others[j] for j in picked})
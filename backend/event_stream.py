@@ -1,6 +1,7 @@
 """Live event streaming for PEACE observability.
 
-Tails ORDER's events.jsonl file and broadcasts new events to SSE clients.
+Tails ORDER's events.jsonl file and broadcasts new events to SSE clients,
+along with the API's own data_changed events after each ingest commit.
 """
 
 from __future__ import annotations
@@ -9,20 +10,44 @@ import asyncio
 import json
 import logging
 from pathlib import Path
-from typing import AsyncIterator, Optional
+from typing import AsyncIterator, Iterable, Optional
 
 logger = logging.getLogger(__name__)
 
+DATA_CHANGED = "data_changed"
+
+
+def data_changed_event(
+    generation: int,
+    run_ids: Optional[Iterable[int]],
+    step_numbers: Optional[Iterable[int]],
+) -> dict:
+    """Event telling clients which cached API data an ingest commit made stale.
+
+    runs/steps list the changed run IDs and step numbers, or are null when
+    any may have changed.  Stats aggregate over everything and always do.
+    Unlike ORDER events it has no seq: it is not replayed on reconnect, so
+    clients refetch everything when they reconnect instead.
+    """
+    return {
+        "type": DATA_CHANGED,
+        "generation": generation,
+        "runs": sorted(run_ids) if run_ids is not None else None,
+        "steps": sorted(step_numbers) if step_numbers is not None else None,
+        "stats": True,
+    }
+
 
 class EventBroadcaster:
     """Fan-out broadcaster for SSE clients.
 
     Maintains a ring buffer of recent events for reconnection replay
-    and a list of subscriber queues for live delivery.
+    and the subscriber queues for live delivery, each with the event types
+    it wants (None for all).
     """
 
     def __init__(self, buffer_size: int = 200) -> None:
-        self._subscribers: list[asyncio.Queue[dict]] = []
+        self._subscribers: dict[asyncio.Queue[dict], Optional[frozenset[str]]] = {}
         self._last_event_id: int = 0
         self._recent_events: list[dict] = []
         self._buffer_size = buffer_size
@@ -39,22 +64,30 @@ class EventBroadcaster:
     def recent_event_count(self) -> int:
         return len(self._recent_events)
 
-    def subscribe(self, last_event_id: Optional[int] = None) -> asyncio.Queue[dict]:
-        """Create a new subscriber queue, replaying missed events if requested."""
+    def subscribe(
+        self,
+        last_event_id: Optional[int] = None,
+        event_types: Optional[Iterable[str]] = None,
+    ) -> asyncio.Queue[dict]:
+        """Create a new subscriber queue, replaying missed events if requested.
+
+        event_types, if given, limits the queue to events of those types.
+        """
         queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=256)
+        types = frozenset(event_types) if event_types is not None else None
         if last_event_id is not None:
             for event in self._recent_events:
-                if event.get("seq", 0) > last_event_id:
+                if event.get("seq", 0) > last_event_id and _wanted(event, types):
                     try:
                         queue.put_nowait(event)
                     except asyncio.QueueFull:
                         break
-        self._subscribers.append(queue)
+        self._subscribers[queue] = types
         return queue
 
     def unsubscribe(self, queue: asyncio.Queue[dict]) -> None:
         """Remove a subscriber queue."""
-        self._subscribers = [q for q in self._subscribers if q is not queue]
+        self._subscribers.pop(queue, None)
 
     async def publish(self, event: dict) -> None:
         """Broadcast an event to all subscribers."""
@@ -62,18 +95,26 @@ class EventBroadcaster:
         if isinstance(seq, int) and seq > self._last_event_id:
             self._last_event_id = seq
 
-        self._recent_events.append(event)
-        if len(self._recent_events) > self._buffer_size:
-            self._recent_events = self._recent_events[-self._buffer_size :]
+        # Only sequenced (ORDER) events can be replayed
+        if "seq" in event:
+            self._recent_events.append(event)
+            if len(self._recent_events) > self._buffer_size:
+                self._recent_events = self._recent_events[-self._buffer_size :]
 
         dead_queues: list[asyncio.Queue[dict]] = []
-        for queue in self._subscribers:
+        for queue, types in self._subscribers.items():
+            if not _wanted(event, types):
+                continue
             try:
                 queue.put_nowait(event)
             except asyncio.QueueFull:
                 dead_queues.append(queue)
         for q in dead_queues:
-            self._subscribers.remove(q)
+            del self._subscribers[q]
+
+
+def _wanted(event: dict, types: Optional[frozenset[str]]) -> bool:
+    return types is None or event.get("type") in types
 
 
 # Module-level singleton
@@ -160,6 +201,8 @@ async def event_stream_generator(
     """Generate SSE frames from a subscriber queue.
 
     Yields SSE-formatted strings. Sends keepalive comments on timeout.
+    Events without a seq get no id line, so they leave the client's
+    Last-Event-ID alone.
     """
     try:
         while True:
@@ -168,9 +211,11 @@ async def event_stream_generator(
             try:
                 event = await asyncio.wait_for(queue.get(), timeout=keepalive_secs)
                 event_type = event.get("type", "message")
-                seq = event.get("seq", 0)
                 data = json.dumps(event)
-                yield f"id: {seq}\nevent: {event_type}\ndata: {data}\n\n"
+                if "seq" in event:
+                    yield f"id: {event['seq']}\nevent: {event_type}\ndata: {data}\n\n"
+                else:
+                    yield f"event: {event_type}\ndata: {data}\n\n"
             except asyncio.TimeoutError:
                 yield ": keepalive\n\n"
     except asyncio.CancelledError:
@@ -0,0 +1,70 @@
+"""Ingest generation: a counter bumped by every ingest commit.
+
+Data only changes when an ingest commits, so the generation identifies the
+state of every read endpoint at once and their ETags derive from it.  A
+client revalidating with If-None-Match costs one primary-key read until the
+next ingest.  The counter lives in the database rather than in process
+memory so a CLI ingest, or a rebuilt database swapped in, is seen too.
+
+Generations only order the states of one database file: the CLI deletes the
+file and starts again from 1.  Each file therefore also carries a random
+database_id, and current_version() returns the pair that ETags and cached
+responses are keyed by.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from backend.models import IngestGeneration
+
+_ROW_ID = 1
+
+
+def current_generation(session: Session) -> int:
+    """The last committed generation, 0 before the first ingest."""
+    value = session.execute(
+        select(IngestGeneration.generation).where(IngestGeneration.id == _ROW_ID)
+    ).scalar()
+    return value or 0
+
+
+def current_version(session: Session) -> tuple[str, int]:
+    """The database's id and its last committed generation, in one read."""
+    row = session.execute(
+        select(IngestGeneration.database_id, IngestGeneration.generation)
+        .where(IngestGeneration.id == _ROW_ID)
+    ).first()
+    if row is None:
+        return "", 0
+    return row.database_id or "", row.generation or 0
+
+
+def _upsert(session: Session, **values: int) -> None:
+    stmt = sqlite_insert(IngestGeneration).values(id=_ROW_ID, **values)
+    session.execute(stmt.on_conflict_do_update(index_elements=[IngestGeneration.id], set_=values))
+
+
+def set_generation(session: Session, generation: int) -> None:
+    _upsert(session, generation=generation)
+
+
+def bump_generation(session: Session) -> int:
+    """Advance the generation in the session's transaction; commit publishes it."""
+    generation = current_generation(session) + 1
+    set_generation(session, generation)
+    return generation
+
+
+def delta_floor(session: Session) -> int:
+    """Oldest generation /api/changes can diff from (see backend.changes)."""
+    value = session.execute(
+        select(IngestGeneration.delta_floor).where(IngestGeneration.id == _ROW_ID)
+    ).scalar()
+    return value or 0
+
+
+def set_delta_floor(session: Session, generation: int) -> None:
+    _upsert(session, delta_floor=generation)
@@ -6,43 +6,139 @@ import argparse
 import asyncio
 import json
 import logging
+import os
 import sys
+from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterable, Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session, sessionmaker
 
-from backend.database import Base
+from backend.changes import prune_tombstones, record_tombstones, stamp_rows
+from backend.content import compress_content, content_digest
+from backend.database import create_tables, make_engine, swap_database
+from backend.generation import (
+    bump_generation,
+    current_generation,
+    set_delta_floor,
+    set_generation,
+)
+from backend.intervals import IntervalIndex
+from backend.manifest import (
+    STRUCTURED_FILES,
+    FileState,
+    ManifestDiff,
+    diff_manifest,
+    load_step_numbers,
+    record_manifest,
+    snapshot_files,
+)
 from backend.models import (
     ArbiterEvent,
+    DispatchBlob,
     Handoff,
+    IngestedFile,
     PullRequest,
+    QuantileSketch,
     Run,
+    StateRollup,
     Step,
+    StepRollup,
+    Tombstone,
     Transition,
 )
-from backend.parser.handoffs import parse_handoffs
-from backend.parser.logs import parse_run_logs, parse_step_logs
-from backend.parser.structured import parse_structured
+from backend.parser.handoffs import (
+    HANDOFF_RE,
+    HandoffRecord,
+    parse_handoff_file,
+    parse_handoffs,
+)
+from backend.parser.logs import (
+    STEP_FILENAME_RE,
+    RunRecord,
+    StepLogData,
+    match_dispatches,
+    parse_run_log_files,
+    parse_run_logs,
+    parse_step_log_files,
+    parse_step_logs,
+    select_step_log_files,
+)
+from backend.parser.structured import StructuredData, parse_structured
+from backend.rollups import refresh_rollups, rollups_built, touched_days
+from backend.sketches import ProjectSketches
 
 logger = logging.getLogger(__name__)
 
 
-def ingest(order_dir: Path, project: str, db_path: Path) -> dict:
-    """Ingest all ORDER data into the database. Returns summary counts."""
-    engine = create_engine(f"sqlite:///{db_path}", echo=False)
-    Base.metadata.create_all(bind=engine)
+@dataclass
+class IngestChanges:
+    """What a committed re-ingest touched, for the post-commit hook.
+
+    run_ids and step_numbers name the runs and steps whose API responses may
+    differ; None means any of them may (a full rebuild).  Stats aggregate
+    over everything, so they change with every commit.
+    """
+
+    generation: int
+    run_ids: Optional[set[int]] = None
+    step_numbers: Optional[set[int]] = None
+
+
+def ingest(order_dir: Path, project: str, db_path: Path, jobs: int = 1) -> dict:
+    """Ingest all ORDER data into the database. Returns summary counts.
+
+    jobs > 1 parses log files across that many worker processes.
+    """
+    engine = make_engine(db_path)
+    create_tables(engine)
     session = sessionmaker(bind=engine)()
 
     try:
-        return _ingest(session, order_dir, project)
+        return _ingest(session, order_dir, project, jobs=jobs)
     finally:
         session.close()
 
 
-def _ingest(session: Session, order_dir: Path, project: str) -> dict:
-    counts = {
+_BATCH_SIZE = 5000
+
+# The shadow DB is throwaway until swapped in (and fsynced then), so it is
+# built without durability: no on-disk journal, no syncs.
+_SHADOW_PRAGMAS = {"journal_mode": "MEMORY", "synchronous": "OFF", "temp_store": "MEMORY"}
+
+FAILED_STATUSES = ("failed", "halted")
+
+# Model -> key in the counts dict returned by _ingest
+_COUNT_KEYS = {
+    Transition: "transitions",
+    PullRequest: "prs",
+    Handoff: "handoffs",
+    ArbiterEvent: "arbiter_events",
+}
+
+_TRANSITION_DEFAULTS = {
+    "step_id": None,
+    "timestamp": None,
+    "from_state": None,
+    "to_state": None,
+    "verdict": None,
+    "duration_secs": None,
+    "log_level": None,
+    "message": None,
+    "note": None,
+    "dispatch_skill": None,
+    "dispatch_duration_secs": None,
+    "dispatch_content_length": None,
+    "dispatch_content_hash": None,
+    "is_self_transition": False,
+}
+
+
+def _empty_counts() -> dict:
+    return {
         "steps": 0,
         "transitions": 0,
         "prs": 0,
@@ -51,216 +147,595 @@ def _ingest(session: Session, order_dir: Path, project: str) -> dict:
         "runs": 0,
     }
 
-    # Step 1: Parse handoffs → create Step + Handoff records
+
+class _BulkWriter:
+    """Buffer child rows per table and insert them with Core executemany.
+
+    Rows for one table must share the same keys.  Buffers are written every
+    batch_size rows so memory stays bounded on large archives.
+    """
+
+    def __init__(self, session: Session, counts: dict, batch_size: int = _BATCH_SIZE) -> None:
+        self._session = session
+        self._counts = counts
+        self._batch_size = batch_size
+        self._rows: dict[type, list[dict]] = {}
+        self._blobs: list[dict] = []
+        self._blob_hashes: set[str] = set()
+
+    def add_blob(self, text: str) -> tuple[int, str]:
+        """Queue text for dispatch_blobs once per hash; returns (length, hash)."""
+        length, digest = content_digest(text)
+        if digest not in self._blob_hashes:
+            self._blob_hashes.add(digest)
+            self._blobs.append({"hash": digest, "size": length, "data": compress_content(text)})
+            if len(self._blobs) >= self._batch_size:
+                self._write_blobs()
+        return length, digest
+
+    def add(self, model: type, row: dict) -> None:
+        rows = self._rows.setdefault(model, [])
+        rows.append(row)
+        self._counts[_COUNT_KEYS[model]] += 1
+        if len(rows) >= self._batch_size:
+            self._write(model)
+
+    def flush(self) -> None:
+        self._write_blobs()
+        for model in list(self._rows):
+            self._write(model)
+
+    def _write_blobs(self) -> None:
+        if self._blobs:
+            # Blobs already stored by an earlier ingest are left alone
+            self._session.execute(
+                sqlite_insert(DispatchBlob.__table__).on_conflict_do_nothing(), self._blobs
+            )
+            self._blobs = []
+
+    def _write(self, model: type) -> None:
+        rows = self._rows.pop(model, None)
+        if rows:
+            self._session.execute(insert(model.__table__), rows)
+
+
+def _ingest(
+    session: Session,
+    order_dir: Path,
+    project: str,
+    snapshot: Optional[dict[str, FileState]] = None,
+    jobs: int = 1,
+) -> dict:
+    """Full ingest of order_dir into an empty database.
+
+    snapshot is the manifest state to record; when omitted the tracked files
+    are stat'ed and hashed before parsing starts, so anything that changes
+    mid-ingest is picked up by the next incremental pass.
+    """
+    if snapshot is None:
+        snapshot = snapshot_files(order_dir)
+    counts = _empty_counts()
+    writer = _BulkWriter(session, counts)
+
     handoff_records = parse_handoffs(order_dir)
+    structured = parse_structured(order_dir)
+    step_log_data = parse_step_logs(order_dir, jobs)
+
+    # Steps 1-3: build every Step from handoffs, structured data and step
+    # logs (in that precedence), then insert them in one batch for IDs.
     step_map: dict[int, Step] = {}  # step_number -> Step ORM object
+    for h in handoff_records:
+        step = step_map.setdefault(h.step_number, _new_step(h.step_number))
+        _apply_handoff(step, h)
+    # PRs only link to steps known from handoffs or structured data
+    linkable = set(step_map) | structured.step_numbers
+    for sn in sorted(structured.step_numbers):
+        step_map.setdefault(sn, _new_step(sn))
+    for sld in step_log_data:
+        step = step_map.setdefault(sld.step_number, _new_step(sld.step_number))
+        _apply_step_fields(step, sld)
+    session.add_all(step_map.values())
+    session.flush()
 
     for h in handoff_records:
-        step = Step(
-            step_number=h.step_number,
-            title=h.title,
-            phase=h.phase,
-            status=h.status or "completed",
-            tasks_completed=h.tasks_completed,
-            prs_merged=json.dumps(h.prs_merged_numbers) if h.prs_merged_numbers else None,
-            handoff_file=h.file_path,
-        )
-        session.add(step)
-        session.flush()
-        step_map[h.step_number] = step
-
-        handoff = Handoff(
-            step_id=step.id,
-            step_number=h.step_number,
-            key_decisions=h.key_decisions,
-            tradeoffs=h.tradeoffs,
-            known_risks=h.known_risks,
-            learnings=h.learnings,
-            followups=h.followups,
-            next_step_number=h.next_step_number,
-            next_step_title=h.next_step_title,
-        )
-        session.add(handoff)
-        counts["handoffs"] += 1
+        writer.add(Handoff, _handoff_row(step_map[h.step_number].id, h))
+    _write_structured(writer, structured, {sn: step_map[sn].id for sn in linkable})
+    for sld in step_log_data:
+        _write_step_log(writer, step_map[sld.step_number].id, sld)
+    writer.flush()
 
-    # Step 2: Parse structured data → enrich Steps, create PRs + Transitions
-    structured = parse_structured(order_dir)
+    # Step 4: Parse order-run logs → create Run records
+    run_records = parse_run_logs(order_dir, jobs)
+    runs: list[tuple[Run, list[int]]] = []
+    for rr in run_records:
+        run = Run(project=project)
+        _apply_run_record(run, rr)
+        session.add(run)
+        runs.append((run, rr.step_numbers))
+        counts["runs"] += 1
+    session.flush()
 
-    # Create Step records for steps not already in step_map
-    for sn in sorted(structured.step_numbers):
-        if sn not in step_map:
-            step = Step(step_number=sn, status="completed")
-            session.add(step)
-            session.flush()
-            step_map[sn] = step
+    # Step 5: Associate steps with runs, orphans to the nearest preceding run
+    _assign_steps_to_runs(step_map.values(), runs)
 
-    # Create Transition records from history.jsonl
-    for t in structured.transitions:
-        transition = Transition(
-            timestamp=t.timestamp,
-            from_state=t.from_state,
-            to_state=t.to_state,
-            note=t.note,
-            is_self_transition=t.is_self_transition,
-        )
-        session.add(transition)
-        counts["transitions"] += 1
+    # Step 6: Compute run aggregates
+    _compute_run_aggregates(session)
 
-    # Create PullRequest records
-    for pr in structured.prs:
-        step = step_map.get(pr.step_number) if pr.step_number else None
-        pull_request = PullRequest(
-            step_id=step.id if step else None,
-            pr_number=pr.pr_number,
-            task_id=pr.task_id,
-            title=pr.title,
-            status=pr.status,
-            merged_at=pr.merged_at,
+    # Step 7: Duration sketches for the percentile endpoints
+    sketches = ProjectSketches(session, project)
+    sketches.add_transitions()
+    sketches.save()
+
+    # Step 8: Hourly/daily rollups for the trend endpoints
+    refresh_rollups(session)
+
+    record_manifest(session, snapshot, {
+        f"logs/{rr.log_file}": rr.step_numbers for rr in run_records
+    })
+
+    counts["steps"] = len(step_map)
+    # Every row is new, so deltas from before this generation are meaningless
+    set_delta_floor(session, bump_generation(session))
+    session.commit()
+    return counts
+
+
+def _ingest_changes(
+    session: Session,
+    order_dir: Path,
+    project: str,
+    diff: ManifestDiff,
+    jobs: int = 1,
+) -> tuple[dict, IngestChanges]:
+    """Apply added/changed files from diff to an already-ingested database.
+
+    Only the dirty files are reparsed.  Steps touched by a dirty handoff or
+    step log are rebuilt in place (keeping their IDs) from that step's
+    sources; structured files are re-applied as a unit; dirty run logs are
+    upserted by log_file.  Run association and aggregates are then recomputed
+    from what is already in the database.
+
+    Changed rows are stamped with the new generation and deleted transitions
+    logged as tombstones (see backend.changes).  Returns the row counts and
+    the runs and steps that changed.
+    """
+    generation = bump_generation(session)
+    counts = _empty_counts()
+    writer = _BulkWriter(session, counts)
+    dirty = diff.dirty
+
+    step_map: dict[int, Step] = {s.step_number: s for s in session.query(Step).all()}
+    old_run_ids = {sn: s.run_id for sn, s in step_map.items()}
+
+    # Sketches are adjusted by delta: rows are subtracted before they are
+    # deleted and the rewritten rows added back once flushed.
+    sketches = ProjectSketches(session, project)
+    sketches.ensure_built()
+    # Rollups are recomputed for every day that held old or new rows
+    rebuild_rollups = not rollups_built(session)
+    rollup_days: set = set()
+
+    handoff_files: dict[int, Path] = {}
+    for rel in sorted(diff.snapshot):
+        m = HANDOFF_RE.search(rel)
+        if rel.startswith("handoffs/") and m:
+            handoff_files[int(m.group(1))] = order_dir / rel
+    step_log_files = select_step_log_files(order_dir / "logs")
+
+    affected: set[int] = set()
+    for rel in dirty:
+        if rel.startswith("handoffs/"):
+            m = HANDOFF_RE.search(rel)
+        elif rel.startswith("logs/"):
+            m = STEP_FILENAME_RE.match(rel[len("logs/"):])
+        else:
+            m = None
+        if m:
+            affected.add(int(m.group(1)))
+
+    step_logs = {
+        sld.step_number: sld
+        for sld in parse_step_log_files(
+            {sn: step_log_files[sn] for sn in affected if sn in step_log_files}, jobs
         )
-        session.add(pull_request)
-        counts["prs"] += 1
+    }
+    handoffs = {
+        sn: h for sn in affected
+        if sn in handoff_files and (h := parse_handoff_file(handoff_files[sn]))
+    }
 
+    # Rebuild each affected step from its handoff and selected step log
+    relink_prs = False
+    if affected:
+        old_ids = [step_map[sn].id for sn in affected if sn in step_map]
+        sketches.remove_transitions(old_ids)
+        rollup_days |= touched_days(session, old_ids)
+        record_tombstones(session, Transition, Transition.step_id.in_(old_ids), generation)
+        _delete_step_children(session, old_ids)
+    for sn in sorted(affected):
+        h = handoffs.get(sn)
+        sld = step_logs.get(sn)
+        step = step_map.get(sn)
+        # PRs link to steps that have a handoff, so gaining one means relinking
+        had_handoff = step is not None and step.handoff_file is not None
+        relink_prs = relink_prs or had_handoff != (h is not None)
+        if step is None:
+            step = _new_step(sn)
+            session.add(step)
+            step_map[sn] = step
+        else:
+            _reset_step(step)
+        if h is not None:
+            _apply_handoff(step, h)
+        if sld is not None:
+            _apply_step_fields(step, sld)
+        counts["steps"] += 1
     session.flush()
 
-    # Step 3: Parse step logs → enrich Steps, add more transitions + arbiter events
-    step_log_data = parse_step_logs(order_dir)
-    for sld in step_log_data:
-        step = step_map.get(sld.step_number)
-        if not step:
-            step = Step(step_number=sld.step_number, status="completed")
-            session.add(step)
-            session.flush()
-            step_map[sld.step_number] = step
-
-        # Enrich step with log data
-        if sld.title and not step.title:
-            step.title = sld.title
-        if sld.started_at:
-            step.started_at = sld.started_at
-        if sld.ended_at:
-            step.ended_at = sld.ended_at
-        if sld.final_state:
-            step.final_state = sld.final_state
-        if sld.final_verdict:
-            step.final_verdict = sld.final_verdict
-        if sld.completed:
-            step.status = "completed"
-
-        # Add transitions from log
-        for lt in sld.transitions:
-            transition = Transition(
-                step_id=step.id,
-                timestamp=lt.timestamp,
-                from_state=lt.from_state,
-                to_state=lt.to_state,
-                verdict=lt.verdict,
-                log_level=lt.log_level,
-                message=lt.message,
-                is_self_transition=lt.is_self_transition,
-            )
-            session.add(transition)
-            counts["transitions"] += 1
-
-        # Match dispatches to log-derived transitions (same step_id)
-        step_transitions = [
-            t for t in session.query(Transition).filter(
-                Transition.step_id == step.id,
-            ).order_by(Transition.timestamp).all()
-            if t.timestamp is not None
-        ]
-        for d in sld.dispatches:
-            if d.duration_secs is not None and d.started_at:
-                for trans in step_transitions:
-                    if trans.dispatch_skill is None:
-                        try:
-                            # Make both naive for comparison
-                            t1 = d.started_at.replace(tzinfo=None)
-                            t2 = trans.timestamp.replace(tzinfo=None) if trans.timestamp else None
-                            if t2 and abs((t1 - t2).total_seconds()) < 600:
-                                trans.dispatch_skill = d.skill
-                                trans.dispatch_duration_secs = d.duration_secs
-                                trans.dispatch_content = d.content
-                                break
-                        except (TypeError, AttributeError):
-                            continue
-
-        # Add arbiter events
-        for ae in sld.arbiter_events:
-            arbiter = ArbiterEvent(
-                step_id=step.id,
-                attempt=ae.attempt,
-                max_attempts=ae.max_attempts,
-                verdict=ae.verdict,
-                pr_number=ae.pr_number,
-            )
-            session.add(arbiter)
-            counts["arbiter_events"] += 1
+    for sn in sorted(affected):
+        step_id = step_map[sn].id
+        if sn in handoffs:
+            writer.add(Handoff, _handoff_row(step_id, handoffs[sn]))
+        if sn in step_logs:
+            _write_step_log(writer, step_id, step_logs[sn])
+
+    # Structured data is small and cross-cuts steps, so re-apply it wholesale
+    restructure = bool(relink_prs or dirty & set(STRUCTURED_FILES))
+    if restructure:
+        structured = parse_structured(order_dir)
+        sketches.remove_transitions([], unlinked=True)
+        rollup_days |= touched_days(session, [], unlinked=True)
+        record_tombstones(session, Transition, Transition.step_id.is_(None), generation)
+        session.execute(delete(Transition).where(Transition.step_id.is_(None)))
+        session.execute(delete(PullRequest))
+        for sn in sorted(structured.step_numbers - set(step_map)):
+            step_map[sn] = _new_step(sn)
+            session.add(step_map[sn])
+        session.flush()
+        # Match full-ingest semantics: PRs only link to handoff/structured steps
+        linkable = {
+            sn: s.id for sn, s in step_map.items()
+            if s.handoff_file or sn in structured.step_numbers
+        }
+        _write_structured(writer, structured, linkable)
+
+    writer.flush()
+    if affected:
+        _delete_orphan_blobs(session)
+    new_ids = [step_map[sn].id for sn in affected]
+    stamp_rows(session, Transition, Transition.step_id.in_(new_ids), generation)
+    if restructure:
+        stamp_rows(session, Transition, Transition.step_id.is_(None), generation)
+    sketches.add_transitions(new_ids, unlinked=restructure)
+    sketches.save()
+    rollup_days |= touched_days(session, new_ids, unlinked=restructure)
+
+    # Upsert dirty run logs, then re-associate every step
+    run_step_numbers = load_step_numbers(session)
+    fresh_step_numbers: dict[str, list[int]] = {}
+    runs_by_file = {r.log_file: r for r in session.query(Run).all()}
+    dirty_runs = sorted(rel for rel in dirty if rel.startswith("logs/order-run-"))
+    for rel, rr in zip(dirty_runs, parse_run_log_files([order_dir / r for r in dirty_runs], jobs)):
+        run = runs_by_file.get(rr.log_file)
+        if run is None:
+            run = Run(project=project)
+            session.add(run)
+            runs_by_file[rr.log_file] = run
+        _apply_run_record(run, rr)
+        fresh_step_numbers[rel] = rr.step_numbers
+        counts["runs"] += 1
+    run_step_numbers.update(fresh_step_numbers)
+    session.flush()
+
+    runs = [
+        (run, run_step_numbers.get(f"logs/{log_file}", []))
+        for log_file, run in sorted(runs_by_file.items())
+    ]
+    for step in step_map.values():
+        step.run_id = None
+    _assign_steps_to_runs(step_map.values(), runs)
 
+    # Refresh aggregates only for runs whose membership or member steps changed
     session.flush()
+    touched_runs = {runs_by_file[rel[len("logs/"):]].id for rel in dirty_runs}
+    # Rebuilt, moved to another run, or new from structured data
+    touched_steps = set(affected)
+    for sn, step in step_map.items():
+        old = old_run_ids.get(sn)
+        if sn in affected or old != step.run_id or sn not in old_run_ids:
+            touched_runs.update((old, step.run_id))
+            touched_steps.add(sn)
+    touched_runs.discard(None)
+    for sn in touched_steps:
+        step_map[sn].generation = generation
+    for run in runs_by_file.values():
+        if run.id in touched_runs:
+            run.generation = generation
+    _compute_run_aggregates(session, touched_runs)
+    refresh_rollups(session, None if rebuild_rollups else rollup_days)
+
+    record_manifest(session, diff.snapshot, fresh_step_numbers)
+    prune_tombstones(session, generation)
+    session.commit()
+    return counts, IngestChanges(generation, touched_runs, touched_steps)
 
-    # Step 4: Parse order-run logs → create Run records
-    run_records = parse_run_logs(order_dir)
-    for rr in run_records:
-        run = Run(
-            project=project,
-            log_file=rr.log_file,
-            started_at=rr.started_at,
-            ended_at=rr.ended_at,
-            status=rr.status,
-        )
-        session.add(run)
-        session.flush()
 
-        # Associate steps with this run by timestamp overlap
-        if rr.started_at and rr.ended_at:
-            for sn, step in step_map.items():
-                if step.started_at and step.run_id is None:
-                    if rr.started_at <= step.started_at <= rr.ended_at:
-                        step.run_id = run.id
+def _new_step(step_number: int) -> Step:
+    return Step(step_number=step_number, status="completed")
 
-        # Also associate by step numbers found in log
-        for sn in rr.step_numbers:
-            step = step_map.get(sn)
-            if step and step.run_id is None:
-                step.run_id = run.id
 
-        counts["runs"] += 1
+def _delete_step_children(session: Session, step_ids: list[int]) -> None:
+    """Delete the rows that step files produced for the given steps."""
+    for model in (ArbiterEvent, Transition, Handoff):
+        session.execute(delete(model).where(model.step_id.in_(step_ids)))
+
 
-    # Step 5: Assign orphaned steps to the nearest preceding run
-    runs_by_start = sorted(
-        session.query(Run).filter(Run.started_at.isnot(None)).all(),
-        key=lambda r: r.started_at.replace(tzinfo=None),
+def _delete_orphan_blobs(session: Session) -> None:
+    """Drop dispatch blobs no transition references any more."""
+    referenced = select(Transition.dispatch_content_hash).where(
+        Transition.dispatch_content_hash.isnot(None)
     )
-    for sn, step in step_map.items():
-        if step.run_id is None and step.started_at:
-            step_ts = step.started_at.replace(tzinfo=None)
-            best = None
-            for run in runs_by_start:
-                if run.started_at.replace(tzinfo=None) <= step_ts:
-                    best = run
-                else:
-                    break
-            if best is not None:
-                step.run_id = best.id
+    session.execute(delete(DispatchBlob).where(DispatchBlob.hash.not_in(referenced)))
+
+
+def _reset_step(step: Step) -> None:
+    """Clear a step's file-derived fields back to their defaults."""
+    for attr in (
+        "title", "phase", "started_at", "ended_at", "final_state",
+        "final_verdict", "prs_opened", "prs_merged", "handoff_file",
+    ):
+        setattr(step, attr, None)
+    step.status = "completed"
+    step.tasks_total = 0
+    step.tasks_completed = 0
+
+
+def _apply_handoff(step: Step, h: HandoffRecord) -> None:
+    step.title = h.title
+    step.phase = h.phase
+    step.status = h.status or "completed"
+    step.tasks_completed = h.tasks_completed
+    step.prs_merged = json.dumps(h.prs_merged_numbers) if h.prs_merged_numbers else None
+    step.handoff_file = h.file_path
+
+
+def _handoff_row(step_id: int, h: HandoffRecord) -> dict:
+    return {
+        "step_id": step_id,
+        "step_number": h.step_number,
+        "key_decisions": h.key_decisions,
+        "tradeoffs": h.tradeoffs,
+        "known_risks": h.known_risks,
+        "learnings": h.learnings,
+        "followups": h.followups,
+        "next_step_number": h.next_step_number,
+        "next_step_title": h.next_step_title,
+    }
 
-    # Step 6: Compute run aggregates
-    for run in session.query(Run).all():
-        steps = session.query(Step).filter(Step.run_id == run.id).all()
-        run.steps_attempted = len(steps)
-        run.steps_completed = sum(1 for s in steps if s.status == "completed")
-        run.steps_failed = sum(1 for s in steps if s.status in ("failed", "halted"))
 
-    counts["steps"] = len(step_map)
-    session.commit()
-    return counts
+def _write_structured(
+    writer: _BulkWriter, structured: StructuredData, step_ids: dict[int, int]
+) -> None:
+    """Queue history transitions and PRs; PRs link via step_ids (number -> id)."""
+    # Transition rows from history.jsonl
+    for t in structured.transitions:
+        writer.add(Transition, {
+            **_TRANSITION_DEFAULTS,
+            "timestamp": t.timestamp,
+            "from_state": t.from_state,
+            "to_state": t.to_state,
+            "note": t.note,
+            "is_self_transition": t.is_self_transition,
+        })
+
+    # PullRequest rows
+    for pr in structured.prs:
+        writer.add(PullRequest, {
+            "step_id": step_ids.get(pr.step_number) if pr.step_number else None,
+            "pr_number": pr.pr_number,
+            "task_id": pr.task_id,
+            "title": pr.title,
+            "status": pr.status,
+            "merged_at": pr.merged_at,
+        })
+
+
+def _apply_step_fields(step: Step, sld: StepLogData) -> None:
+    """Enrich a step with what its log says about title, timing and outcome."""
+    if sld.title and not step.title:
+        step.title = sld.title
+    if sld.started_at:
+        step.started_at = sld.started_at
+    if sld.ended_at:
+        step.ended_at = sld.ended_at
+    if sld.final_state:
+        step.final_state = sld.final_state
+    if sld.final_verdict:
+        step.final_verdict = sld.final_verdict
+    if sld.completed:
+        step.status = "completed"
+
+
+def _write_step_log(writer: _BulkWriter, step_id: int, sld: StepLogData) -> None:
+    """Queue a step log's transitions (with matched dispatches) and arbiter events."""
+    rows = [
+        {
+            **_TRANSITION_DEFAULTS,
+            "step_id": step_id,
+            "timestamp": lt.timestamp,
+            "from_state": lt.from_state,
+            "to_state": lt.to_state,
+            "verdict": lt.verdict,
+            "log_level": lt.log_level,
+            "message": lt.message,
+            "is_self_transition": lt.is_self_transition,
+        }
+        for lt in sld.transitions
+    ]
+
+    for row, secs in zip(rows, _dwell_times([lt.timestamp for lt in sld.transitions], sld.ended_at)):
+        row["duration_secs"] = secs
+
+    # Match dispatches to log-derived transitions
+    for idx, d in match_dispatches(sld.transitions, sld.dispatches).items():
+        rows[idx]["dispatch_skill"] = d.skill
+        rows[idx]["dispatch_duration_secs"] = d.duration_secs
+        if d.content is not None:
+            (
+                rows[idx]["dispatch_content_length"],
+                rows[idx]["dispatch_content_hash"],
+            ) = writer.add_blob(d.content)
+
+    for row in rows:
+        writer.add(Transition, row)
+
+    for ae in sld.arbiter_events:
+        writer.add(ArbiterEvent, {
+            "step_id": step_id,
+            "transition_id": None,
+            "attempt": ae.attempt,
+            "max_attempts": ae.max_attempts,
+            "verdict": ae.verdict,
+            "pr_number": ae.pr_number,
+            "ci_failure_file": None,
+        })
+
+
+def _dwell_times(
+    timestamps: list[Optional[datetime]], ended_at: Optional[datetime]
+) -> list[Optional[float]]:
+    """Seconds each transition lasted, in one sorted pass over a step's transitions.
+
+    A transition lasts until the next one (by time, then log order); the last
+    one lasts until ended_at.  None where an end is unknown or precedes it.
+    """
+    durations: list[Optional[float]] = [None] * len(timestamps)
+    order = sorted(
+        (i for i, ts in enumerate(timestamps) if ts is not None),
+        key=lambda i: _naive(timestamps[i]),
+    )
+    ends = [_naive(timestamps[i]) for i in order[1:]]
+    ends.append(_naive(ended_at) if ended_at else None)
+    for i, end in zip(order, ends):
+        if end is not None and end >= _naive(timestamps[i]):
+            durations[i] = (end - _naive(timestamps[i])).total_seconds()
+    return durations
+
+
+def _apply_run_record(run: Run, rr: RunRecord) -> None:
+    run.log_file = rr.log_file
+    run.started_at = rr.started_at
+    run.ended_at = rr.ended_at
+    run.status = rr.status
+
+
+def _naive(dt: datetime) -> datetime:
+    # Values read back from SQLite are naive wall-clock times; freshly parsed
+    # ones carry an offset.  Compare everything on the naive wall clock.
+    return dt.replace(tzinfo=None)
+
+
+def _assign_steps_to_runs(
+    steps: Iterable[Step], runs: list[tuple[Run, list[int]]]
+) -> None:
+    """Set run_id on unassigned steps.
+
+    Runs are in log order: a step belongs to the first run whose time span
+    contains its start, or that mentions its step number.  Steps still
+    unassigned go to the nearest run that started before them.  Each lookup
+    is a bisect into an IntervalIndex rather than a scan over runs.
+    """
+    index = IntervalIndex(
+        (_naive(run.started_at), _naive(run.ended_at) if run.ended_at else None, pos)
+        for pos, (run, _) in enumerate(runs)
+        if run.started_at
+    )
+    first_mention: dict[int, int] = {}
+    for pos, (_, step_numbers) in enumerate(runs):
+        for sn in step_numbers:
+            first_mention.setdefault(sn, pos)
+
+    for step in steps:
+        if step.run_id is not None:
+            continue
+        step_ts = _naive(step.started_at) if step.started_at else None
+        candidates = [first_mention.get(step.step_number)]
+        if step_ts is not None:
+            candidates.append(index.first_covering(step_ts))
+        found = [pos for pos in candidates if pos is not None]
+        if found:
+            step.run_id = runs[min(found)][0].id
+        elif step_ts is not None:
+            # Assign orphaned steps to the nearest preceding run
+            pos = index.last_started(step_ts)
+            if pos is not None:
+                step.run_id = runs[pos][0].id
+
+
+def _compute_run_aggregates(session: Session, run_ids: Optional[Iterable[int]] = None) -> None:
+    """Recompute steps_attempted/completed/failed for runs.
+
+    One grouped SELECT over steps feeds one executemany UPDATE by primary
+    key.  Pass run_ids to refresh only those runs; runs with no steps are
+    reset to zero.
+    """
+    counts_q = (
+        select(
+            Step.run_id,
+            func.count(Step.id),
+            func.sum(case((Step.status == "completed", 1), else_=0)),
+            func.sum(case((Step.status.in_(FAILED_STATUSES), 1), else_=0)),
+        )
+        .where(Step.run_id.isnot(None))
+        .group_by(Step.run_id)
+    )
+    if run_ids is None:
+        targets = session.scalars(select(Run.id)).all()
+    else:
+        targets = sorted(set(run_ids))
+        counts_q = counts_q.where(Step.run_id.in_(targets))
+    if not targets:
+        return
+
+    by_run = {row[0]: row[1:] for row in session.execute(counts_q)}
+    params = []
+    for run_id in targets:
+        attempted, completed, failed = by_run.get(run_id, (0, 0, 0))
+        params.append({
+            "id": run_id,
+            "steps_attempted": attempted,
+            "steps_completed": completed,
+            "steps_failed": failed,
+        })
+    session.execute(update(Run), params)
+
+
+def _clear_tables(session: Session) -> None:
+    """Delete all ingested rows, children first to respect FK order."""
+    for model in (
+        ArbiterEvent, Transition, PullRequest, Handoff, Step, Run, IngestedFile,
+        QuantileSketch, StepRollup, StateRollup, DispatchBlob, Tombstone,
+    ):
+        session.execute(delete(model))
+    session.flush()
 
 
 class IngestWatcher:
     """Poll ORDER directory for changes and trigger re-ingest.
 
     Computes a fingerprint from key file sizes/counts.  When the fingerprint
-    changes, runs a full delete-then-reingest in one transaction so readers
-    see old data until the commit completes.
+    changes, diffs the files on disk against the ingest manifest and reparses
+    only what was added or changed, in one transaction so readers see old
+    data until the commit completes.  Deleted files (or a missing manifest)
+    fall back to a full rebuild.
+
+    When db_path is given, full rebuilds are built into a shadow database
+    file next to it, ANALYZEd, and renamed over the live file, so readers
+    never wait on the rebuild and a failed rebuild leaves the serving copy
+    untouched.  Without it, the rebuild is a delete-then-reingest in place.
+
+    on_commit, if given, is called (in the worker thread) with the
+    IngestChanges of each re-ingest that changed the data.
     """
 
     def __init__(
@@ -269,11 +744,17 @@ class IngestWatcher:
         project: str,
         session_factory,
         poll_interval: float = 30.0,
+        jobs: int = 1,
+        db_path: Optional[Path] = None,
+        on_commit: Optional[Callable[[IngestChanges], None]] = None,
     ) -> None:
         self._order_dir = order_dir
         self._project = project
         self._session_factory = session_factory
         self._poll_interval = poll_interval
+        self._jobs = jobs
+        self._db_path = db_path
+        self._on_commit = on_commit
         self._running: bool = False
         self._last_fingerprint: Optional[tuple] = None
 
@@ -351,32 +832,96 @@ class IngestWatcher:
             logger.exception("Re-ingest failed")
 
     def _do_reingest(self) -> None:
-        """Run full re-ingest in a single transaction (called from executor)."""
+        """Apply changed files in a single transaction (called from executor)."""
         session = self._session_factory()
+        changes: Optional[IngestChanges] = None
         try:
-            # Delete children first to respect FK order
-            session.query(ArbiterEvent).delete()
-            session.query(Transition).delete()
-            session.query(PullRequest).delete()
-            session.query(Handoff).delete()
-            session.query(Step).delete()
-            session.query(Run).delete()
-            session.flush()
-
-            _ingest(session, self._order_dir, self._project)
+            diff = diff_manifest(session, self._order_dir)
+            if diff.requires_rebuild and self._db_path is not None:
+                generation = current_generation(session)
+                session.close()
+                self._rebuild_and_swap(diff.snapshot, generation)
+                changes = IngestChanges(generation + 1)
+            elif diff.requires_rebuild:
+                _clear_tables(session)
+                _ingest(
+                    session, self._order_dir, self._project,
+                    snapshot=diff.snapshot, jobs=self._jobs,
+                )
+                changes = IngestChanges(current_generation(session))
+            elif diff.dirty:
+                counts, changes = _ingest_changes(
+                    session, self._order_dir, self._project, diff, jobs=self._jobs
+                )
+                logger.info(
+                    "Incremental re-ingest of %d file(s): %s", len(diff.dirty), counts
+                )
+            else:
+                # Only stat changes (e.g. touch) — refresh the manifest, and
+                # build rollups for a database that predates them
+                record_manifest(session, diff.snapshot)
+                if not rollups_built(session):
+                    refresh_rollups(session)
+                    changes = IngestChanges(bump_generation(session), set(), set())
+                session.commit()
         except Exception:
             session.rollback()
             raise
         finally:
             session.close()
 
+        if changes is not None and self._on_commit is not None:
+            try:
+                self._on_commit(changes)
+            except Exception:
+                # The data is committed; a failing hook must not trigger a re-ingest
+                logger.exception("Post-commit hook failed")
+
+    def _rebuild_and_swap(self, snapshot: dict[str, FileState], generation: int = 0) -> None:
+        """Full ingest into <db>.building, then swap it in for the live DB.
+
+        generation is the live DB's; the shadow continues from it so ETags
+        handed out for the old data never match the new.
+        """
+        shadow = self._db_path.with_name(self._db_path.name + ".building")
+        for stale in (shadow, shadow.with_name(shadow.name + "-journal")):
+            stale.unlink(missing_ok=True)
+
+        shadow_engine = make_engine(shadow, pragmas=_SHADOW_PRAGMAS)
+        try:
+            create_tables(shadow_engine)
+            session = sessionmaker(bind=shadow_engine)()
+            try:
+                set_generation(session, generation)
+                counts = _ingest(
+                    session, self._order_dir, self._project,
+                    snapshot=snapshot, jobs=self._jobs,
+                )
+            finally:
+                session.close()
+            with shadow_engine.begin() as conn:
+                conn.exec_driver_sql("ANALYZE")
+        except Exception:
+            shadow_engine.dispose()
+            shadow.unlink(missing_ok=True)
+            raise
+        shadow_engine.dispose()
+
+        swap_database(shadow, self._db_path, self._session_factory.kw.get("bind"))
+        logger.info("Rebuilt %s from scratch and swapped it in: %s", self._db_path, counts)
+
 
 def main():
     parser = argparse.ArgumentParser(description="Ingest ORDER data into PEACE database")
     parser.add_argument("order_dir", type=Path, help="Path to ORDER data directory")
     parser.add_argument("--project", type=str, default=None, help="Project name (default: parent dir name)")
     parser.add_argument("--db", type=Path, default=Path("peace.db"), help="Database file path")
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=1,
+        help="Worker processes for log parsing (0 = one per CPU, default: 1)",
+    )
     args = parser.parse_args()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
 
     if not args.order_dir.exists():
         print(f"Error: {args.order_dir} does not exist", file=sys.stderr)
@@ -391,7 +936,7 @@ def main():
     if args.db.exists():
         args.db.unlink()
 
-    counts = ingest(args.order_dir, project, args.db)
+    counts = ingest(args.order_dir, project, args.db, jobs=jobs)
 
     print(f"\nIngested:")
     print(f"  Runs:            {counts['runs']}")
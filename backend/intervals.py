@@ -0,0 +1,73 @@
+"""Static interval index over sorted boundaries.
+
+Answers "which interval covers t" and "which interval most recently started
+before t" with a single bisect each.  Used by ingest to assign steps to runs,
+and usable anywhere that needs the run covering a timestamp.
+"""
+
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left, bisect_right
+from typing import Any, Generic, Iterable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class IntervalIndex(Generic[T]):
+    """Closed intervals [start, end] with payloads, in priority order.
+
+    Intervals added earlier win when several cover the same point.  An
+    interval whose end is None has a start but covers nothing; it still
+    takes part in last_started().  Keys only need to be mutually comparable
+    (e.g. all-naive datetimes).
+    """
+
+    def __init__(self, intervals: Iterable[tuple[Any, Optional[Any], T]]) -> None:
+        items = list(intervals)
+        self._payloads: list[T] = [payload for _, _, payload in items]
+
+        # Latest start <= t: starts sorted stably, so equal starts keep
+        # priority order and bisect_right lands after the last of them.
+        by_start = sorted(range(len(items)), key=lambda i: items[i][0])
+        self._starts = [items[i][0] for i in by_start]
+        self._by_start = by_start
+
+        # Covering: boundary point i is region 2i, the open gap after it is
+        # region 2i + 1.  Each region stores the first interval covering it.
+        closed = [(s, e, i) for i, (s, e, _) in enumerate(items) if e is not None and s <= e]
+        self._points = sorted({s for s, _, _ in closed} | {e for _, e, _ in closed})
+        n_regions = max(2 * len(self._points) - 1, 0)
+
+        spans = sorted(
+            (2 * bisect_left(self._points, s), 2 * bisect_left(self._points, e), i)
+            for s, e, i in closed
+        )
+        self._first: list[Optional[int]] = [None] * n_regions
+        active: list[tuple[int, int]] = []  # (priority, last region)
+        k = 0
+        for region in range(n_regions):
+            while k < len(spans) and spans[k][0] == region:
+                heapq.heappush(active, (spans[k][2], spans[k][1]))
+                k += 1
+            while active and active[0][1] < region:
+                heapq.heappop(active)
+            if active:
+                self._first[region] = active[0][0]
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def first_covering(self, t: Any) -> Optional[T]:
+        """Payload of the highest-priority interval with start <= t <= end."""
+        i = bisect_left(self._points, t)
+        region = 2 * i if i < len(self._points) and self._points[i] == t else 2 * i - 1
+        if region < 0 or region >= len(self._first):
+            return None
+        pos = self._first[region]
+        return self._payloads[pos] if pos is not None else None
+
+    def last_started(self, t: Any) -> Optional[T]:
+        """Payload of the interval with the latest start <= t."""
+        i = bisect_right(self._starts, t)
+        return self._payloads[self._by_start[i - 1]] if i else None
@@ -5,43 +5,54 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import zlib
 from contextlib import asynccontextmanager
+from functools import lru_cache
 from pathlib import Path
+from datetime import datetime
+from typing import Any, Callable, Literal, Optional
 
-from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import Session, raiseload, selectinload
 
 from backend import config, stats_service
-from backend.database import SessionLocal, create_tables
+from backend.changes import changes_since
+from backend.content import content_response, etag_matches
+from backend.database import ReadSessionLocal, SessionLocal, create_tables, get_db
 from backend.event_stream import (
     EventFileWatcher,
     broadcaster,
+    data_changed_event,
     event_stream_generator,
 )
-from backend.ingest import IngestWatcher
-from backend.models import (
-    ArbiterEvent,
-    Handoff,
-    PullRequest,
-    Run,
-    Step,
-    Transition,
-)
+from backend.generation import current_version
+from backend.ingest import IngestChanges, IngestWatcher
+from backend.models import DispatchBlob, Handoff, Run, Step, Transition
+from backend.pagination import paginate, time_range
+from backend.response_cache import ResponseCache
 from backend.schemas import (
+    Changes,
+    Dashboard,
     DurationTrendItem,
     EnhancedStatsOverview,
     FailureBreakdown,
     HandoffOut,
     RecentFailureItem,
+    RunFull,
     RunSummary,
+    SkillLatencyStats,
     StateDurationStats,
+    StateTrendBucket,
     StatsOverview,
     StepDetail,
+    StepFull,
     StepSummary,
     TransitionOut,
+    TrendBucket,
 )
 
 logger = logging.getLogger(__name__)
@@ -50,21 +61,56 @@ _watcher: EventFileWatcher | None = None
 _watcher_task: asyncio.Task | None = None
 _ingest_watcher: IngestWatcher | None = None
 _ingest_watcher_task: asyncio.Task | None = None
+# The server's event loop, for publishing from the ingest worker thread
+_loop: asyncio.AbstractEventLoop | None = None
+
+# Serialized /api/stats responses, keyed by database id, path and arguments
+# and tagged with the generation
+stats_cache = ResponseCache(config.STATS_CACHE_MAX_BYTES)
+
+
+def _on_ingest_commit(changes: IngestChanges) -> None:
+    """Rebuild cached stats for the new generation, then tell SSE clients
+    what changed so they refetch just that (from the warm cache).
+
+    Runs in the ingest watcher's worker thread, right after the commit.
+    """
+    recipes = stats_cache.invalidate()
+    db = ReadSessionLocal()
+    try:
+        database_id, generation = current_version(db)
+        # Re-keyed, in case a rebuilt database file was swapped in
+        recipes = [((database_id, *key[1:]), build) for key, build in recipes]
+        stats_cache.warm(recipes, db, generation)
+    finally:
+        db.close()
+    if _loop is not None:
+        event = data_changed_event(changes.generation, changes.run_ids, changes.step_numbers)
+        asyncio.run_coroutine_threadsafe(broadcaster.publish(event), _loop)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global _watcher, _watcher_task, _ingest_watcher, _ingest_watcher_task
+    global _watcher, _watcher_task, _ingest_watcher, _ingest_watcher_task, _loop
+
+    _loop = asyncio.get_running_loop()
 
     order_dir = config.require_order_dir()
 
+    # Existing databases pick up new indexes here without a re-ingest
+    create_tables()
+
     events_path = Path(config.EVENTS_FILE) if config.EVENTS_FILE else order_dir / "events.jsonl"
     _watcher = EventFileWatcher(events_path)
     _watcher_task = asyncio.create_task(_watcher.start())
     logger.info("Event file watcher started for %s", events_path)
 
     project = order_dir.resolve().parent.parent.parent.name
-    _ingest_watcher = IngestWatcher(order_dir, project, SessionLocal)
+    _ingest_watcher = IngestWatcher(
+        order_dir, project, SessionLocal,
+        jobs=config.INGEST_JOBS, db_path=Path(config.DB_PATH),
+        on_commit=_on_ingest_commit,
+    )
     _ingest_watcher_task = asyncio.create_task(_ingest_watcher.start())
     logger.info("Ingest watcher started for %s", order_dir)
 
@@ -95,23 +141,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 # ── Live Streaming Endpoints ────────────────────────────────────
 
 
 @app.get("/api/live/events")
-async def live_event_stream(request: Request, last_event_id: int | None = None):
-    """SSE endpoint for live ORDER events."""
+async def live_event_stream(
+    request: Request,
+    last_event_id: int | None = None,
+    types: Optional[str] = Query(None, description="Comma-separated event types (default: all)"),
+):
+    """SSE endpoint for live ORDER events and data_changed notifications."""
     header_id = request.headers.get("Last-Event-ID")
     if last_event_id is None and header_id:
         try:
@@ -119,7 +162,8 @@ async def live_event_stream(request: Request, last_event_id: int | None = None):
         except ValueError:
             pass
 
-    queue = broadcaster.subscribe(last_event_id)
+    event_types = {t.strip() for t in types.split(",") if t.strip()} if types else None
+    queue = broadcaster.subscribe(last_event_id, event_types)
 
     return StreamingResponse(
         event_stream_generator(queue, request.is_disconnected),
@@ -161,15 +205,65 @@ async def live_status():
     }
 
 
-# ── Run & Step Endpoints ────────────────────────────────────────
+# ── Conditional GET ─────────────────────────────────────────────
+
+# Part of every ETag, with the database id and generation: bump it whenever a
+# response shape changes, so a deploy never answers 304 for a body cached
+# from the old code.
+API_VERSION = 1
+
+
+def _not_modified(request: Request, response: Response, db: Session = Depends(get_db)) -> None:
+    """Tag the response with the database's id and ingest generation; a
+    matching If-None-Match gets a 304 before the endpoint runs any query."""
+    request.state.database_id, request.state.generation = current_version(db)
+    tag = f'"{request.state.database_id}-{request.state.generation}-v{API_VERSION}"'
+    if etag_matches(request.headers.get("if-none-match"), tag):
+        raise HTTPException(status_code=304, headers={"ETag": tag})
+    response.headers["ETag"] = tag
+    response.headers["Cache-Control"] = "no-cache"
+
 
+# Every endpoint that reads ingested data (not /api/live, not dispatch
+# content, which is tagged by its hash)
+_CONDITIONAL = [Depends(_not_modified)]
 
-@app.get("/api/runs", response_model=list[RunSummary])
-def list_runs(db: Session = Depends(get_db)):
-    return db.query(Run).order_by(Run.started_at.desc()).all()
+
+# ── Run & Step Endpoints ────────────────────────────────────────
 
 
-@app.get("/api/runs/{run_id}", response_model=RunSummary)
+def _page(response: Response, query, column, id_column, cursor, limit, descending=False):
+    """Rows of a keyset page; the next page's cursor goes in X-Next-Cursor."""
+    try:
+        rows, next_cursor = paginate(query, column, id_column, cursor, limit, descending)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
+
+
+@app.get("/api/runs", response_model=list[RunSummary], dependencies=_CONDITIONAL)
+def list_runs(
+    response: Response,
+    status: Optional[str] = None,
+    project: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+):
+    """Runs, newest first, one keyset page at a time."""
+    query = db.query(Run).filter(*time_range(Run.started_at, since, until))
+    if status is not None:
+        query = query.filter(Run.status == status)
+    if project is not None:
+        query = query.filter(Run.project == project)
+    return _page(response, query, Run.started_at, Run.id, cursor, limit, descending=True)
+
+
+@app.get("/api/runs/{run_id}", response_model=RunSummary, dependencies=_CONDITIONAL)
 def get_run(run_id: int, db: Session = Depends(get_db)):
     run = db.get(Run, run_id)
     if not run:
@@ -177,7 +271,21 @@ def get_run(run_id: int, db: Session = Depends(get_db)):
     return run
 
 
-@app.get("/api/runs/{run_id}/steps", response_model=list[StepSummary])
+@app.get("/api/runs/{run_id}/full", response_model=RunFull, dependencies=_CONDITIONAL)
+def get_run_full(run_id: int, db: Session = Depends(get_db)):
+    """Run with its steps in two queries (everything else raises if touched)."""
+    run = (
+        db.query(Run)
+        .options(selectinload(Run.steps), raiseload("*"))
+        .filter(Run.id == run_id)
+        .first()
+    )
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return run
+
+
+@app.get("/api/runs/{run_id}/steps", response_model=list[StepSummary], dependencies=_CONDITIONAL)
 def list_run_steps(run_id: int, db: Session = Depends(get_db)):
     run = db.get(Run, run_id)
     if not run:
@@ -190,7 +298,7 @@ def list_run_steps(run_id: int, db: Session = Depends(get_db)):
     )
 
 
-@app.get("/api/steps/{step_number}", response_model=StepDetail)
+@app.get("/api/steps/{step_number}", response_model=StepDetail, dependencies=_CONDITIONAL)
 def get_step(step_number: int, db: Session = Depends(get_db)):
     step = db.query(Step).filter(Step.step_number == step_number).first()
     if not step:
@@ -198,20 +306,52 @@ def get_step(step_number: int, db: Session = Depends(get_db)):
     return step
 
 
-@app.get("/api/steps/{step_number}/transitions", response_model=list[TransitionOut])
-def list_step_transitions(step_number: int, db: Session = Depends(get_db)):
+class TransitionFilters:
+    """Query parameters shared by the transition list endpoints."""
+
+    def __init__(
+        self,
+        to_state: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = Query(500, ge=1, le=1000),
+    ):
+        self.to_state = to_state
+        self.since = since
+        self.until = until
+        self.cursor = cursor
+        self.limit = limit
+
+
+def _transition_page(db: Session, response: Response, step_id: int, filters: TransitionFilters):
+    query = db.query(Transition).filter(
+        Transition.step_id == step_id,
+        *time_range(Transition.timestamp, filters.since, filters.until),
+    )
+    if filters.to_state is not None:
+        query = query.filter(Transition.to_state == filters.to_state)
+    return _page(response, query, Transition.timestamp, Transition.id, filters.cursor, filters.limit)
+
+
+@app.get(
+    "/api/steps/{step_number}/transitions",
+    response_model=list[TransitionOut],
+    dependencies=_CONDITIONAL,
+)
+def list_step_transitions(
+    step_number: int,
+    response: Response,
+    filters: TransitionFilters = Depends(),
+    db: Session = Depends(get_db),
+):
     step = db.query(Step).filter(Step.step_number == step_number).first()
     if not step:
         raise HTTPException(status_code=404, detail="Step not found")
-    return (
-        db.query(Transition)
-        .filter(Transition.step_id == step.id)
-        .order_by(Transition.timestamp)
-        .all()
-    )
+    return _transition_page(db, response, step.id, filters)
 
 
-@app.get("/api/steps/{step_number}/handoff", response_model=HandoffOut)
+@app.get("/api/steps/{step_number}/handoff", response_model=HandoffOut, dependencies=_CONDITIONAL)
 def get_step_handoff(step_number: int, db: Session = Depends(get_db)):
     step = db.query(Step).filter(Step.step_number == step_number).first()
     if not step:
@@ -222,7 +362,11 @@ def get_step_handoff(step_number: int, db: Session = Depends(get_db)):
     return handoff
 
 
-@app.get("/api/runs/{run_id}/steps/{step_number}", response_model=StepDetail)
+@app.get(
+    "/api/runs/{run_id}/steps/{step_number}",
+    response_model=StepDetail,
+    dependencies=_CONDITIONAL,
+)
 def get_run_step(run_id: int, step_number: int, db: Session = Depends(get_db)):
     step = (
         db.query(Step)
@@ -234,24 +378,57 @@ def get_run_step(run_id: int, step_number: int, db: Session = Depends(get_db)):
     return step
 
 
-@app.get("/api/runs/{run_id}/steps/{step_number}/transitions", response_model=list[TransitionOut])
-def list_run_step_transitions(run_id: int, step_number: int, db: Session = Depends(get_db)):
+@app.get(
+    "/api/runs/{run_id}/steps/{step_number}/full",
+    response_model=StepFull,
+    dependencies=_CONDITIONAL,
+)
+def get_run_step_full(run_id: int, step_number: int, db: Session = Depends(get_db)):
+    """Step with its run, transitions, arbiter events and handoff in five queries."""
     step = (
         db.query(Step)
+        .options(
+            selectinload(Step.run),
+            selectinload(Step.transitions),
+            selectinload(Step.arbiter_events),
+            selectinload(Step.handoff),
+            raiseload("*"),
+        )
         .filter(Step.run_id == run_id, Step.step_number == step_number)
         .first()
     )
     if not step:
         raise HTTPException(status_code=404, detail="Step not found")
-    return (
-        db.query(Transition)
-        .filter(Transition.step_id == step.id)
-        .order_by(Transition.timestamp)
-        .all()
+    return step
+
+
+@app.get(
+    "/api/runs/{run_id}/steps/{step_number}/transitions",
+    response_model=list[TransitionOut],
+    dependencies=_CONDITIONAL,
+)
+def list_run_step_transitions(
+    run_id: int,
+    step_number: int,
+    response: Response,
+    filters: TransitionFilters = Depends(),
+    db: Session = Depends(get_db),
+):
+    step = (
+        db.query(Step)
+        .filter(Step.run_id == run_id, Step.step_number == step_number)
+        .first()
     )
+    if not step:
+        raise HTTPException(status_code=404, detail="Step not found")
+    return _transition_page(db, response, step.id, filters)
 
 
-@app.get("/api/runs/{run_id}/steps/{step_number}/handoff", response_model=HandoffOut)
+@app.get(
+    "/api/runs/{run_id}/steps/{step_number}/handoff",
+    response_model=HandoffOut,
+    dependencies=_CONDITIONAL,
+)
 def get_run_step_handoff(run_id: int, step_number: int, db: Session = Depends(get_db)):
     step = (
         db.query(Step)
@@ -266,57 +443,204 @@ def get_run_step_handoff(run_id: int, step_number: int, db: Session = Depends(ge
     return handoff
 
 
+@app.get("/api/transitions/{transition_id}/dispatch")
+def get_transition_dispatch(transition_id: int, request: Request, db: Session = Depends(get_db)):
+    """Dispatch block text, with Range, compression and ETag support."""
+    row = db.execute(
+        select(Transition.dispatch_content_hash, DispatchBlob.data)
+        .outerjoin(DispatchBlob, DispatchBlob.hash == Transition.dispatch_content_hash)
+        .where(Transition.id == transition_id)
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Transition not found")
+    if row.data is None:
+        raise HTTPException(status_code=404, detail="No dispatch content for this transition")
+    body = zlib.decompress(row.data)
+    return content_response(
+        request, body, row.dispatch_content_hash, "text/plain; charset=utf-8", deflated=row.data
+    )
+
+
+# ── Change Feed ─────────────────────────────────────────────────
+
+
+@app.get("/api/changes", response_model=Changes, dependencies=_CONDITIONAL)
+def list_changes(since_generation: int = Query(..., ge=0), db: Session = Depends(get_db)):
+    """Runs, steps and transitions written or deleted after since_generation.
+
+    Pass the returned generation as the next since_generation.
+    """
+    return changes_since(db, since_generation)
+
+
 # ── Stats Endpoints ─────────────────────────────────────────────
 
 
-@app.get("/api/stats", response_model=StatsOverview)
-def get_stats(db: Session = Depends(get_db)):
-    total_steps = db.query(func.count(Step.id)).scalar() or 0
-    completed = db.query(func.count(Step.id)).filter(Step.status == "completed").scalar() or 0
-    failed = db.query(func.count(Step.id)).filter(Step.status.in_(["failed", "halted"])).scalar() or 0
-    total_prs = db.query(func.count(PullRequest.id)).scalar() or 0
-    total_transitions = db.query(func.count(Transition.id)).scalar() or 0
-    total_self = db.query(func.count(Transition.id)).filter(Transition.is_self_transition == True).scalar() or 0  # noqa: E712
-    total_arbiter = db.query(func.count(ArbiterEvent.id)).scalar() or 0
-    total_handoffs = db.query(func.count(Handoff.id)).scalar() or 0
-    total_runs = db.query(func.count(Run.id)).scalar() or 0
-
-    return StatsOverview(
-        total_steps=total_steps,
-        completed=completed,
-        failed=failed,
-        total_prs=total_prs,
-        total_transitions=total_transitions,
-        total_self_transitions=total_self,
-        total_arbiter_events=total_arbiter,
-        total_handoffs=total_handoffs,
-        total_runs=total_runs,
+@lru_cache(maxsize=None)
+def _adapter(model: Any) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+def _stats_json(
+    request: Request,
+    response: Response,
+    db: Session,
+    model: Any,
+    compute: Callable[..., Any],
+    *args: Any,
+) -> Response:
+    """compute(db, *args) serialized as model, served from stats_cache.
+
+    The headers _not_modified set are copied over: FastAPI only merges them
+    into responses it builds itself.
+    """
+    adapter = _adapter(model)
+
+    def build(session: Session) -> bytes:
+        return adapter.dump_json(adapter.validate_python(compute(session, *args)))
+
+    key = (request.state.database_id, request.url.path, args)
+    body = stats_cache.get(key, request.state.generation, build, db)
+    return Response(body, media_type="application/json", headers=dict(response.headers))
+
+
+@app.get("/api/stats", response_model=StatsOverview, dependencies=_CONDITIONAL)
+def get_stats(request: Request, response: Response, db: Session = Depends(get_db)):
+    return _stats_json(request, response, db, StatsOverview, stats_service.get_totals)
+
+
+@app.get("/api/stats/overview", response_model=EnhancedStatsOverview, dependencies=_CONDITIONAL)
+def get_stats_overview(request: Request, response: Response, db: Session = Depends(get_db)):
+    return _stats_json(request, response, db, EnhancedStatsOverview, stats_service.get_overview)
+
+
+@app.get(
+    "/api/stats/duration-trend",
+    response_model=list[DurationTrendItem],
+    dependencies=_CONDITIONAL,
+)
+def get_duration_trend(
+    request: Request,
+    response: Response,
+    max_points: int = Query(stats_service.DURATION_TREND_MAX_POINTS, ge=3),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    from_step: Optional[int] = None,
+    to_step: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    return _stats_json(
+        request, response, db, list[DurationTrendItem], stats_service.get_duration_trend,
+        max_points, since, until, from_step, to_step,
     )
 
 
-@app.get("/api/stats/overview", response_model=EnhancedStatsOverview)
-def get_stats_overview(db: Session = Depends(get_db)):
-    return stats_service.get_overview(db)
+@app.get(
+    "/api/stats/state-durations",
+    response_model=dict[str, StateDurationStats],
+    dependencies=_CONDITIONAL,
+)
+def get_state_durations(
+    request: Request,
+    response: Response,
+    project: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    return _stats_json(
+        request, response, db, dict[str, StateDurationStats], stats_service.get_state_durations,
+        project,
+    )
 
 
-@app.get("/api/stats/duration-trend", response_model=list[DurationTrendItem])
-def get_duration_trend(db: Session = Depends(get_db)):
-    return stats_service.get_duration_trend(db)
+@app.get(
+    "/api/stats/skill-latency",
+    response_model=dict[str, SkillLatencyStats],
+    dependencies=_CONDITIONAL,
+)
+def get_skill_latency(
+    request: Request,
+    response: Response,
+    project: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    return _stats_json(
+        request, response, db, dict[str, SkillLatencyStats], stats_service.get_skill_latency,
+        project,
+    )
+
+
+@app.get("/api/stats/trend", response_model=list[TrendBucket], dependencies=_CONDITIONAL)
+def get_trend(
+    request: Request,
+    response: Response,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    bucket: Literal["hour", "day"] = "day",
+    db: Session = Depends(get_db),
+):
+    return _stats_json(
+        request, response, db, list[TrendBucket], stats_service.get_trend, since, until, bucket,
+    )
+
 
+@app.get("/api/stats/state-trend", response_model=list[StateTrendBucket], dependencies=_CONDITIONAL)
+def get_state_trend(
+    request: Request,
+    response: Response,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    bucket: Literal["hour", "day"] = "day",
+    db: Session = Depends(get_db),
+):
+    return _stats_json(
+        request, response, db, list[StateTrendBucket], stats_service.get_state_trend,
+        since, until, bucket,
+    )
 
-@app.get("/api/stats/state-durations", response_model=dict[str, StateDurationStats])
-def get_state_durations(db: Session = Depends(get_db)):
-    return stats_service.get_state_durations(db)
 
+@app.get("/api/stats/failure-breakdown", response_model=FailureBreakdown, dependencies=_CONDITIONAL)
+def get_failure_breakdown(request: Request, response: Response, db: Session = Depends(get_db)):
+    return _stats_json(request, response, db, FailureBreakdown, stats_service.get_failure_breakdown)
 
-@app.get("/api/stats/failure-breakdown", response_model=FailureBreakdown)
-def get_failure_breakdown(db: Session = Depends(get_db)):
-    return stats_service.get_failure_breakdown(db)
 
+@app.get(
+    "/api/stats/recent-failures",
+    response_model=list[RecentFailureItem],
+    dependencies=_CONDITIONAL,
+)
+def get_recent_failures(
+    request: Request,
+    response: Response,
+    limit: int = Query(stats_service.RECENT_FAILURES_LIMIT, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    return _stats_json(
+        request, response, db, list[RecentFailureItem], stats_service.get_recent_failures,
+        limit, offset,
+    )
 
-@app.get("/api/stats/recent-failures", response_model=list[RecentFailureItem])
-def get_recent_failures(db: Session = Depends(get_db)):
-    return stats_service.get_recent_failures(db)
+
+@app.get("/api/dashboard", response_model=Dashboard, dependencies=_CONDITIONAL)
+def get_dashboard(
+    request: Request,
+    response: Response,
+    panels: Optional[str] = Query(None, description="Comma-separated panels (default: all)"),
+    max_points: int = Query(stats_service.DURATION_TREND_MAX_POINTS, ge=3),
+    db: Session = Depends(get_db),
+):
+    """Every dashboard panel in one response, from one snapshot."""
+    selected = stats_service.DASHBOARD_PANELS
+    if panels is not None:
+        requested = {p.strip() for p in panels.split(",") if p.strip()}
+        unknown = requested.difference(stats_service.DASHBOARD_PANELS)
+        if unknown:
+            detail = f"Unknown panels: {', '.join(sorted(unknown))}"
+            raise HTTPException(status_code=422, detail=detail)
+        selected = tuple(p for p in stats_service.DASHBOARD_PANELS if p in requested)
+    return _stats_json(
+        request, response, db, Dashboard, stats_service.get_dashboard, selected, max_points,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,173 @@
+"""Per-file manifest of ingested ORDER data.
+
+Records path, inode, mtime, size and content hash for every source file the
+ingester reads, so a re-ingest can tell which files actually changed and
+reparse only those.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from backend.models import IngestedFile
+
+STRUCTURED_FILES = ("history.jsonl", "history-prs.jsonl", "state.json")
+
+# Glob patterns (relative to ORDER_DIR) for the files the parsers consume
+TRACKED_GLOBS = (
+    "logs/step-*.log",
+    "logs/order-run-*.log",
+    "handoffs/step-*_HANDOFF.yml",
+)
+
+_HASH_CHUNK = 1 << 20
+
+
+@dataclass
+class FileState:
+    path: str  # POSIX path relative to ORDER_DIR
+    inode: int
+    mtime_ns: int
+    size: int
+    content_hash: Optional[str] = None
+
+    def same_stat(self, row: IngestedFile) -> bool:
+        return (
+            self.inode == row.inode
+            and self.mtime_ns == row.mtime_ns
+            and self.size == row.size
+        )
+
+
+@dataclass
+class ManifestDiff:
+    snapshot: dict[str, FileState] = field(default_factory=dict)
+    added: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    baseline: bool = False  # no manifest recorded yet
+
+    @property
+    def dirty(self) -> set[str]:
+        """Paths whose content must be reparsed."""
+        return set(self.added) | set(self.changed)
+
+    @property
+    def requires_rebuild(self) -> bool:
+        """Deletions and a missing manifest can't be applied incrementally."""
+        return self.baseline or bool(self.deleted)
+
+
+def hash_file(path: Path) -> str:
+    """Return a hex content digest for a file."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def scan_files(order_dir: Path) -> dict[str, FileState]:
+    """Stat every tracked file under order_dir (no hashing)."""
+    paths: list[Path] = [order_dir / name for name in STRUCTURED_FILES]
+    for pattern in TRACKED_GLOBS:
+        paths.extend(sorted(order_dir.glob(pattern)))
+
+    states: dict[str, FileState] = {}
+    for p in paths:
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        rel = p.relative_to(order_dir).as_posix()
+        states[rel] = FileState(
+            path=rel, inode=st.st_ino, mtime_ns=st.st_mtime_ns, size=st.st_size
+        )
+    return states
+
+
+def snapshot_files(order_dir: Path) -> dict[str, FileState]:
+    """Stat and hash every tracked file under order_dir."""
+    states = scan_files(order_dir)
+    for state in states.values():
+        state.content_hash = _safe_hash(order_dir / state.path)
+    return states
+
+
+def diff_manifest(session: Session, order_dir: Path) -> ManifestDiff:
+    """Compare files on disk against the recorded manifest.
+
+    Files whose inode, mtime and size all match the manifest are assumed
+    unchanged and are not read.  Everything else is hashed; a file that was
+    only touched (same hash) is not reported as changed.
+    """
+    recorded = {row.path: row for row in session.query(IngestedFile).all()}
+    current = scan_files(order_dir)
+
+    diff = ManifestDiff(snapshot=current, baseline=not recorded)
+    for rel, state in current.items():
+        row = recorded.get(rel)
+        if row is not None and state.same_stat(row):
+            state.content_hash = row.content_hash
+            continue
+        state.content_hash = _safe_hash(order_dir / rel)
+        if row is None:
+            diff.added.append(rel)
+        elif state.content_hash != row.content_hash:
+            diff.changed.append(rel)
+
+    diff.deleted = sorted(set(recorded) - set(current))
+    return diff
+
+
+def load_step_numbers(session: Session) -> dict[str, list[int]]:
+    """Return the step numbers recorded per file (populated for run logs)."""
+    return {
+        row.path: json.loads(row.step_numbers)
+        for row in session.query(IngestedFile)
+        .filter(IngestedFile.step_numbers.isnot(None))
+        .all()
+    }
+
+
+def record_manifest(
+    session: Session,
+    snapshot: dict[str, FileState],
+    step_numbers: Optional[dict[str, list[int]]] = None,
+) -> None:
+    """Make the manifest table match snapshot.
+
+    step_numbers maps a path to the step numbers it references; paths not
+    listed keep whatever was recorded before.
+    """
+    step_numbers = step_numbers or {}
+    existing = {row.path: row for row in session.query(IngestedFile).all()}
+
+    for rel, row in existing.items():
+        if rel not in snapshot:
+            session.delete(row)
+
+    for rel, state in snapshot.items():
+        row = existing.get(rel)
+        if row is None:
+            row = IngestedFile(path=rel)
+            session.add(row)
+        row.inode = state.inode
+        row.mtime_ns = state.mtime_ns
+        row.size = state.size
+        row.content_hash = state.content_hash
+        if rel in step_numbers:
+            row.step_numbers = json.dumps(step_numbers[rel])
+
+
+def _safe_hash(path: Path) -> Optional[str]:
+    try:
+        return hash_file(path)
+    except OSError:
+        return None
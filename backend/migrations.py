@@ -0,0 +1,202 @@
+"""Versioned schema migrations for existing databases.
+
+create_all() only creates missing tables, so anything added to an existing
+table (indexes, columns) needs a migration here.  The applied version is kept
+in SQLite's PRAGMA user_version.  Migrations are idempotent (IF NOT EXISTS,
+or a table_info check for columns), since a fresh database already has the
+full schema from create_all() when they run.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Callable
+
+from sqlalchemy import Connection, Engine
+
+from backend.content import compress_content, content_digest
+
+logger = logging.getLogger(__name__)
+
+
+def _add_query_indexes(conn: Connection) -> None:
+    for ddl in (
+        "CREATE INDEX IF NOT EXISTS ix_runs_started_at ON runs (started_at)",
+        "CREATE INDEX IF NOT EXISTS ix_steps_step_number ON steps (step_number)",
+        "CREATE INDEX IF NOT EXISTS ix_steps_run_id_step_number ON steps (run_id, step_number)",
+        "CREATE INDEX IF NOT EXISTS ix_steps_status_ended_at ON steps (status, ended_at)",
+        "CREATE INDEX IF NOT EXISTS ix_transitions_step_id_timestamp ON transitions (step_id, timestamp)",
+        "CREATE INDEX IF NOT EXISTS ix_transitions_to_state_self ON transitions (to_state, is_self_transition)",
+        "CREATE INDEX IF NOT EXISTS ix_arbiter_events_step_id ON arbiter_events (step_id)",
+        "CREATE INDEX IF NOT EXISTS ix_pull_requests_step_id ON pull_requests (step_id)",
+        "CREATE INDEX IF NOT EXISTS ix_handoffs_step_id ON handoffs (step_id)",
+        "ANALYZE",
+    ):
+        conn.exec_driver_sql(ddl)
+
+
+def _backfill_transition_durations(conn: Connection) -> None:
+    # Same rule as ingest._dwell_times: until the step's next transition,
+    # the last one until the step ended.  Sketches are dropped so the next
+    # ingest rebuilds them with the new durations.  julianday() is only good
+    # to ~10µs, so round to the ms as rollups does.
+    conn.exec_driver_sql("""
+        UPDATE transitions SET duration_secs = d.secs
+        FROM (
+            SELECT id, start,
+                   round((julianday(finish) - julianday(start)) * 86400.0, 3) AS secs
+            FROM (
+                SELECT t.id, t.timestamp AS start,
+                       COALESCE(
+                           LEAD(t.timestamp) OVER (PARTITION BY t.step_id ORDER BY t.timestamp, t.id),
+                           s.ended_at
+                       ) AS finish
+                FROM transitions t JOIN steps s ON s.id = t.step_id
+                WHERE t.timestamp IS NOT NULL
+            )
+            WHERE finish >= start
+        ) AS d
+        WHERE transitions.id = d.id AND transitions.duration_secs IS NULL
+    """)
+    conn.exec_driver_sql("DELETE FROM quantile_sketches")
+
+
+def _add_rollup_range_indexes(conn: Connection) -> None:
+    for ddl in (
+        "CREATE INDEX IF NOT EXISTS ix_steps_started_at ON steps (started_at)",
+        "CREATE INDEX IF NOT EXISTS ix_transitions_timestamp ON transitions (timestamp)",
+        "CREATE INDEX IF NOT EXISTS ix_pull_requests_merged_at ON pull_requests (merged_at)",
+    ):
+        conn.exec_driver_sql(ddl)
+
+
+def _columns(conn: Connection, table: str) -> set[str]:
+    return {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")}
+
+
+def _add_dispatch_digests(conn: Connection) -> None:
+    columns = _columns(conn, "transitions")
+    for name, sql_type in (("dispatch_content_length", "INTEGER"), ("dispatch_content_hash", "TEXT")):
+        if name not in columns:
+            conn.exec_driver_sql(f"ALTER TABLE transitions ADD COLUMN {name} {sql_type}")
+    if "dispatch_content" not in columns:
+        return  # created after migration 5
+
+    # SQLite has no SHA-256, so digests are computed here
+    rows = conn.exec_driver_sql(
+        "SELECT id, dispatch_content FROM transitions"
+        " WHERE dispatch_content IS NOT NULL AND dispatch_content_hash IS NULL"
+    ).all()
+    if rows:
+        conn.exec_driver_sql(
+            "UPDATE transitions SET dispatch_content_length = ?, dispatch_content_hash = ?"
+            " WHERE id = ?",
+            [(*content_digest(text), id_) for id_, text in rows],
+        )
+
+
+def _move_dispatch_content_to_blobs(conn: Connection) -> None:
+    # dispatch_blobs itself comes from create_all()
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_transitions_dispatch_content_hash "
+        "ON transitions (dispatch_content_hash)"
+    )
+    if "dispatch_content" not in _columns(conn, "transitions"):
+        return
+
+    # Batches by id keep memory bounded; each distinct text is stored once
+    last_id = 0
+    while True:
+        rows = conn.exec_driver_sql(
+            "SELECT id, dispatch_content_hash, dispatch_content_length, dispatch_content"
+            " FROM transitions WHERE dispatch_content IS NOT NULL AND id > ?"
+            " ORDER BY id LIMIT 1000",
+            (last_id,),
+        ).all()
+        if not rows:
+            break
+        conn.exec_driver_sql(
+            "INSERT OR IGNORE INTO dispatch_blobs (hash, size, data) VALUES (?, ?, ?)",
+            [(digest, length, compress_content(text)) for _, digest, length, text in rows],
+        )
+        last_id = rows[-1][0]
+    conn.exec_driver_sql("ALTER TABLE transitions DROP COLUMN dispatch_content")
+
+
+def _add_keyset_indexes(conn: Connection) -> None:
+    # Filtered list pages seek on (filter, sort key); the rowid is the tie-breaker
+    for ddl in (
+        "CREATE INDEX IF NOT EXISTS ix_runs_status_started_at ON runs (status, started_at)",
+        "CREATE INDEX IF NOT EXISTS ix_runs_project_started_at ON runs (project, started_at)",
+        "CREATE INDEX IF NOT EXISTS ix_transitions_step_id_to_state_timestamp"
+        " ON transitions (step_id, to_state, timestamp)",
+    ):
+        conn.exec_driver_sql(ddl)
+
+
+def _add_change_stamps(conn: Connection) -> None:
+    # tombstones itself comes from create_all()
+    for table, column in (
+        ("runs", "generation"), ("steps", "generation"), ("transitions", "generation"),
+        ("ingest_generation", "delta_floor"),
+    ):
+        if column not in _columns(conn, table):
+            conn.exec_driver_sql(
+                f"ALTER TABLE {table} ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"
+            )
+    for table in ("runs", "steps", "transitions"):
+        conn.exec_driver_sql(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_generation ON {table} (generation)"
+        )
+    # Existing rows carry no stamps, so deltas start from the current generation
+    conn.exec_driver_sql("UPDATE ingest_generation SET delta_floor = generation")
+
+
+def _add_database_id(conn: Connection) -> None:
+    if "database_id" not in _columns(conn, "ingest_generation"):
+        conn.exec_driver_sql("ALTER TABLE ingest_generation ADD COLUMN database_id TEXT")
+    # Every database gets its id here, before its first ingest
+    conn.exec_driver_sql(
+        "INSERT OR IGNORE INTO ingest_generation (id, generation, delta_floor) VALUES (1, 0, 0)"
+    )
+    conn.exec_driver_sql(
+        "UPDATE ingest_generation SET database_id = lower(hex(randomblob(8)))"
+        " WHERE database_id IS NULL"
+    )
+
+
+# (version, description, apply) in ascending version order
+MIGRATIONS: list[tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "indexes for step lookups and stats filters", _add_query_indexes),
+    (2, "backfill transition dwell times", _backfill_transition_durations),
+    (3, "time-range indexes for rollup refreshes", _add_rollup_range_indexes),
+    (4, "dispatch content length and hash columns", _add_dispatch_digests),
+    (5, "move dispatch content into compressed dispatch_blobs", _move_dispatch_content_to_blobs),
+    (6, "indexes for filtered keyset pages of runs and transitions", _add_keyset_indexes),
+    (7, "row generation stamps and delta floor for /api/changes", _add_change_stamps),
+    (8, "random database id for ETags and cached responses", _add_database_id),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_version(conn: Connection) -> int:
+    return conn.exec_driver_sql("PRAGMA user_version").scalar() or 0
+
+
+def run_migrations(eng: Engine) -> int:
+    """Apply every migration newer than the database's user_version.
+
+    Returns the number of migrations applied.
+    """
+    applied = 0
+    with eng.begin() as conn:
+        current = get_version(conn)
+        for version, description, apply in MIGRATIONS:
+            if version <= current:
+                continue
+            logger.info("Applying migration %d: %s", version, description)
+            apply(conn)
+            conn.exec_driver_sql(f"PRAGMA user_version = {version}")
+            applied += 1
+    return applied
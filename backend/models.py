@@ -1,7 +1,9 @@
+import secrets
+import zlib
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Boolean, Float, ForeignKey, Integer, Text
+from sqlalchemy import Boolean, Float, ForeignKey, Index, Integer, LargeBinary, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.database import Base
@@ -9,6 +11,12 @@ from backend.database import Base
 
 class Run(Base):
     __tablename__ = "runs"
+    __table_args__ = (
+        Index("ix_runs_started_at", "started_at"),
+        Index("ix_runs_status_started_at", "status", "started_at"),
+        Index("ix_runs_project_started_at", "project", "started_at"),
+        Index("ix_runs_generation", "generation"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     project: Mapped[Optional[str]] = mapped_column(Text)
@@ -19,12 +27,20 @@ class Run(Base):
     steps_completed: Mapped[int] = mapped_column(Integer, default=0)
     steps_failed: Mapped[int] = mapped_column(Integer, default=0)
     status: Mapped[Optional[str]] = mapped_column(Text)
+    generation: Mapped[int] = mapped_column(Integer, default=0)  # last ingest to write it
 
-    steps: Mapped[list["Step"]] = relationship(back_populates="run")
+    steps: Mapped[list["Step"]] = relationship(back_populates="run", order_by="Step.step_number")
 
 
 class Step(Base):
     __tablename__ = "steps"
+    __table_args__ = (
+        Index("ix_steps_step_number", "step_number"),
+        Index("ix_steps_run_id_step_number", "run_id", "step_number"),
+        Index("ix_steps_status_ended_at", "status", "ended_at"),
+        Index("ix_steps_started_at", "started_at"),
+        Index("ix_steps_generation", "generation"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     run_id: Mapped[Optional[int]] = mapped_column(ForeignKey("runs.id"))
@@ -41,6 +57,7 @@ class Step(Base):
     prs_opened: Mapped[Optional[str]] = mapped_column(Text)  # JSON array
     prs_merged: Mapped[Optional[str]] = mapped_column(Text)  # JSON array
     handoff_file: Mapped[Optional[str]] = mapped_column(Text)
+    generation: Mapped[int] = mapped_column(Integer, default=0)  # last ingest to write it
 
     run: Mapped[Optional["Run"]] = relationship(back_populates="steps")
     transitions: Mapped[list["Transition"]] = relationship(back_populates="step")
@@ -51,6 +68,14 @@ class Step(Base):
 
 class Transition(Base):
     __tablename__ = "transitions"
+    __table_args__ = (
+        Index("ix_transitions_step_id_timestamp", "step_id", "timestamp"),
+        Index("ix_transitions_to_state_self", "to_state", "is_self_transition"),
+        Index("ix_transitions_timestamp", "timestamp"),
+        Index("ix_transitions_dispatch_content_hash", "dispatch_content_hash"),
+        Index("ix_transitions_step_id_to_state_timestamp", "step_id", "to_state", "timestamp"),
+        Index("ix_transitions_generation", "generation"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     step_id: Mapped[Optional[int]] = mapped_column(ForeignKey("steps.id"))
@@ -64,15 +89,27 @@ class Transition(Base):
     note: Mapped[Optional[str]] = mapped_column(Text)
     dispatch_skill: Mapped[Optional[str]] = mapped_column(Text)
     dispatch_duration_secs: Mapped[Optional[float]] = mapped_column(Float)
-    dispatch_content: Mapped[Optional[str]] = mapped_column(Text)
+    # The text lives in dispatch_blobs, keyed by hash
+    dispatch_content_length: Mapped[Optional[int]] = mapped_column(Integer)  # UTF-8 bytes
+    dispatch_content_hash: Mapped[Optional[str]] = mapped_column(Text)  # SHA-256 hex
     is_self_transition: Mapped[bool] = mapped_column(Boolean, default=False)
+    generation: Mapped[int] = mapped_column(Integer, default=0)  # ingest that inserted it
 
     step: Mapped[Optional["Step"]] = relationship(back_populates="transitions")
     arbiter_events: Mapped[list["ArbiterEvent"]] = relationship(back_populates="transition")
+    dispatch_blob: Mapped[Optional["DispatchBlob"]] = relationship(
+        primaryjoin="foreign(Transition.dispatch_content_hash) == DispatchBlob.hash",
+        viewonly=True,
+    )
+
+    @property
+    def dispatch_content(self) -> Optional[str]:
+        return self.dispatch_blob.text if self.dispatch_blob is not None else None
 
 
 class ArbiterEvent(Base):
     __tablename__ = "arbiter_events"
+    __table_args__ = (Index("ix_arbiter_events_step_id", "step_id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     step_id: Mapped[Optional[int]] = mapped_column(ForeignKey("steps.id"))
@@ -89,6 +126,10 @@ class ArbiterEvent(Base):
 
 class PullRequest(Base):
     __tablename__ = "pull_requests"
+    __table_args__ = (
+        Index("ix_pull_requests_step_id", "step_id"),
+        Index("ix_pull_requests_merged_at", "merged_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     step_id: Mapped[Optional[int]] = mapped_column(ForeignKey("steps.id"))
@@ -103,6 +144,7 @@ class PullRequest(Base):
 
 class Handoff(Base):
     __tablename__ = "handoffs"
+    __table_args__ = (Index("ix_handoffs_step_id", "step_id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     step_id: Mapped[Optional[int]] = mapped_column(ForeignKey("steps.id"))
@@ -116,3 +158,103 @@ class Handoff(Base):
     next_step_title: Mapped[Optional[str]] = mapped_column(Text)
 
     step: Mapped[Optional["Step"]] = relationship(back_populates="handoff")
+
+
+class DispatchBlob(Base):
+    """A dispatch block's text, stored once per distinct content."""
+
+    __tablename__ = "dispatch_blobs"
+
+    hash: Mapped[str] = mapped_column(Text, primary_key=True)  # SHA-256 hex of the UTF-8 text
+    size: Mapped[int] = mapped_column(Integer)  # uncompressed bytes
+    data: Mapped[bytes] = mapped_column(LargeBinary)  # zlib-compressed UTF-8
+
+    @property
+    def text(self) -> str:
+        return zlib.decompress(self.data).decode("utf-8")
+
+
+class IngestedFile(Base):
+    __tablename__ = "ingest_manifest"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    path: Mapped[str] = mapped_column(Text, unique=True)  # relative to ORDER_DIR
+    inode: Mapped[Optional[int]] = mapped_column(Integer)
+    mtime_ns: Mapped[Optional[int]] = mapped_column(Integer)
+    size: Mapped[Optional[int]] = mapped_column(Integer)
+    content_hash: Mapped[Optional[str]] = mapped_column(Text)
+    step_numbers: Mapped[Optional[str]] = mapped_column(Text)  # JSON array (run logs)
+
+
+class IngestGeneration(Base):
+    """Single row counting ingest commits (see backend.generation)."""
+
+    __tablename__ = "ingest_generation"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    generation: Mapped[int] = mapped_column(Integer, default=0)
+    delta_floor: Mapped[int] = mapped_column(Integer, default=0)
+    # Random per database file, so a rebuilt file's generations are new too
+    database_id: Mapped[Optional[str]] = mapped_column(
+        Text, default=lambda: secrets.token_hex(8)
+    )
+
+
+class Tombstone(Base):
+    """A run, step or transition deleted by an ingest (see backend.changes)."""
+
+    __tablename__ = "tombstones"
+    __table_args__ = (Index("ix_tombstones_generation", "generation"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    entity: Mapped[str] = mapped_column(Text)  # "run", "step" or "transition"
+    row_id: Mapped[int] = mapped_column(Integer)
+    generation: Mapped[int] = mapped_column(Integer)  # ingest that deleted it
+
+
+class QuantileSketch(Base):
+    __tablename__ = "quantile_sketches"
+    __table_args__ = (
+        Index("ix_quantile_sketches_kind_project_key", "kind", "project", "key", unique=True),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(Text)  # "state" or "skill"
+    project: Mapped[Optional[str]] = mapped_column(Text)
+    key: Mapped[str] = mapped_column(Text)  # to_state or dispatch_skill
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    sketch: Mapped[str] = mapped_column(Text)  # JSON, see backend.sketches
+
+
+class StepRollup(Base):
+    __tablename__ = "step_rollups"
+    __table_args__ = (
+        Index("ix_step_rollups_grain_bucket", "grain", "bucket_start", unique=True),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    grain: Mapped[str] = mapped_column(Text)  # "hour" or "day"
+    bucket_start: Mapped[datetime]
+    steps: Mapped[int] = mapped_column(Integer, default=0)
+    completed: Mapped[int] = mapped_column(Integer, default=0)
+    failed: Mapped[int] = mapped_column(Integer, default=0)
+    halted: Mapped[int] = mapped_column(Integer, default=0)
+    duration_count: Mapped[int] = mapped_column(Integer, default=0)
+    duration_sum_secs: Mapped[float] = mapped_column(Float, default=0.0)
+    arbiter_attempts: Mapped[int] = mapped_column(Integer, default=0)
+    prs_merged: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class StateRollup(Base):
+    __tablename__ = "state_rollups"
+    __table_args__ = (
+        Index("ix_state_rollups_grain_bucket_state", "grain", "bucket_start", "to_state", unique=True),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    grain: Mapped[str] = mapped_column(Text)
+    bucket_start: Mapped[datetime]
+    to_state: Mapped[str] = mapped_column(Text)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    total_secs: Mapped[float] = mapped_column(Float, default=0.0)
+    sketch: Mapped[str] = mapped_column(Text)  # JSON DDSketch
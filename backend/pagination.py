@@ -0,0 +1,99 @@
+"""Keyset (cursor) pagination and time-range filters for list endpoints.
+
+Lists are ordered by a sort column with the primary key as tie-breaker.  The
+cursor is the last row's (value, id), so the next page starts with an index
+seek where the previous one stopped instead of an OFFSET that re-reads every
+earlier row: page cost stays flat however much history accumulates.  Clients
+treat the cursor as opaque (URL-safe base64 JSON).
+
+SQLite sorts NULLs first, so a NULL sort value ends a descending list and
+starts an ascending one.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import InstrumentedAttribute, Query
+
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    return value.replace(tzinfo=None) if value is not None else None
+
+
+def time_range(column: InstrumentedAttribute, since: Optional[datetime], until: Optional[datetime]) -> list:
+    """Filters for since <= column < until (tz-aware bounds use wall-clock time)."""
+    clauses = []
+    if since is not None:
+        clauses.append(column >= _naive(since))
+    if until is not None:
+        clauses.append(column < _naive(until))
+    return clauses
+
+
+def encode_cursor(value: Optional[datetime], row_id: int) -> str:
+    raw = json.dumps([value.isoformat() if value is not None else None, row_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Optional[datetime], int]:
+    """Inverse of encode_cursor; raises ValueError for anything malformed."""
+    try:
+        value, row_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(row_id, int):
+            raise ValueError("cursor id must be an integer")
+        return (datetime.fromisoformat(value) if value is not None else None), row_id
+    except (binascii.Error, TypeError, UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError("malformed cursor") from exc
+
+
+def _after(query: Query, column: InstrumentedAttribute, id_column: InstrumentedAttribute,
+           value: Optional[datetime], row_id: int, descending: bool) -> list[Query]:
+    """Queries for the rows after (value, row_id), in list order.
+
+    The rest of the cursor's group (NULL or not) and the group that follows
+    are separate queries: OR-ing them together would stop SQLite seeking the
+    index to the cursor, and IS NULL never satisfies a row-value comparison.
+    """
+    if descending:
+        if value is None:
+            return [query.filter(column.is_(None), id_column < row_id)]
+        return [query.filter(tuple_(column, id_column) < tuple_(value, row_id)),
+                query.filter(column.is_(None))]
+    if value is None:
+        return [query.filter(column.is_(None), id_column > row_id),
+                query.filter(column.isnot(None))]
+    return [query.filter(tuple_(column, id_column) > tuple_(value, row_id))]
+
+
+def paginate(
+    query: Query,
+    column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = False,
+) -> tuple[list[Any], Optional[str]]:
+    """One page of query ordered by (column, id_column) and the next page's cursor.
+
+    The cursor is None on the last page.  Raises ValueError for a bad cursor.
+    """
+    order = (column.desc(), id_column.desc()) if descending else (column, id_column)
+    parts = [query]
+    if cursor:
+        parts = _after(query, column, id_column, *decode_cursor(cursor), descending)
+    # One row past the page tells us whether there is another
+    rows: list[Any] = []
+    for part in parts:
+        rows += part.order_by(*order).limit(limit + 1 - len(rows)).all()
+        if len(rows) > limit:
+            break
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(getattr(last, column.key), getattr(last, id_column.key))
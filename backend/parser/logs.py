@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import multiprocessing
 import re
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
 
@@ -51,6 +54,9 @@ ARBITER_HALT_RE = re.compile(r"Arbiter: HALT \(verdict: (\S+)\)")
 ARBITER_VERDICT_RE = re.compile(r"Arbiter: (\S+)")
 ARBITER_EMPTY_RE = re.compile(r"Arbiter returned empty/null verdict for PR #(\d+)")
 
+# Max distance between a dispatch's OK line and the transition it belongs to
+DISPATCH_MATCH_TOLERANCE_SECS = 600
+
 # Run filename: order-run-YYYYMMDDTHHMMSS.log
 RUN_FILENAME_RE = re.compile(r"order-run-(\d{8}T\d{6})\.log$")
 
@@ -290,88 +296,167 @@ def parse_log_file(path: Path) -> tuple[
     return transitions, dispatches, arbiter_events, first_ts, last_ts, step_numbers, step_titles
 
 
-def parse_run_logs(order_dir: Path) -> list[RunRecord]:
+def match_dispatches(
+    transitions: list[LogTransition],
+    dispatches: list[DispatchBlock],
+    tolerance_secs: float = DISPATCH_MATCH_TOLERANCE_SECS,
+) -> dict[int, DispatchBlock]:
+    """Assign timed dispatches to transitions. Returns {transition index: dispatch}.
+
+    Each dispatch (in order) takes the earliest not-yet-matched transition
+    whose timestamp is strictly within tolerance_secs of the dispatch's
+    started_at.  Timestamps are compared on the naive wall clock.
+
+    Transitions are sorted once and searched with bisect; matched positions
+    are skipped via a path-compressed "next free" array, so the whole pass is
+    O((T + D) log T) instead of a scan per dispatch.
+    """
+    order = sorted(
+        (i for i, t in enumerate(transitions) if t.timestamp is not None),
+        key=lambda i: transitions[i].timestamp.replace(tzinfo=None),
+    )
+    times = [transitions[i].timestamp.replace(tzinfo=None) for i in order]
+    next_free = list(range(len(order) + 1))  # next unmatched position >= p
+
+    def find(p: int) -> int:
+        root = p
+        while next_free[root] != root:
+            root = next_free[root]
+        while next_free[p] != root:
+            next_free[p], p = root, next_free[p]
+        return root
+
+    tolerance = timedelta(seconds=tolerance_secs)
+    matches: dict[int, DispatchBlock] = {}
+    for d in dispatches:
+        if d.duration_secs is None or not d.started_at:
+            continue
+        ts = d.started_at.replace(tzinfo=None)
+        pos = find(bisect_right(times, ts - tolerance))
+        if pos < len(order) and times[pos] < ts + tolerance:
+            matches[order[pos]] = d
+            next_free[pos] = pos + 1
+    return matches
+
+
+def parse_run_log(path: Path) -> RunRecord:
+    """Parse a single order-run-*.log file into a RunRecord."""
+    _, _, _, first_ts, last_ts, step_nums, _ = parse_log_file(path)
+
+    # Determine status from last lines
+    status = "completed"
+    try:
+        with open(path, errors="replace") as f:
+            lines = f.readlines()
+        for line in reversed(lines[-20:]):
+            if "HALT" in line or "MERGE_BLOCKED" in line:
+                status = "halted"
+                break
+    except Exception:
+        pass
+
+    return RunRecord(
+        log_file=path.name,
+        started_at=first_ts,
+        ended_at=last_ts,
+        status=status,
+        step_numbers=sorted(step_nums),
+    )
+
+
+def parse_run_logs(order_dir: Path, jobs: int = 1) -> list[RunRecord]:
     """Parse all order-run-*.log files into RunRecords."""
     logs_dir = order_dir / "logs"
     if not logs_dir.exists():
         return []
 
-    runs: list[RunRecord] = []
-    for path in sorted(logs_dir.glob("order-run-*.log")):
-        _, _, _, first_ts, last_ts, step_nums, _ = parse_log_file(path)
-
-        # Determine status from last lines
-        status = "completed"
-        try:
-            with open(path, errors="replace") as f:
-                lines = f.readlines()
-            for line in reversed(lines[-20:]):
-                if "HALT" in line or "MERGE_BLOCKED" in line:
-                    status = "halted"
-                    break
-        except Exception:
-            pass
-
-        runs.append(RunRecord(
-            log_file=path.name,
-            started_at=first_ts,
-            ended_at=last_ts,
-            status=status,
-            step_numbers=sorted(step_nums),
-        ))
-
-    return runs
-
-
-def parse_step_logs(order_dir: Path) -> list[StepLogData]:
-    """Parse all step-N-*.log files into StepLogData."""
-    logs_dir = order_dir / "logs"
-    if not logs_dir.exists():
-        return []
+    return parse_run_log_files(sorted(logs_dir.glob("order-run-*.log")), jobs)
+
+
+def parse_run_log_files(paths: list[Path], jobs: int = 1) -> list[RunRecord]:
+    """Parse the given run logs, in order, using up to jobs processes."""
+    return _map_files(parse_run_log, paths, jobs=jobs)
+
 
-    # Group by step number — if multiple logs per step, use the latest
+def select_step_log_files(logs_dir: Path) -> dict[int, Path]:
+    """Map each step number to the step log that represents it.
+
+    If multiple logs exist for one step, the latest (by filename timestamp) wins.
+    """
     step_files: dict[int, Path] = {}
+    if not logs_dir.exists():
+        return step_files
     for path in sorted(logs_dir.glob("step-*.log")):
         m = STEP_FILENAME_RE.match(path.name)
         if m:
             sn = int(m.group(1))
             step_files[sn] = path  # sorted order means latest wins
+    return step_files
+
+
+def parse_step_log(step_number: int, path: Path) -> StepLogData:
+    """Parse a single step-N-*.log file into StepLogData."""
+    transitions, dispatches, arbiter_events, first_ts, last_ts, _, step_titles = parse_log_file(path)
+
+    title = step_titles.get(step_number)
+
+    # Determine final state and verdict from last transition
+    final_state = None
+    final_verdict = None
+    completed = False
+    if transitions:
+        final_state = transitions[-1].to_state
+        final_verdict = transitions[-1].verdict
+
+    # Check for step complete marker
+    try:
+        with open(path, errors="replace") as f:
+            content = f.read()
+        if re.search(rf"Step\s+{step_number}\s+Complete", content):
+            completed = True
+    except Exception:
+        pass
+
+    return StepLogData(
+        step_number=step_number,
+        title=title,
+        log_file=path.name,
+        started_at=first_ts,
+        ended_at=last_ts,
+        transitions=transitions,
+        dispatches=dispatches,
+        arbiter_events=arbiter_events,
+        final_state=final_state,
+        final_verdict=final_verdict,
+        completed=completed,
+    )
+
+
+def parse_step_logs(order_dir: Path, jobs: int = 1) -> list[StepLogData]:
+    """Parse all step-N-*.log files into StepLogData."""
+    return parse_step_log_files(select_step_log_files(order_dir / "logs"), jobs)
+
+
+def parse_step_log_files(step_files: dict[int, Path], jobs: int = 1) -> list[StepLogData]:
+    """Parse the given step logs in step-number order, using up to jobs processes."""
+    items = sorted(step_files.items())
+    return _map_files(
+        parse_step_log, [sn for sn, _ in items], [p for _, p in items], jobs=jobs
+    )
+
+
+def _map_files(fn, *args: list, jobs: int = 1) -> list:
+    """Apply fn across per-file argument lists, preserving input order.
+
+    With jobs > 1 the calls are spread over a process pool; results come
+    back in submission order so output is identical to the serial path.
+    """
+    count = len(args[0])
+    if jobs <= 1 or count < 2:
+        return list(map(fn, *args))
 
-    results: list[StepLogData] = []
-    for step_number, path in sorted(step_files.items()):
-        transitions, dispatches, arbiter_events, first_ts, last_ts, _, step_titles = parse_log_file(path)
-
-        title = step_titles.get(step_number)
-
-        # Determine final state and verdict from last transition
-        final_state = None
-        final_verdict = None
-        completed = False
-        if transitions:
-            final_state = transitions[-1].to_state
-            final_verdict = transitions[-1].verdict
-
-        # Check for step complete marker
-        try:
-            with open(path, errors="replace") as f:
-                content = f.read()
-            if re.search(rf"Step\s+{step_number}\s+Complete", content):
-                completed = True
-        except Exception:
-            pass
-
-        results.append(StepLogData(
-            step_number=step_number,
-            title=title,
-            log_file=path.name,
-            started_at=first_ts,
-            ended_at=last_ts,
-            transitions=transitions,
-            dispatches=dispatches,
-            arbiter_events=arbiter_events,
-            final_state=final_state,
-            final_verdict=final_verdict,
-            completed=completed,
-        ))
-
-    return results
+    workers = min(jobs, count)
+    # Spawned workers: forking a threaded server (watcher, uvicorn) is unsafe
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        return list(pool.map(fn, *args, chunksize=max(1, count // (workers * 4))))
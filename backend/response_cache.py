@@ -0,0 +1,84 @@
+"""In-process cache of serialized API responses.
+
+Entries are the JSON bytes of a response, tagged with the ingest generation
+they were built for, and evicted least-recently-used once the bodies exceed
+a byte budget.  A lookup for a different generation is a miss, so stale
+bodies are never served; invalidate() frees them as soon as an ingest
+commits and hands back how to rebuild each one, so warm() can repopulate
+the cache for the new generation before clients ask.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Builds a response body from a session
+Builder = Callable[[Session], bytes]
+
+
+class ResponseCache:
+    """LRU of response bodies bounded by their total size in bytes."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[int, bytes, Builder]] = OrderedDict()
+        self._size = 0
+        # Endpoints run in the threadpool; warm() runs in the ingest thread
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, generation: int, build: Builder, session: Session) -> bytes:
+        """The cached body for key at generation, building it on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == generation:
+                self._entries.move_to_end(key)
+                return entry[1]
+        body = build(session)
+        self._store(key, generation, body, build)
+        return body
+
+    def invalidate(self) -> list[tuple[Hashable, Builder]]:
+        """Drop every entry; returns (key, builder) pairs, most recently used last."""
+        with self._lock:
+            recipes = [(key, build) for key, (_, _, build) in self._entries.items()]
+            self._entries.clear()
+            self._size = 0
+        return recipes
+
+    def warm(self, recipes: list[tuple[Hashable, Builder]], session: Session, generation: int) -> None:
+        """Rebuild the given entries for generation (a failed one is just skipped)."""
+        for key, build in recipes:
+            try:
+                self._store(key, generation, build(session), build)
+            except Exception:
+                logger.exception("Failed to warm cached response %r", key)
+
+    def _store(self, key: Hashable, generation: int, body: bytes, build: Builder) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old: Optional[tuple[int, bytes, Builder]] = self._entries.get(key)
+            if old is not None:
+                if old[0] > generation:
+                    return  # a slow request finishing after the warm-up
+                self._size -= len(old[1])
+            self._entries[key] = (generation, body, build)
+            self._entries.move_to_end(key)
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, (_, evicted, _) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
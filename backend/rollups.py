@@ -0,0 +1,201 @@
+"""Hourly and daily rollups for long-horizon trend queries.
+
+step_rollups holds, per bucket, step counts by status, summed step durations,
+arbiter attempts and PRs merged; state_rollups holds per-state transition
+duration counts, sums and a DDSketch.  Steps (and their arbiter events) are
+bucketed by started_at, transitions by timestamp and PRs by merged_at, all
+on the stored wall clock; rows without that timestamp are not rolled up.
+
+Ingest refreshes whole days: every bucket of a touched day is recomputed from
+the raw tables with an indexed range scan.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import case, delete, distinct, exists, func, insert, select
+from sqlalchemy.orm import Session
+
+from backend.models import (
+    ArbiterEvent,
+    PullRequest,
+    StateRollup,
+    Step,
+    StepRollup,
+    Transition,
+)
+from backend.sketches import DDSketch
+
+GRAINS = ("hour", "day")
+
+_BUCKET_FORMATS = {"hour": "%Y-%m-%d %H:00:00", "day": "%Y-%m-%d 00:00:00"}
+
+
+def _bucket(grain: str, col):
+    return func.strftime(_BUCKET_FORMATS[grain], col)
+
+
+def _in_range(col, start: Optional[datetime], end: Optional[datetime]):
+    conditions = [col.isnot(None)]
+    if start is not None:
+        conditions.append(col >= start)
+    if end is not None:
+        conditions.append(col < end)
+    return conditions
+
+
+def touched_days(
+    session: Session,
+    step_ids: Iterable[int],
+    unlinked: bool = False,
+) -> set[date]:
+    """Days holding rollup input from the given steps.
+
+    Covers the steps themselves, their transitions and, with unlinked, the
+    history transitions and PRs that ingest rewrites as a unit.
+    """
+    step_ids = list(step_ids)
+    queries = [
+        select(func.date(Step.started_at)).where(Step.id.in_(step_ids)),
+        select(func.date(Transition.timestamp)).where(Transition.step_id.in_(step_ids)),
+    ]
+    if unlinked:
+        queries.append(select(func.date(Transition.timestamp)).where(Transition.step_id.is_(None)))
+        queries.append(select(func.date(PullRequest.merged_at)))
+
+    days: set[date] = set()
+    for query in queries:
+        for (day,) in session.execute(query.distinct()):
+            if day:
+                days.add(date.fromisoformat(day))
+    return days
+
+
+def refresh_rollups(session: Session, days: Optional[Iterable[date]] = None) -> None:
+    """Recompute the rollups for the given days (None rebuilds everything)."""
+    if days is None:
+        session.execute(delete(StepRollup))
+        session.execute(delete(StateRollup))
+        _write_range(session, None, None)
+        return
+
+    for start, end in _day_ranges(days):
+        for model in (StepRollup, StateRollup):
+            session.execute(
+                delete(model).where(model.bucket_start >= start, model.bucket_start < end)
+            )
+        _write_range(session, start, end)
+
+
+def rollups_built(session: Session) -> bool:
+    """False for a database that has step history but no rollups yet."""
+    return bool(session.execute(select(exists().select_from(StepRollup))).scalar()) or not (
+        session.execute(select(exists().where(Step.started_at.isnot(None)))).scalar()
+    )
+
+
+def _day_ranges(days: Iterable[date]) -> list[tuple[datetime, datetime]]:
+    """Merge days into contiguous [start, end) datetime ranges."""
+    ranges: list[tuple[datetime, datetime]] = []
+    for day in sorted(set(days)):
+        start = datetime.combine(day, time())
+        end = start + timedelta(days=1)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+def _write_range(session: Session, start: Optional[datetime], end: Optional[datetime]) -> None:
+    for grain in GRAINS:
+        for model, rows in (
+            (StepRollup, _step_rows(session, grain, start, end)),
+            (StateRollup, _state_rows(session, grain, start, end)),
+        ):
+            if rows:
+                session.execute(insert(model.__table__), rows)
+
+
+def _step_rows(
+    session: Session, grain: str, start: Optional[datetime], end: Optional[datetime]
+) -> list[dict]:
+    buckets: dict[str, dict] = {}
+
+    def row(bucket: str) -> dict:
+        return buckets.setdefault(bucket, {
+            "grain": grain,
+            "bucket_start": datetime.fromisoformat(bucket),
+            "steps": 0, "completed": 0, "failed": 0, "halted": 0,
+            "duration_count": 0, "duration_sum_secs": 0.0,
+            "arbiter_attempts": 0, "prs_merged": 0,
+        })
+
+    # julianday() is only good to ~10µs at this magnitude; round to the ms
+    secs = func.round((func.julianday(Step.ended_at) - func.julianday(Step.started_at)) * 86400.0, 3)
+    step_bucket = _bucket(grain, Step.started_at)
+    for r in session.execute(
+        select(
+            step_bucket.label("bucket"),
+            func.count(Step.id).label("steps"),
+            func.sum(case((Step.status == "completed", 1), else_=0)).label("completed"),
+            func.sum(case((Step.status == "failed", 1), else_=0)).label("failed"),
+            func.sum(case((Step.status == "halted", 1), else_=0)).label("halted"),
+            func.count(secs).label("duration_count"),
+            func.coalesce(func.sum(secs), 0.0).label("duration_sum_secs"),
+        )
+        .where(*_in_range(Step.started_at, start, end))
+        .group_by(step_bucket)
+    ):
+        counts = r._asdict()
+        row(counts.pop("bucket")).update(counts)
+
+    for bucket, n in session.execute(
+        select(step_bucket, func.count(ArbiterEvent.id))
+        .join(Step, ArbiterEvent.step_id == Step.id)
+        .where(*_in_range(Step.started_at, start, end))
+        .group_by(step_bucket)
+    ):
+        row(bucket)["arbiter_attempts"] = n
+
+    pr_bucket = _bucket(grain, PullRequest.merged_at)
+    for bucket, n in session.execute(
+        select(pr_bucket, func.count(distinct(PullRequest.pr_number)))
+        .where(PullRequest.status == "merged", *_in_range(PullRequest.merged_at, start, end))
+        .group_by(pr_bucket)
+    ):
+        row(bucket)["prs_merged"] = n
+
+    return list(buckets.values())
+
+
+def _state_rows(
+    session: Session, grain: str, start: Optional[datetime], end: Optional[datetime]
+) -> list[dict]:
+    sketches: dict[tuple[str, str], DDSketch] = {}
+    query = (
+        select(_bucket(grain, Transition.timestamp), Transition.to_state, Transition.duration_secs)
+        .where(
+            *_in_range(Transition.timestamp, start, end),
+            Transition.duration_secs.isnot(None),
+            Transition.to_state.isnot(None),
+            Transition.is_self_transition == False,  # noqa: E712
+        )
+        .execution_options(yield_per=10_000)
+    )
+    for bucket, state, secs in session.execute(query):
+        sketches.setdefault((bucket, state), DDSketch()).add(secs)
+
+    return [
+        {
+            "grain": grain,
+            "bucket_start": datetime.fromisoformat(bucket),
+            "to_state": state,
+            "count": sketch.count,
+            "total_secs": sketch.total,
+            "sketch": sketch.to_json(),
+        }
+        for (bucket, state), sketch in sorted(sketches.items())
+    ]
@@ -57,7 +57,8 @@ class TransitionOut(BaseModel):
     note: Optional[str]
     dispatch_skill: Optional[str]
     dispatch_duration_secs: Optional[float]
-    dispatch_content: Optional[str]
+    dispatch_content_length: Optional[int]
+    dispatch_content_hash: Optional[str]
     is_self_transition: bool
 
 
@@ -111,6 +112,15 @@ class StepDetail(BaseModel):
     arbiter_events: list[ArbiterEventOut]
 
 
+class RunFull(RunSummary):
+    steps: list[StepSummary]
+
+
+class StepFull(StepDetail):
+    run: Optional[RunSummary]
+    handoff: Optional[HandoffOut]
+
+
 class StatsOverview(BaseModel):
     total_steps: int
     completed: int
@@ -144,6 +154,37 @@ class DurationTrendItem(BaseModel):
 
 
 class StateDurationStats(BaseModel):
+    avg: float
+    p50: float
+    p90: float
+    p95: float
+    p99: float
+
+
+class SkillLatencyStats(BaseModel):
+    count: int
+    avg: float
+    p50: float
+    p90: float
+    p95: float
+    p99: float
+
+
+class TrendBucket(BaseModel):
+    bucket_start: datetime
+    steps: int
+    completed: int
+    failed: int
+    halted: int
+    avg_step_duration_secs: Optional[float] = None
+    arbiter_attempts: int
+    prs_merged: int
+
+
+class StateTrendBucket(BaseModel):
+    bucket_start: datetime
+    state: str
+    count: int
     avg: float
     p50: float
     p95: float
@@ -165,3 +206,29 @@ class RecentFailureItem(BaseModel):
     verdict: Optional[str]
     arbiter_attempts: int
     timestamp: Optional[datetime]
+
+
+# Panels not requested via ?panels= are null
+class Dashboard(BaseModel):
+    overview: Optional[EnhancedStatsOverview] = None
+    duration_trend: Optional[list[DurationTrendItem]] = None
+    state_durations: Optional[dict[str, StateDurationStats]] = None
+    failure_breakdown: Optional[FailureBreakdown] = None
+    recent_failures: Optional[list[RecentFailureItem]] = None
+
+
+class DeletedRows(BaseModel):
+    runs: list[int]
+    steps: list[int]
+    transitions: list[int]
+
+
+# reset: since_generation predates the retained history (or a full rebuild),
+# so the lists are empty and the client must refetch everything
+class Changes(BaseModel):
+    generation: int
+    reset: bool
+    runs: list[RunSummary]
+    steps: list[StepSummary]
+    transitions: list[TransitionOut]
+    deleted: DeletedRows
@@ -0,0 +1,248 @@
+"""Mergeable quantile sketches for transition and dispatch durations.
+
+DDSketch-style: positive values are counted in logarithmic buckets
+(gamma^(k-1), gamma^k] with gamma = (1 + alpha) / (1 - alpha); values <= 0
+go to a zero bucket.  Bucket counts simply add, so sketches merge exactly and
+a value can be removed again.
+
+Error bound: for percentile p over n values, quantile() returns an estimate
+within relative error alpha of the order statistic x[floor((n - 1) * p)].
+stats_service._percentile interpolates between x[floor] and x[ceil], so the
+estimate always lies in [x[floor] * (1 - alpha), x[ceil] * (1 + alpha)].
+
+Ingest keeps one sketch per (project, to_state) over non-self transition
+durations and one per (project, dispatch_skill) over dispatch durations in
+the quantile_sketches table.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import and_, exists, or_, select
+from sqlalchemy.orm import Session
+
+from backend.models import QuantileSketch, Transition
+
+RELATIVE_ACCURACY = 0.01
+
+STATE = "state"
+SKILL = "skill"
+
+
+class DDSketch:
+    def __init__(self, alpha: float = RELATIVE_ACCURACY) -> None:
+        self.alpha = alpha
+        self._gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self._gamma)
+        self._reset()
+
+    def _reset(self) -> None:
+        self.bins: dict[int, int] = {}
+        self.zero = 0
+        self.count = 0
+        self.total = 0.0
+        # Bounds for clamping estimates; not tightened when values are removed
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, weight: int = 1) -> None:
+        """Count value weight times (a negative weight removes it)."""
+        if value <= 0:
+            self.zero += weight
+        else:
+            k = math.ceil(math.log(value) / self._log_gamma)
+            n = self.bins.get(k, 0) + weight
+            if n:
+                self.bins[k] = n
+            else:
+                self.bins.pop(k, None)
+        self.count += weight
+        self.total += value * weight
+        if weight > 0:
+            self.min = min(self.min, value)
+            self.max = max(self.max, value)
+        if self.count <= 0:
+            self._reset()
+
+    def merge(self, other: DDSketch) -> None:
+        if other.alpha != self.alpha:
+            raise ValueError("cannot merge sketches with different accuracy")
+        for k, n in other.bins.items():
+            self.bins[k] = self.bins.get(k, 0) + n
+        self.zero += other.zero
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count > 0 else None
+
+    def quantile(self, pct: float) -> Optional[float]:
+        """Estimate the pct-th percentile (0-100); None if empty."""
+        if self.count <= 0:
+            return None
+        rank = (self.count - 1) * (pct / 100.0)
+        cum = self.zero
+        if cum > rank:
+            return 0.0
+        value = self.max
+        for k in sorted(self.bins):
+            cum += self.bins[k]
+            if cum > rank:
+                value = 2 * self._gamma ** k / (self._gamma + 1)
+                break
+        return min(max(value, self.min), self.max)
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "alpha": self.alpha,
+            "zero": self.zero,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "bins": sorted(self.bins.items()),
+        })
+
+    @classmethod
+    def from_json(cls, data: str) -> DDSketch:
+        d = json.loads(data)
+        sketch = cls(d["alpha"])
+        sketch.zero = d["zero"]
+        sketch.count = d["count"]
+        sketch.total = d["total"]
+        if d["min"] is not None:
+            sketch.min = d["min"]
+            sketch.max = d["max"]
+        sketch.bins = {k: n for k, n in d["bins"]}
+        return sketch
+
+
+def _value_filter():
+    """Transitions that contribute to some sketch."""
+    return or_(
+        and_(
+            Transition.duration_secs.isnot(None),
+            Transition.is_self_transition == False,  # noqa: E712
+        ),
+        and_(
+            Transition.dispatch_skill.isnot(None),
+            Transition.dispatch_duration_secs.isnot(None),
+        ),
+    )
+
+
+def transition_values(
+    session: Session,
+    step_ids: Optional[Iterable[int]] = None,
+    unlinked: bool = False,
+) -> Iterator[tuple[str, str, float]]:
+    """Yield (kind, key, value) for every sketched duration.
+
+    step_ids limits the scan to those steps' transitions (plus history
+    transitions without a step when unlinked is set); None scans everything.
+    """
+    query = select(
+        Transition.to_state,
+        Transition.duration_secs,
+        Transition.is_self_transition,
+        Transition.dispatch_skill,
+        Transition.dispatch_duration_secs,
+    ).where(_value_filter())
+    if step_ids is not None:
+        scope = Transition.step_id.in_(list(step_ids))
+        if unlinked:
+            scope = or_(scope, Transition.step_id.is_(None))
+        query = query.where(scope)
+
+    for row in session.execute(query.execution_options(yield_per=10_000)):
+        if row.duration_secs is not None and not row.is_self_transition and row.to_state:
+            yield STATE, row.to_state, row.duration_secs
+        if row.dispatch_skill and row.dispatch_duration_secs is not None:
+            yield SKILL, row.dispatch_skill, row.dispatch_duration_secs
+
+
+class ProjectSketches:
+    """One project's stored sketches: load, adjust by transitions, save."""
+
+    def __init__(self, session: Session, project: Optional[str]) -> None:
+        self._session = session
+        self._project = project
+        self._rows = {
+            (row.kind, row.key): row
+            for row in session.query(QuantileSketch).filter(QuantileSketch.project == project)
+        }
+        self._sketches = {k: DDSketch.from_json(row.sketch) for k, row in self._rows.items()}
+        self._dirty: set[tuple[str, str]] = set()
+
+    def ensure_built(self) -> None:
+        """Build from the current tables if this DB predates sketches."""
+        if not self._rows and self._session.execute(
+            select(exists().where(_value_filter()))
+        ).scalar():
+            self.add_transitions()
+
+    def add_transitions(
+        self,
+        step_ids: Optional[Iterable[int]] = None,
+        unlinked: bool = False,
+        weight: int = 1,
+    ) -> None:
+        for kind, key, value in transition_values(self._session, step_ids, unlinked):
+            sketch = self._sketches.setdefault((kind, key), DDSketch())
+            sketch.add(value, weight)
+            self._dirty.add((kind, key))
+
+    def remove_transitions(
+        self, step_ids: Optional[Iterable[int]] = None, unlinked: bool = False
+    ) -> None:
+        self.add_transitions(step_ids, unlinked, weight=-1)
+
+    def save(self) -> None:
+        for kind, key in self._dirty:
+            sketch = self._sketches[(kind, key)]
+            row = self._rows.get((kind, key))
+            if sketch.count <= 0:
+                if row is not None:
+                    self._session.delete(row)
+                    del self._rows[(kind, key)]
+                continue
+            if row is None:
+                row = QuantileSketch(kind=kind, project=self._project, key=key)
+                self._session.add(row)
+                self._rows[(kind, key)] = row
+            row.count = sketch.count
+            row.sketch = sketch.to_json()
+        self._dirty.clear()
+
+
+def has_sketches(session: Session) -> bool:
+    return session.execute(select(exists().select_from(QuantileSketch))).scalar()
+
+
+def merged_sketches(
+    session: Session,
+    kind: str,
+    keys: Optional[Iterable[str]] = None,
+    project: Optional[str] = None,
+) -> dict[str, DDSketch]:
+    """Stored sketches of one kind, merged across projects (or one project)."""
+    query = session.query(QuantileSketch).filter(QuantileSketch.kind == kind)
+    if keys is not None:
+        query = query.filter(QuantileSketch.key.in_(list(keys)))
+    if project is not None:
+        query = query.filter(QuantileSketch.project == project)
+
+    merged: dict[str, DDSketch] = {}
+    for row in query:
+        sketch = DDSketch.from_json(row.sketch)
+        if row.key in merged:
+            merged[row.key].merge(sketch)
+        else:
+            merged[row.key] = sketch
+    return merged
@@ -4,11 +4,36 @@ from __future__ import annotations
 
 import math
 from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, Optional
 
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy import ColumnElement, Integer, and_, case, cast, exists, func, or_, select, true
+from sqlalchemy.orm import Session, aliased
 
-from backend.models import ArbiterEvent, PullRequest, Step, Transition
+from backend.database import begin_snapshot
+from backend.downsample import downsample
+from backend.models import (
+    ArbiterEvent,
+    Handoff,
+    PullRequest,
+    Run,
+    StateRollup,
+    Step,
+    StepRollup,
+    Transition,
+)
+from backend.sketches import SKILL, STATE, DDSketch, has_sketches, merged_sketches
+
+FAILED_STATUSES = ("failed", "halted")
+
+# Percentiles reported by the duration endpoints
+PERCENTILES = (50, 90, 95, 99)
+
+# Default cap on /api/stats/duration-trend points
+DURATION_TREND_MAX_POINTS = 1000
+
+# Default page size of /api/stats/recent-failures
+RECENT_FAILURES_LIMIT = 20
 
 TARGET_STATES = [
     "CREATE_SPEC",
@@ -33,71 +58,93 @@ def _percentile(sorted_values: list[float], pct: float) -> float:
     return sorted_values[f] * (c - k) + sorted_values[c] * (k - f)
 
 
-def get_overview(db: Session) -> dict:
-    total_steps = db.query(func.count(Step.id)).scalar() or 0
-    completed = (
-        db.query(func.count(Step.id)).filter(Step.status == "completed").scalar() or 0
-    )
-    failed = (
-        db.query(func.count(Step.id))
-        .filter(Step.status.in_(["failed", "halted"]))
-        .scalar()
-        or 0
-    )
+# Verdicts counted as the arbiter resolving the problem
+ARBITER_SUCCESS_VERDICTS = (
+    "FIXED", "FIXED.",
+    "TASKS_COMPLETE", "TASKS_COMPLETE.",
+    "HANDOFF_WRITTEN", "HANDOFF_WRITTEN.",
+)
 
-    pass_rate = completed / total_steps if total_steps > 0 else 0.0
 
-    steps_with_times = (
-        db.query(Step.started_at, Step.ended_at)
-        .filter(Step.started_at.isnot(None), Step.ended_at.isnot(None))
-        .all()
-    )
-    if steps_with_times:
-        durations = [
-            (s.ended_at - s.started_at).total_seconds() for s in steps_with_times
-        ]
-        avg_step_duration_secs = sum(durations) / len(durations)
-    else:
-        avg_step_duration_secs = None
+def _count_where(condition) -> ColumnElement:
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
 
-    total_prs_merged = (
-        db.query(func.count(func.distinct(PullRequest.pr_number)))
-        .filter(PullRequest.status == "merged")
-        .scalar()
-        or 0
-    )
 
-    total_arbiter = db.query(func.count(ArbiterEvent.id)).scalar() or 0
-    total_self = (
-        db.query(func.count(Transition.id))
-        .filter(Transition.is_self_transition == True)  # noqa: E712
-        .scalar()
-        or 0
+def _arbiter_totals():
+    return select(
+        func.count(ArbiterEvent.id).label("total_arbiter_events"),
+        _count_where(ArbiterEvent.verdict.in_(ARBITER_SUCCESS_VERDICTS)).label(
+            "arbiter_resolved"
+        ),
+    ).subquery()
+
+
+def _pr_totals():
+    return select(
+        func.count(PullRequest.id).label("total_prs"),
+        func.count(
+            func.distinct(case((PullRequest.status == "merged", PullRequest.pr_number)))
+        ).label("total_prs_merged"),
+    ).subquery()
+
+
+def get_totals(db: Session) -> dict:
+    """Every headline count and average in one statement.
+
+    Each table is scanned once by an aggregate subquery that returns a single
+    row; the subqueries are cross-joined so the database returns one row.
+    """
+    steps = select(
+        func.count(Step.id).label("total_steps"),
+        _count_where(Step.status == "completed").label("completed"),
+        _count_where(Step.status.in_(FAILED_STATUSES)).label("failed"),
+        func.avg(
+            (func.julianday(Step.ended_at) - func.julianday(Step.started_at)) * 86400.0
+        ).label("avg_step_duration_secs"),
+    ).subquery()
+    transitions = select(
+        func.count(Transition.id).label("total_transitions"),
+        _count_where(Transition.is_self_transition == True).label(  # noqa: E712
+            "total_self_transitions"
+        ),
+        func.avg(Transition.dispatch_duration_secs).label("avg_dispatch_duration_secs"),
+    ).subquery()
+    arbiter = _arbiter_totals()
+    prs = _pr_totals()
+    handoffs = select(func.count(Handoff.id).label("total_handoffs")).subquery()
+    runs = select(func.count(Run.id).label("total_runs")).subquery()
+
+    query = select(
+        steps, transitions, arbiter, prs, handoffs, runs
+    ).select_from(
+        steps.join(transitions, true())
+        .join(arbiter, true())
+        .join(prs, true())
+        .join(handoffs, true())
+        .join(runs, true())
     )
+    return dict(db.execute(query).one()._mapping)
 
-    ARBITER_SUCCESS_VERDICTS = {
-        "FIXED", "FIXED.",
-        "TASKS_COMPLETE", "TASKS_COMPLETE.",
-        "HANDOFF_WRITTEN", "HANDOFF_WRITTEN.",
-    }
-    arbiter_resolved = (
-        db.query(func.count(ArbiterEvent.id))
-        .filter(ArbiterEvent.verdict.in_(ARBITER_SUCCESS_VERDICTS))
-        .scalar()
-        or 0
-    )
-    arbiter_success_rate = arbiter_resolved / total_arbiter if total_arbiter > 0 else 0.0
 
-    avg_dispatch = (
-        db.query(func.avg(Transition.dispatch_duration_secs))
-        .filter(Transition.dispatch_duration_secs.isnot(None))
-        .scalar()
+def get_overview(db: Session) -> dict:
+    return _overview(get_totals(db))
+
+
+def _overview(totals: dict) -> dict:
+    total_steps = totals["total_steps"]
+    total_arbiter = totals["total_arbiter_events"]
+
+    pass_rate = totals["completed"] / total_steps if total_steps > 0 else 0.0
+    arbiter_success_rate = (
+        totals["arbiter_resolved"] / total_arbiter if total_arbiter > 0 else 0.0
     )
+    avg_step_duration_secs = totals["avg_step_duration_secs"]
+    avg_dispatch = totals["avg_dispatch_duration_secs"]
 
     return {
         "total_steps": total_steps,
-        "completed": completed,
-        "failed": failed,
+        "completed": totals["completed"],
+        "failed": totals["failed"],
         "pass_rate": round(pass_rate, 4),
         "avg_step_duration_secs": (
             round(avg_step_duration_secs, 1)
@@ -107,21 +154,49 @@ def get_overview(db: Session) -> dict:
         "avg_dispatch_duration_secs": (
             round(avg_dispatch, 1) if avg_dispatch is not None else None
         ),
-        "total_prs_merged": total_prs_merged,
+        "total_prs_merged": totals["total_prs_merged"],
         "total_arbiter_interventions": total_arbiter,
         "arbiter_success_rate": round(arbiter_success_rate, 4),
-        "total_self_transitions": total_self,
+        "total_self_transitions": totals["total_self_transitions"],
     }
 
 
-def get_duration_trend(db: Session) -> list[dict]:
-    steps = (
-        db.query(
-            Step.step_number, Step.title, Step.started_at, Step.ended_at, Step.status
-        )
-        .order_by(Step.step_number)
-        .all()
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Drop tzinfo: timestamps are stored as naive wall-clock times."""
+    return value.replace(tzinfo=None) if value is not None else None
+
+
+def get_duration_trend(
+    db: Session,
+    max_points: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    from_step: Optional[int] = None,
+    to_step: Optional[int] = None,
+) -> list[dict]:
+    """One point per step in step order, optionally limited and downsampled.
+
+    since/until bound started_at (half-open), from_step/to_step bound the
+    step number (inclusive).  With max_points, longer series are reduced
+    with LTTB; failed and halted steps are always kept.
+    """
+    query = db.query(
+        Step.step_number, Step.title, Step.started_at, Step.ended_at, Step.status
     )
+    if since is not None:
+        query = query.filter(Step.started_at >= _naive(since))
+    if until is not None:
+        query = query.filter(Step.started_at < _naive(until))
+    if from_step is not None:
+        query = query.filter(Step.step_number >= from_step)
+    if to_step is not None:
+        query = query.filter(Step.step_number <= to_step)
+
+    return _duration_points(query.order_by(Step.step_number, Step.started_at, Step.id), max_points)
+
+
+def _duration_points(steps: Iterable, max_points: Optional[int]) -> list[dict]:
+    """Trend points for steps (in plot order), downsampled to max_points."""
     result = []
     for s in steps:
         if s.started_at and s.ended_at:
@@ -138,124 +213,394 @@ def get_duration_trend(db: Session) -> list[dict]:
                 "status": s.status,
             }
         )
+
+    if max_points is None or len(result) <= max_points:
+        return result
+
+    # Steps without a duration have nothing to plot; only failures among
+    # them are kept, and they count against the budget.
+    failed = {i for i, item in enumerate(result) if item["status"] in FAILED_STATUSES}
+    timed = [i for i, item in enumerate(result) if item["duration_secs"] is not None]
+    untimed_failed = failed.difference(timed)
+    picked = downsample(
+        [result[i]["step"] for i in timed],
+        [result[i]["duration_secs"] for i in timed],
+        max_points - len(untimed_failed),
+        keep=[j for j, i in enumerate(timed) if i in failed],
+    )
+    return [result[i] for i in sorted(untimed_failed | {timed[j] for j in picked})]
+
+
+def _rollup_range(model, bucket: str, since: Optional[datetime], until: Optional[datetime]):
+    query = select(model).where(model.grain == bucket)
+    if since is not None:
+        query = query.where(model.bucket_start >= _naive(since))
+    if until is not None:
+        query = query.where(model.bucket_start < _naive(until))
+    return query
+
+
+def get_trend(
+    db: Session,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    bucket: str = "day",
+) -> list[dict]:
+    """Per-bucket step counts, durations, arbiter attempts and merged PRs.
+
+    Read from the hourly/daily rollups only, so the cost scales with the
+    number of buckets in [since, until) rather than with raw rows.
+    """
+    rows = db.scalars(
+        _rollup_range(StepRollup, bucket, since, until).order_by(StepRollup.bucket_start)
+    )
+    return [
+        {
+            "bucket_start": r.bucket_start,
+            "steps": r.steps,
+            "completed": r.completed,
+            "failed": r.failed,
+            "halted": r.halted,
+            "avg_step_duration_secs": (
+                round(r.duration_sum_secs / r.duration_count, 1) if r.duration_count else None
+            ),
+            "arbiter_attempts": r.arbiter_attempts,
+            "prs_merged": r.prs_merged,
+        }
+        for r in rows
+    ]
+
+
+def get_state_trend(
+    db: Session,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    bucket: str = "day",
+) -> list[dict]:
+    """Per-bucket, per-state transition duration count/avg/p50/p95 from the rollups."""
+    rows = db.scalars(
+        _rollup_range(StateRollup, bucket, since, until)
+        .order_by(StateRollup.bucket_start, StateRollup.to_state)
+    )
+    result = []
+    for r in rows:
+        sketch = DDSketch.from_json(r.sketch)
+        result.append({
+            "bucket_start": r.bucket_start,
+            "state": r.to_state,
+            "count": r.count,
+            "avg": round(r.total_secs / r.count, 1),
+            "p50": round(sketch.quantile(50), 1),
+            "p95": round(sketch.quantile(95), 1),
+        })
     return result
 
 
-def get_state_durations(db: Session) -> dict[str, dict]:
-    transitions = (
-        db.query(Transition.to_state, Transition.duration_secs)
-        .filter(
-            Transition.to_state.in_(TARGET_STATES),
-            Transition.duration_secs.isnot(None),
-            Transition.is_self_transition == False,  # noqa: E712
+def _interpolated_percentile(ranked, pct: float) -> ColumnElement:
+    """Aggregate matching _percentile() over rows ranked 0..n-1 within a group.
+
+    k = (n - 1) * pct; the result is v[f] * (c - k) + v[c] * (k - f) for
+    f = floor(k), c = ceil(k), or just v[k] when k is whole.  k is never
+    negative, so CAST truncation is floor.
+    """
+    k = (ranked.c.n - 1) * (pct / 100.0)
+    f = cast(k, Integer)
+    c = f + case((k > f, 1), else_=0)
+    return func.sum(
+        case(
+            (ranked.c.rn == f, ranked.c.value * case((c == f, 1.0), else_=c - k)),
+            (ranked.c.rn == c, ranked.c.value * (k - f)),
+            else_=0.0,
         )
-        .all()
     )
 
-    by_state: dict[str, list[float]] = defaultdict(list)
-    for t in transitions:
-        by_state[t.to_state].append(t.duration_secs)
+
+def _exact_duration_stats(
+    db: Session, key_col, value_col, *conditions, project: Optional[str] = None
+) -> dict[str, dict]:
+    """count/avg/percentiles of value_col per key_col, computed in SQLite.
+
+    Ranking and interpolation use window functions, so only one row per key
+    is returned regardless of table size.
+    """
+    ranked = select(
+        key_col.label("key"),
+        value_col.label("value"),
+        (func.row_number().over(partition_by=key_col, order_by=value_col) - 1).label("rn"),
+        func.count().over(partition_by=key_col).label("n"),
+    ).where(value_col.isnot(None), *conditions)
+    if project is not None:
+        # Ingest sketches every transition in the database under its project,
+        # including ones outside any run (no step, or a step before the first
+        # run log), so those count toward the project the database holds.
+        held = aliased(Run)
+        ranked = (
+            ranked.outerjoin(Step, Transition.step_id == Step.id)
+            .outerjoin(Run, Step.run_id == Run.id)
+            .where(or_(
+                Run.project == project,
+                and_(Run.id.is_(None), exists().where(held.project == project)),
+            ))
+        )
+    ranked = ranked.subquery()
+
+    rows = db.execute(
+        select(
+            ranked.c.key,
+            func.count().label("count"),
+            func.avg(ranked.c.value).label("avg"),
+            *(_interpolated_percentile(ranked, pct).label(f"p{pct}") for pct in PERCENTILES),
+        ).group_by(ranked.c.key)
+    ).all()
+    return {row.key: row._asdict() for row in rows}
+
+
+def _sketch_duration_stats(sketches: dict[str, DDSketch]) -> dict[str, dict]:
+    return {
+        key: {
+            "count": sketch.count,
+            "avg": sketch.mean,
+            **{f"p{pct}": sketch.quantile(pct) for pct in PERCENTILES},
+        }
+        for key, sketch in sketches.items()
+    }
+
+
+def _rounded(stats: dict) -> dict:
+    return {
+        "avg": round(stats["avg"], 1),
+        **{f"p{pct}": round(stats[f"p{pct}"], 1) for pct in PERCENTILES},
+    }
+
+
+def get_state_durations(db: Session, project: Optional[str] = None) -> dict[str, dict]:
+    """avg and percentiles of non-self transition durations per target state.
+
+    Answered from the merged quantile sketches ingest maintains (within
+    sketches.RELATIVE_ACCURACY of the exact order statistics); databases
+    without sketches fall back to exact SQL.
+    """
+    if has_sketches(db):
+        by_state = _sketch_duration_stats(
+            merged_sketches(db, STATE, TARGET_STATES, project)
+        )
+    else:
+        by_state = _exact_duration_stats(
+            db, Transition.to_state, Transition.duration_secs,
+            Transition.to_state.in_(TARGET_STATES),
+            Transition.is_self_transition == False,  # noqa: E712
+            project=project,
+        )
 
     result = {}
     for state in TARGET_STATES:
-        values = sorted(by_state.get(state, []))
-        if values:
-            avg = sum(values) / len(values)
-            result[state] = {
-                "avg": round(avg, 1),
-                "p50": round(_percentile(values, 50), 1),
-                "p95": round(_percentile(values, 95), 1),
-            }
+        if state in by_state:
+            result[state] = _rounded(by_state[state])
         else:
-            result[state] = {"avg": 0.0, "p50": 0.0, "p95": 0.0}
+            result[state] = {"avg": 0.0, **{f"p{pct}": 0.0 for pct in PERCENTILES}}
     return result
 
 
-def get_failure_breakdown(db: Session) -> dict:
-    failed_steps = (
-        db.query(Step.id, Step.final_state, Step.final_verdict, Step.status)
-        .filter(Step.status.in_(["failed", "halted"]))
-        .all()
-    )
+def get_skill_latency(db: Session, project: Optional[str] = None) -> dict[str, dict]:
+    """Dispatch duration count/avg/percentiles per dispatch skill."""
+    if has_sketches(db):
+        by_skill = _sketch_duration_stats(merged_sketches(db, SKILL, project=project))
+    else:
+        by_skill = _exact_duration_stats(
+            db, Transition.dispatch_skill, Transition.dispatch_duration_secs,
+            Transition.dispatch_skill.isnot(None),
+            project=project,
+        )
+    return {
+        skill: {"count": stats["count"], **_rounded(stats)}
+        for skill, stats in sorted(by_skill.items())
+    }
 
-    by_state: dict[str, int] = defaultdict(int)
-    by_verdict: dict[str, int] = defaultdict(int)
-    for s in failed_steps:
-        if s.final_state:
-            by_state[s.final_state] += 1
-        if s.final_verdict:
-            by_verdict[s.final_verdict] += 1
-
-    self_transitions = (
-        db.query(Transition.to_state, func.count(Transition.id))
-        .filter(Transition.is_self_transition == True)  # noqa: E712
-        .group_by(Transition.to_state)
-        .all()
+
+def _step_groups(db: Session) -> list:
+    """Steps counted by status, final state, final verdict and whether the
+    arbiter stepped in, with their summed durations; one pass over steps."""
+    arbiter_steps = (
+        select(ArbiterEvent.step_id).where(ArbiterEvent.step_id.isnot(None)).distinct().subquery()
     )
-    self_transitions_by_state = {row[0]: row[1] for row in self_transitions if row[0]}
+    arbitered = arbiter_steps.c.step_id.isnot(None)
+    secs = (func.julianday(Step.ended_at) - func.julianday(Step.started_at)) * 86400.0
+    return db.execute(
+        select(
+            Step.status,
+            Step.final_state,
+            Step.final_verdict,
+            arbitered.label("arbitered"),
+            func.count(Step.id).label("steps"),
+            func.count(secs).label("timed"),
+            func.sum(secs).label("secs"),
+        )
+        .outerjoin(arbiter_steps, arbiter_steps.c.step_id == Step.id)
+        .group_by(Step.status, Step.final_state, Step.final_verdict, arbitered)
+    ).all()
+
+
+def _transition_groups(db: Session) -> list:
+    """Transitions counted by whether they are self-transitions (and then by
+    state), with their dispatch durations; one pass over transitions."""
+    self_state = case((Transition.is_self_transition == True, Transition.to_state))  # noqa: E712
+    return db.execute(
+        select(
+            Transition.is_self_transition,
+            self_state.label("self_state"),
+            func.count(Transition.id).label("transitions"),
+            func.count(Transition.dispatch_duration_secs).label("dispatched"),
+            func.sum(Transition.dispatch_duration_secs).label("dispatch_secs"),
+        ).group_by(Transition.is_self_transition, self_state)
+    ).all()
+
+
+def _grouped_totals(step_groups: list, transition_groups: list, events: dict) -> dict:
+    """The get_totals() figures _overview() reads, summed from the groups."""
+    timed = sum(g.timed for g in step_groups)
+    dispatched = sum(g.dispatched for g in transition_groups)
+    return {
+        **events,
+        "total_steps": sum(g.steps for g in step_groups),
+        "completed": sum(g.steps for g in step_groups if g.status == "completed"),
+        "failed": sum(g.steps for g in step_groups if g.status in FAILED_STATUSES),
+        "avg_step_duration_secs": (
+            sum(g.secs for g in step_groups if g.timed) / timed if timed else None
+        ),
+        "total_self_transitions": sum(
+            g.transitions for g in transition_groups if g.is_self_transition
+        ),
+        "avg_dispatch_duration_secs": (
+            sum(g.dispatch_secs for g in transition_groups if g.dispatched) / dispatched
+            if dispatched else None
+        ),
+    }
 
-    total_arbiter = db.query(func.count(ArbiterEvent.id)).scalar() or 0
-    arbiter_step_ids = [
-        row[0]
-        for row in db.query(ArbiterEvent.step_id).distinct().all()
-        if row[0] is not None
-    ]
 
-    if arbiter_step_ids:
-        resolved = (
-            db.query(func.count(Step.id))
-            .filter(Step.id.in_(arbiter_step_ids), Step.status == "completed")
-            .scalar()
-            or 0
-        )
-        halted = (
-            db.query(func.count(Step.id))
-            .filter(
-                Step.id.in_(arbiter_step_ids),
-                Step.status.in_(["failed", "halted"]),
-            )
-            .scalar()
-            or 0
-        )
-    else:
-        resolved = 0
-        halted = 0
+def _failure_breakdown(step_groups: list, transition_groups: list, interventions: int) -> dict:
+    by_state: dict[str, int] = defaultdict(int)
+    by_verdict: dict[str, int] = defaultdict(int)
+    resolved = halted = 0
+    for g in step_groups:
+        failed = g.status in FAILED_STATUSES
+        if failed and g.final_state:
+            by_state[g.final_state] += g.steps
+        if failed and g.final_verdict:
+            by_verdict[g.final_verdict] += g.steps
+        # Outcome of each step the arbiter stepped into
+        if g.arbitered:
+            resolved += g.steps if g.status == "completed" else 0
+            halted += g.steps if failed else 0
 
     return {
         "by_state": dict(by_state),
         "by_verdict": dict(by_verdict),
-        "self_transitions_by_state": self_transitions_by_state,
-        "arbiter_interventions": total_arbiter,
+        "self_transitions_by_state": {
+            g.self_state: g.transitions
+            for g in transition_groups
+            if g.is_self_transition and g.self_state
+        },
+        "arbiter_interventions": interventions,
         "arbiter_resolved": resolved,
         "arbiter_halted": halted,
     }
 
 
-def get_recent_failures(db: Session, limit: int = 20) -> list[dict]:
-    failed_steps = (
-        db.query(Step)
-        .filter(Step.status.in_(["failed", "halted"]))
-        .order_by(Step.ended_at.desc())
-        .limit(limit)
-        .all()
+def get_failure_breakdown(db: Session) -> dict:
+    """Failed/halted steps by final state and verdict, plus arbiter outcomes.
+
+    Every figure is a GROUP BY or aggregate count; no step rows are loaded.
+    """
+    return _failure_breakdown(
+        _step_groups(db),
+        _transition_groups(db),
+        db.execute(select(func.count(ArbiterEvent.id))).scalar(),
     )
 
-    result = []
-    for step in failed_steps:
-        arbiter_count = (
-            db.query(func.count(ArbiterEvent.id))
-            .filter(ArbiterEvent.step_id == step.id)
-            .scalar()
-            or 0
-        )
-        result.append(
-            {
-                "step": step.step_number,
-                "title": step.title,
-                "state": step.final_state,
-                "verdict": step.final_verdict,
-                "arbiter_attempts": arbiter_count,
-                "timestamp": step.ended_at,
-            }
+
+def get_recent_failures(
+    db: Session, limit: int = RECENT_FAILURES_LIMIT, offset: int = 0
+) -> list[dict]:
+    """Failed/halted steps, most recently ended first, with arbiter attempt counts.
+
+    One statement per page: arbiter events are counted in a grouped
+    subquery and outer-joined onto the page of steps.
+    """
+    arbiter_counts = (
+        select(ArbiterEvent.step_id, func.count(ArbiterEvent.id).label("attempts"))
+        .group_by(ArbiterEvent.step_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            Step.step_number,
+            Step.title,
+            Step.final_state,
+            Step.final_verdict,
+            Step.ended_at,
+            func.coalesce(arbiter_counts.c.attempts, 0).label("attempts"),
         )
+        .outerjoin(arbiter_counts, arbiter_counts.c.step_id == Step.id)
+        .where(Step.status.in_(FAILED_STATUSES))
+        .order_by(Step.ended_at.desc(), Step.id.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+    return [_recent_failure(row, row.attempts) for row in rows]
+
+
+def _recent_failure(step, attempts: int) -> dict:
+    return {
+        "step": step.step_number,
+        "title": step.title,
+        "state": step.final_state,
+        "verdict": step.final_verdict,
+        "arbiter_attempts": attempts,
+        "timestamp": step.ended_at,
+    }
+
+
+DASHBOARD_PANELS = (
+    "overview", "duration_trend", "state_durations", "failure_breakdown", "recent_failures",
+)
+
+
+def get_dashboard(
+    db: Session,
+    panels: Iterable[str] = DASHBOARD_PANELS,
+    max_points: Optional[int] = DURATION_TREND_MAX_POINTS,
+) -> dict:
+    """The requested dashboard panels from one snapshot, sharing table scans.
+
+    overview and failure_breakdown are both derived from one grouped pass
+    over steps, one over transitions and one aggregate statement over
+    arbiter events and PRs; no rows are loaded for them.  duration_trend
+    reads its step rows (one per point), recent_failures a LIMITed page and
+    state_durations the sketches.  Each panel matches its /api/stats
+    endpoint with default arguments; panels not requested are None and cost
+    nothing.
+    """
+    begin_snapshot(db)
+    wanted = set(panels)
+    result: dict = dict.fromkeys(DASHBOARD_PANELS)
+
+    if wanted & {"overview", "failure_breakdown"}:
+        step_groups = _step_groups(db)
+        transition_groups = _transition_groups(db)
+        arbiter, prs = _arbiter_totals(), _pr_totals()
+        events = dict(db.execute(
+            select(arbiter, prs).select_from(arbiter.join(prs, true()))
+        ).one()._mapping)
+        if "overview" in wanted:
+            result["overview"] = _overview(_grouped_totals(step_groups, transition_groups, events))
+        if "failure_breakdown" in wanted:
+            result["failure_breakdown"] = _failure_breakdown(
+                step_groups, transition_groups, events["total_arbiter_events"]
+            )
+    if "duration_trend" in wanted:
+        result["duration_trend"] = get_duration_trend(db, max_points)
+    if "state_durations" in wanted:
+        result["state_durations"] = get_state_durations(db)
+    if "recent_failures" in wanted:
+        result["recent_failures"] = get_recent_failures(db)
     return result
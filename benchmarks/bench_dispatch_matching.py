@@ -0,0 +1,99 @@
+"""Benchmark dispatch-to-transition matching on synthetic self-transition storms.
+
+Usage:
+    python -m benchmarks.bench_dispatch_matching [--transitions N] [--dispatches N]
+
+Compares backend.parser.logs.match_dispatches against the original
+per-dispatch linear scan and checks both produce the same assignment.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from backend.parser.logs import DispatchBlock, LogTransition, match_dispatches
+
+TZ = timezone(timedelta(hours=-8))
+
+
+def make_step(n_transitions: int, n_dispatches: int, seed: int = 0):
+    """One step whose transitions are mostly a dense MERGE_PRS self-loop."""
+    rng = random.Random(seed)
+    base = datetime(2026, 2, 17, 8, 0, tzinfo=TZ)
+    span = n_transitions * 2  # ~one transition every two seconds
+    transitions = [
+        LogTransition(
+            timestamp=base + timedelta(seconds=rng.randint(0, span)),
+            step_number=1,
+            from_state="MERGE_PRS",
+            to_state="MERGE_PRS",
+            is_self_transition=True,
+        )
+        for _ in range(n_transitions)
+    ]
+    dispatches = [
+        DispatchBlock(
+            skill="/work",
+            step_number=1,
+            duration_secs=float(rng.randint(10, 300)),
+            started_at=base + timedelta(seconds=rng.randint(0, span)),
+        )
+        for _ in range(n_dispatches)
+    ]
+    return transitions, dispatches
+
+
+def linear_scan(transitions, dispatches, tolerance=600):
+    """The pre-bisect algorithm: scan every transition for each dispatch."""
+    ordered = sorted(
+        range(len(transitions)),
+        key=lambda i: transitions[i].timestamp.replace(tzinfo=None),
+    )
+    taken: set[int] = set()
+    matches = {}
+    for d in dispatches:
+        if d.duration_secs is None or not d.started_at:
+            continue
+        for i in ordered:
+            if i in taken:
+                continue
+            t1 = d.started_at.replace(tzinfo=None)
+            t2 = transitions[i].timestamp.replace(tzinfo=None)
+            if abs((t1 - t2).total_seconds()) < tolerance:
+                matches[i] = d
+                taken.add(i)
+                break
+    return matches
+
+
+def _time(fn, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transitions", type=int, default=20_000)
+    parser.add_argument("--dispatches", type=int, default=5_000)
+    parser.add_argument("--skip-baseline", action="store_true", help="Only time the bisect matcher")
+    args = parser.parse_args()
+
+    transitions, dispatches = make_step(args.transitions, args.dispatches)
+    print(f"Step with {len(transitions)} transitions, {len(dispatches)} dispatches")
+
+    elapsed, fast = _time(match_dispatches, transitions, dispatches)
+    print(f"  match_dispatches:  {elapsed * 1000:9.1f} ms  ({len(fast)} matched)")
+
+    if not args.skip_baseline:
+        elapsed, slow = _time(linear_scan, transitions, dispatches)
+        print(f"  linear scan:       {elapsed * 1000:9.1f} ms  ({len(slow)} matched)")
+        assert fast == slow, "matchers disagree"
+        print("  results identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Benchmark the /api/stats and /api/stats/overview queries on a large synthetic DB.
+
+Usage:
+    python -m benchmarks.bench_stats_queries [--steps N] [--transitions-per-step N] [--repeat N]
+
+Compares stats_service.get_totals / get_overview (one statement each) against
+the original one-COUNT-per-figure queries and checks both agree.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend import stats_service
+from backend.database import create_tables, make_engine
+from backend.models import ArbiterEvent, Handoff, PullRequest, Run, Step, Transition
+
+STATUSES = ["completed"] * 8 + ["failed", "halted"]
+STATES = stats_service.TARGET_STATES
+VERDICTS = ["FIXED", "TASKS_COMPLETE", "MERGE_BLOCKED", "CI_FAILED"]
+
+
+def build_db(path: Path, n_steps: int, per_step: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    engine = make_engine(path)
+    create_tables(engine)
+    base = datetime(2026, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Run.__table__),
+            [{"project": "bench", "log_file": f"order-run-{i}.log"} for i in range(n_steps // 50 + 1)],
+        )
+        steps = []
+        for i in range(n_steps):
+            start = base + timedelta(minutes=30 * i)
+            steps.append({
+                "run_id": i // 50 + 1,
+                "step_number": i + 1,
+                "status": rng.choice(STATUSES),
+                "started_at": start,
+                "ended_at": start + timedelta(seconds=rng.randint(60, 3600)),
+                "tasks_total": 0,
+                "tasks_completed": 0,
+            })
+        conn.execute(insert(Step.__table__), steps)
+        conn.execute(
+            insert(Transition.__table__),
+            [
+                {
+                    "step_id": i + 1,
+                    "to_state": rng.choice(STATES),
+                    "is_self_transition": rng.random() < 0.2,
+                    "dispatch_duration_secs": rng.uniform(5, 600) if rng.random() < 0.5 else None,
+                }
+                for i in range(n_steps)
+                for _ in range(per_step)
+            ],
+        )
+        conn.execute(
+            insert(ArbiterEvent.__table__),
+            [{"step_id": rng.randint(1, n_steps), "verdict": rng.choice(VERDICTS)} for _ in range(n_steps // 2)],
+        )
+        conn.execute(
+            insert(PullRequest.__table__),
+            [
+                {"step_id": i // 3 + 1, "pr_number": i, "status": rng.choice(["merged", "open"])}
+                for i in range(n_steps * 3)
+            ],
+        )
+        conn.execute(
+            insert(Handoff.__table__),
+            [{"step_id": i + 1, "step_number": i + 1} for i in range(0, n_steps, 2)],
+        )
+        conn.exec_driver_sql("ANALYZE")
+    engine.dispose()
+
+
+def baseline_totals(db: Session) -> dict:
+    """The original /api/stats plus get_overview: one query per figure."""
+    failed = ["failed", "halted"]
+    steps = db.query(Step.started_at, Step.ended_at).filter(
+        Step.started_at.isnot(None), Step.ended_at.isnot(None)
+    ).all()
+    durations = [(s.ended_at - s.started_at).total_seconds() for s in steps]
+    return {
+        "total_steps": db.query(func.count(Step.id)).scalar(),
+        "completed": db.query(func.count(Step.id)).filter(Step.status == "completed").scalar(),
+        "failed": db.query(func.count(Step.id)).filter(Step.status.in_(failed)).scalar(),
+        "avg_step_duration_secs": sum(durations) / len(durations) if durations else None,
+        "total_transitions": db.query(func.count(Transition.id)).scalar(),
+        "total_self_transitions": db.query(func.count(Transition.id))
+        .filter(Transition.is_self_transition == True).scalar(),  # noqa: E712
+        "avg_dispatch_duration_secs": db.query(func.avg(Transition.dispatch_duration_secs))
+        .filter(Transition.dispatch_duration_secs.isnot(None)).scalar(),
+        "total_arbiter_events": db.query(func.count(ArbiterEvent.id)).scalar(),
+        "arbiter_resolved": db.query(func.count(ArbiterEvent.id))
+        .filter(ArbiterEvent.verdict.in_(stats_service.ARBITER_SUCCESS_VERDICTS)).scalar(),
+        "total_prs": db.query(func.count(PullRequest.id)).scalar(),
+        "total_prs_merged": db.query(func.count(func.distinct(PullRequest.pr_number)))
+        .filter(PullRequest.status == "merged").scalar(),
+        "total_handoffs": db.query(func.count(Handoff.id)).scalar(),
+        "total_runs": db.query(func.count(Run.id)).scalar(),
+    }
+
+
+def _median_ms(fn, db: Session, repeat: int) -> tuple[float, dict]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(db)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=20_000)
+    parser.add_argument("--transitions-per-step", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+        build_db(path, args.steps, args.transitions_per_step)
+        print(f"DB with {args.steps} steps, {args.steps * args.transitions_per_step} transitions")
+
+        engine = make_engine(path, read_only=True)
+        db = sessionmaker(bind=engine)()
+        elapsed, fast = _median_ms(stats_service.get_totals, db, args.repeat)
+        print(f"  get_totals (1 statement):  {elapsed:9.1f} ms")
+        elapsed, slow = _median_ms(baseline_totals, db, args.repeat)
+        print(f"  per-figure queries (13):   {elapsed:9.1f} ms")
+        db.close()
+        engine.dispose()
+
+    for key, value in slow.items():
+        if isinstance(value, float):
+            assert abs(fast[key] - value) < 0.01, key
+        else:
+            assert fast[key] == value, key
+    print("  results identical")
+
+
+if __name__ == "__main__":
+    main()
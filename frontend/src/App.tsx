@@ -1,23 +1,32 @@
 import { QueryClient, QueryClientProvider } from '@tanstack/react-query'
 import { BrowserRouter, Routes, Route } from 'react-router-dom'
+import { useDataChanges } from './api/useDataChanges'
 import Layout from './components/Layout'
 import DashboardPage from './pages/DashboardPage'
 import LivePage from './pages/LivePage'
 import RunDetailPage from './pages/RunDetailPage'
 import StepDetailPage from './pages/StepDetailPage'
 
+// Data only changes on ingest, and the server says when (see useDataChanges)
 const queryClient = new QueryClient({
   defaultOptions: {
     queries: {
-      staleTime: 30_000,
+      staleTime: Infinity,
+      refetchOnWindowFocus: false,
       retry: 1,
     },
   },
 })
 
+function DataChangeListener() {
+  useDataChanges()
+  return null
+}
+
 function App() {
   return (
     <QueryClientProvider client={queryClient}>
+      <DataChangeListener />
       <BrowserRouter>
         <Layout>
           <Routes>
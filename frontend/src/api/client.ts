@@ -1,14 +1,14 @@
 import type {
   RunSummary,
+  RunFilters,
+  RunPage,
+  RunFull,
   StepSummary,
   StepDetail,
+  StepFull,
   HandoffOut,
   StatsOverview,
-  EnhancedStatsOverview,
-  DurationTrendItem,
-  StateDurationStats,
-  FailureBreakdown,
-  RecentFailureItem,
+  Dashboard,
   LiveSnapshot,
 } from '../types'
 
@@ -22,14 +22,43 @@ async function fetchJson<T>(path: string): Promise<T> {
   return response.json() as Promise<T>
 }
 
+function queryString(params: Record<string, string | null | undefined>): string {
+  const search = new URLSearchParams()
+  for (const [key, value] of Object.entries(params)) {
+    if (value) search.set(key, value)
+  }
+  const query = search.toString()
+  return query ? `?${query}` : ''
+}
+
+async function fetchText(path: string): Promise<string> {
+  const response = await fetch(`${BASE_URL}${path}`)
+  if (!response.ok) {
+    throw new Error(`API error: ${response.status} ${response.statusText}`)
+  }
+  return response.text()
+}
+
 export function fetchRuns(): Promise<RunSummary[]> {
   return fetchJson<RunSummary[]>('/runs')
 }
 
+export async function fetchRunPage(filters: RunFilters = {}, cursor: string | null = null): Promise<RunPage> {
+  const response = await fetch(`${BASE_URL}/runs${queryString({ ...filters, cursor })}`)
+  if (!response.ok) {
+    throw new Error(`API error: ${response.status} ${response.statusText}`)
+  }
+  return { runs: await response.json(), nextCursor: response.headers.get('X-Next-Cursor') }
+}
+
 export function fetchRun(id: number): Promise<RunSummary> {
   return fetchJson<RunSummary>(`/runs/${id}`)
 }
 
+export function fetchRunFull(id: number): Promise<RunFull> {
+  return fetchJson<RunFull>(`/runs/${id}/full`)
+}
+
 export function fetchRunSteps(runId: number): Promise<StepSummary[]> {
   return fetchJson<StepSummary[]>(`/runs/${runId}/steps`)
 }
@@ -38,32 +67,28 @@ export function fetchStepDetail(runId: number, stepNumber: number): Promise<Step
   return fetchJson<StepDetail>(`/runs/${runId}/steps/${stepNumber}`)
 }
 
-export function fetchStepHandoff(runId: number, stepNumber: number): Promise<HandoffOut> {
-  return fetchJson<HandoffOut>(`/runs/${runId}/steps/${stepNumber}/handoff`)
+export function fetchStepFull(runId: number, stepNumber: number): Promise<StepFull> {
+  return fetchJson<StepFull>(`/runs/${runId}/steps/${stepNumber}/full`)
 }
 
-export function fetchStats(): Promise<StatsOverview> {
-  return fetchJson<StatsOverview>('/stats')
-}
-
-export function fetchStatsOverview(): Promise<EnhancedStatsOverview> {
-  return fetchJson<EnhancedStatsOverview>('/stats/overview')
+export function fetchStepHandoff(runId: number, stepNumber: number): Promise<HandoffOut> {
+  return fetchJson<HandoffOut>(`/runs/${runId}/steps/${stepNumber}/handoff`)
 }
 
-export function fetchDurationTrend(): Promise<DurationTrendItem[]> {
-  return fetchJson<DurationTrendItem[]>('/stats/duration-trend')
+export function fetchDispatchContent(transitionId: number): Promise<string> {
+  return fetchText(`/transitions/${transitionId}/dispatch`)
 }
 
-export function fetchStateDurations(): Promise<Record<string, StateDurationStats>> {
-  return fetchJson<Record<string, StateDurationStats>>('/stats/state-durations')
+export function fetchStats(): Promise<StatsOverview> {
+  return fetchJson<StatsOverview>('/stats')
 }
 
-export function fetchFailureBreakdown(): Promise<FailureBreakdown> {
-  return fetchJson<FailureBreakdown>('/stats/failure-breakdown')
-}
+// The server downsamples longer histories, always keeping failed/halted steps
+export const DURATION_TREND_MAX_POINTS = 500
 
-export function fetchRecentFailures(): Promise<RecentFailureItem[]> {
-  return fetchJson<RecentFailureItem[]>('/stats/recent-failures')
+// Every dashboard panel in one request, read from one database snapshot
+export function fetchDashboard(maxPoints = DURATION_TREND_MAX_POINTS): Promise<Dashboard> {
+  return fetchJson<Dashboard>(`/dashboard?max_points=${maxPoints}`)
 }
 
 export function fetchLiveSnapshot(): Promise<LiveSnapshot> {
@@ -1,17 +1,18 @@
-import { useQuery } from '@tanstack/react-query'
+import { keepPreviousData, useInfiniteQuery, useQuery } from '@tanstack/react-query'
 import {
   fetchRuns,
+  fetchRunPage,
   fetchRun,
+  fetchRunFull,
   fetchRunSteps,
   fetchStepDetail,
+  fetchStepFull,
   fetchStepHandoff,
-  fetchStatsOverview,
-  fetchDurationTrend,
-  fetchStateDurations,
-  fetchFailureBreakdown,
-  fetchRecentFailures,
+  fetchDispatchContent,
+  fetchDashboard,
   fetchLiveSnapshot,
 } from './client'
+import type { Dashboard, RunFilters } from '../types'
 
 export function useRuns() {
   return useQuery({
@@ -20,6 +21,16 @@ export function useRuns() {
   })
 }
 
+export function useRunPages(filters: RunFilters = {}) {
+  return useInfiniteQuery({
+    queryKey: ['runs', 'pages', filters],
+    queryFn: ({ pageParam }) => fetchRunPage(filters, pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.nextCursor,
+    placeholderData: keepPreviousData,
+  })
+}
+
 export function useRun(id: number) {
   return useQuery({
     queryKey: ['runs', id],
@@ -28,6 +39,14 @@ export function useRun(id: number) {
   })
 }
 
+export function useRunFull(id: number) {
+  return useQuery({
+    queryKey: ['runs', id, 'full'],
+    queryFn: () => fetchRunFull(id),
+    enabled: id > 0,
+  })
+}
+
 export function useRunSteps(runId: number) {
   return useQuery({
     queryKey: ['runs', runId, 'steps'],
@@ -44,6 +63,14 @@ export function useStepDetail(runId: number, stepNumber: number) {
   })
 }
 
+export function useStepFull(runId: number, stepNumber: number) {
+  return useQuery({
+    queryKey: ['runs', runId, 'steps', stepNumber, 'full'],
+    queryFn: () => fetchStepFull(runId, stepNumber),
+    enabled: runId > 0 && stepNumber > 0,
+  })
+}
+
 export function useStepHandoff(runId: number, stepNumber: number) {
   return useQuery({
     queryKey: ['runs', runId, 'steps', stepNumber, 'handoff'],
@@ -53,46 +80,49 @@ export function useStepHandoff(runId: number, stepNumber: number) {
   })
 }
 
-export function useStatsOverview() {
+export function useDispatchContent(transitionId: number, enabled: boolean) {
   return useQuery({
-    queryKey: ['stats', 'overview'],
-    queryFn: fetchStatsOverview,
+    queryKey: ['transitions', transitionId, 'dispatch'],
+    queryFn: () => fetchDispatchContent(transitionId),
+    enabled: enabled && transitionId > 0,
+    staleTime: Infinity,
   })
 }
 
-export function useDurationTrend() {
+// The dashboard panels share one /api/dashboard query, so a page showing all
+// of them makes a single request; each hook selects its own panel.
+function useDashboard<T>(select: (dashboard: Dashboard) => T) {
   return useQuery({
-    queryKey: ['stats', 'duration-trend'],
-    queryFn: fetchDurationTrend,
+    queryKey: ['stats', 'dashboard'],
+    queryFn: () => fetchDashboard(),
+    select,
   })
 }
 
+export function useStatsOverview() {
+  return useDashboard((d) => d.overview!)
+}
+
+export function useDurationTrend() {
+  return useDashboard((d) => d.duration_trend!)
+}
+
 export function useStateDurations() {
-  return useQuery({
-    queryKey: ['stats', 'state-durations'],
-    queryFn: fetchStateDurations,
-  })
+  return useDashboard((d) => d.state_durations!)
 }
 
 export function useFailureBreakdown() {
-  return useQuery({
-    queryKey: ['stats', 'failure-breakdown'],
-    queryFn: fetchFailureBreakdown,
-  })
+  return useDashboard((d) => d.failure_breakdown!)
 }
 
 export function useRecentFailures() {
-  return useQuery({
-    queryKey: ['stats', 'recent-failures'],
-    queryFn: fetchRecentFailures,
-  })
+  return useDashboard((d) => d.recent_failures!)
 }
 
 export function useLiveSnapshot() {
   return useQuery({
     queryKey: ['live', 'snapshot'],
     queryFn: fetchLiveSnapshot,
-    refetchInterval: 10_000,
     retry: false,
   })
 }
@@ -0,0 +1,46 @@
+import { describe, it, expect } from 'vitest'
+import { QueryClient } from '@tanstack/react-query'
+import { invalidateChanged } from './useDataChanges'
+import type { DataChangedEvent } from '../types'
+
+const KEYS = [
+  ['runs'],
+  ['runs', 'pages', {}],
+  ['runs', 1],
+  ['runs', 1, 'steps', 5, 'full'],
+  ['runs', 2],
+  ['runs', 2, 'steps', 7],
+  ['stats', 'dashboard'],
+  ['transitions', 9, 'dispatch'],
+  ['live', 'snapshot'],
+]
+
+function stale(event: Partial<DataChangedEvent>): string[] {
+  const client = new QueryClient()
+  for (const key of KEYS) client.setQueryData(key, {})
+  invalidateChanged(client, {
+    type: 'data_changed', generation: 2, runs: [], steps: [], stats: true, ...event,
+  })
+  return KEYS.filter((key) => client.getQueryState(key)?.isInvalidated).map((key) => JSON.stringify(key))
+}
+
+describe('invalidateChanged', () => {
+  it('invalidates only the changed runs and steps', () => {
+    expect(stale({ runs: [1], steps: [5] })).toEqual([
+      '["runs"]',
+      '["runs","pages",{}]',
+      '["runs",1]',
+      '["runs",1,"steps",5,"full"]',
+      '["stats","dashboard"]',
+      '["transitions",9,"dispatch"]',
+    ])
+  })
+
+  it('invalidates only stats when no run or step changed', () => {
+    expect(stale({})).toEqual(['["stats","dashboard"]'])
+  })
+
+  it('invalidates all ingested data after a rebuild', () => {
+    expect(stale({ runs: null, steps: null })).toHaveLength(KEYS.length - 1)
+  })
+})
@@ -0,0 +1,93 @@
+import { useEffect } from 'react'
+import { useQueryClient, type QueryClient } from '@tanstack/react-query'
+import type { DataChangedEvent } from '../types'
+
+const SSE_URL = '/api/live/events?types=data_changed'
+const RECONNECT_DELAYS = [1000, 2000, 5000, 10000, 30000]
+
+// Invalidate just the queries an ingest commit made stale
+export function invalidateChanged(queryClient: QueryClient, event: DataChangedEvent) {
+  if (event.stats) {
+    queryClient.invalidateQueries({ queryKey: ['stats'] })
+  }
+  if (event.runs === null || event.steps === null) {
+    queryClient.invalidateQueries({ queryKey: ['runs'] })
+    queryClient.invalidateQueries({ queryKey: ['transitions'] })
+    return
+  }
+  if (event.runs.length > 0) {
+    // Run lists show each run's step counts
+    queryClient.invalidateQueries({ queryKey: ['runs'], exact: true })
+    queryClient.invalidateQueries({ queryKey: ['runs', 'pages'] })
+    for (const runId of event.runs) {
+      queryClient.invalidateQueries({ queryKey: ['runs', runId] })
+    }
+  }
+  if (event.steps.length > 0) {
+    const steps = new Set(event.steps)
+    queryClient.invalidateQueries({
+      predicate: ({ queryKey }) =>
+        queryKey[0] === 'runs' && queryKey[2] === 'steps' && steps.has(queryKey[3] as number),
+    })
+    // Rebuilt steps get new transition IDs
+    queryClient.invalidateQueries({ queryKey: ['transitions'] })
+  }
+}
+
+// Keeps REST data fresh by listening for the server's data_changed events
+// instead of polling or refetching on focus.
+export function useDataChanges(enabled: boolean = true) {
+  const queryClient = useQueryClient()
+
+  useEffect(() => {
+    if (!enabled) return
+
+    let es: EventSource | null = null
+    let retryTimer: ReturnType<typeof setTimeout> | undefined
+    let retryCount = 0
+    let wasConnected = false
+    let lastGeneration: number | null = null
+    let closed = false
+
+    function handleChange(e: MessageEvent) {
+      let event: DataChangedEvent
+      try {
+        event = JSON.parse(e.data)
+      } catch {
+        return
+      }
+      // Any other generation means commits we weren't told about
+      if (lastGeneration !== null && event.generation !== lastGeneration + 1) {
+        queryClient.invalidateQueries()
+      } else {
+        invalidateChanged(queryClient, event)
+      }
+      lastGeneration = event.generation
+    }
+
+    function connect() {
+      es = new EventSource(SSE_URL)
+      es.onopen = () => {
+        // data_changed events are not replayed, so refetch what we may have missed
+        if (wasConnected) queryClient.invalidateQueries()
+        wasConnected = true
+        retryCount = 0
+      }
+      es.onerror = () => {
+        es?.close()
+        if (closed) return
+        const delay = RECONNECT_DELAYS[Math.min(retryCount, RECONNECT_DELAYS.length - 1)]
+        retryCount++
+        retryTimer = setTimeout(connect, delay)
+      }
+      es.addEventListener('data_changed', handleChange)
+    }
+
+    connect()
+    return () => {
+      closed = true
+      clearTimeout(retryTimer)
+      es?.close()
+    }
+  }, [enabled, queryClient])
+}
@@ -60,27 +60,21 @@ export function useEventStream(enabled: boolean = true) {
         return
       }
 
-      // Gap detection — if we missed events, force refetch everything
+      // Gap detection — if we missed events, refetch the snapshot
       if (event.seq - lastSeqRef.current > 1 && lastSeqRef.current > 0) {
-        queryClient.invalidateQueries()
+        queryClient.invalidateQueries({ queryKey: ['live'] })
       }
 
       lastSeqRef.current = event.seq
       setLastEvent(event)
       setEvents((prev) => [...prev.slice(-199), event])
 
-      // Selectively invalidate React Query cache
+      // Ingested data is refreshed by data_changed events (useDataChanges)
       switch (event.type) {
         case 'state_transition':
         case 'step_start':
         case 'step_complete':
           queryClient.invalidateQueries({ queryKey: ['live', 'snapshot'] })
-          queryClient.invalidateQueries({ queryKey: ['steps'] })
-          queryClient.invalidateQueries({ queryKey: ['stats'] })
-          queryClient.invalidateQueries({ queryKey: ['runs'] })
-          break
-        case 'pr_status':
-          queryClient.invalidateQueries({ queryKey: ['steps'] })
           break
       }
     }
@@ -1,45 +1,71 @@
 import { describe, it, expect } from 'vitest'
 import { render, screen } from '@testing-library/react'
 import userEvent from '@testing-library/user-event'
+import { QueryClient, QueryClientProvider } from '@tanstack/react-query'
+import { http, HttpResponse } from 'msw'
 import DispatchViewer from './DispatchViewer'
+import { server } from '../test/server'
+
+function renderWithQuery(ui: React.ReactElement) {
+  const client = new QueryClient({
+    defaultOptions: { queries: { retry: false } },
+  })
+  return render(
+    <QueryClientProvider client={client}>{ui}</QueryClientProvider>
+  )
+}
 
 describe('DispatchViewer', () => {
   it('renders skill name in collapsed state', () => {
-    render(<DispatchViewer skill="/parse-roadmap" durationSecs={45} content="output text" />)
+    renderWithQuery(<DispatchViewer transitionId={1} skill="/parse-roadmap" durationSecs={45} contentLength={11} />)
     expect(screen.getByText('/parse-roadmap')).toBeInTheDocument()
     expect(screen.getByText('(45s)')).toBeInTheDocument()
   })
 
-  it('does not show content when collapsed', () => {
-    render(<DispatchViewer skill="/parse-roadmap" durationSecs={45} content="output text" />)
+  it('does not fetch content while collapsed', () => {
+    let requests = 0
+    server.use(
+      http.get('/api/transitions/:id/dispatch', () => {
+        requests += 1
+        return HttpResponse.text('output text')
+      }),
+    )
+    renderWithQuery(<DispatchViewer transitionId={1} skill="/parse-roadmap" durationSecs={45} contentLength={11} />)
     expect(screen.queryByText('output text')).not.toBeInTheDocument()
+    expect(requests).toBe(0)
   })
 
-  it('expands to show dispatch content on click', async () => {
+  it('fetches and shows dispatch content on expand', async () => {
     const user = userEvent.setup()
-    render(<DispatchViewer skill="/parse-roadmap" durationSecs={45} content="output text" />)
+    server.use(
+      http.get('/api/transitions/:id/dispatch', () => HttpResponse.text('output text')),
+    )
+    renderWithQuery(<DispatchViewer transitionId={1} skill="/parse-roadmap" durationSecs={45} contentLength={11} />)
     await user.click(screen.getByRole('button'))
-    expect(screen.getByText('output text')).toBeInTheDocument()
+    expect(await screen.findByText('output text')).toBeInTheDocument()
   })
 
-  it('shows not-available message when content is null', async () => {
+  it('shows not-available message when there is no content', async () => {
     const user = userEvent.setup()
-    render(<DispatchViewer skill="/parse-roadmap" durationSecs={null} content={null} />)
+    renderWithQuery(<DispatchViewer transitionId={1} skill="/parse-roadmap" durationSecs={null} contentLength={null} />)
     await user.click(screen.getByRole('button'))
     expect(screen.getByText('Dispatch content not available.')).toBeInTheDocument()
   })
 
   it('renders content in a pre block', async () => {
     const user = userEvent.setup()
-    render(<DispatchViewer skill="/parse-roadmap" durationSecs={45} content="log output" />)
+    server.use(
+      http.get('/api/transitions/:id/dispatch', () => HttpResponse.text('log output')),
+    )
+    renderWithQuery(<DispatchViewer transitionId={1} skill="/parse-roadmap" durationSecs={45} contentLength={10} />)
     await user.click(screen.getByRole('button'))
-    const code = screen.getByText('log output')
+    const code = await screen.findByText('log output')
     expect(code.closest('pre')).not.toBeNull()
   })
 
   it('is keyboard accessible', async () => {
     const user = userEvent.setup()
-    render(<DispatchViewer skill="/parse-roadmap" durationSecs={45} content="output" />)
+    renderWithQuery(<DispatchViewer transitionId={1} skill="/parse-roadmap" durationSecs={45} contentLength={6} />)
     const button = screen.getByRole('button')
     expect(button).toHaveAttribute('aria-expanded', 'false')
     button.focus()
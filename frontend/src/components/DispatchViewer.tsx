@@ -1,14 +1,18 @@
 import { useState } from 'react'
+import { useDispatchContent } from '../api/hooks'
 import { formatDuration } from '../utils'
 
 interface DispatchViewerProps {
+  transitionId: number
   skill: string
   durationSecs: number | null
-  content: string | null
+  contentLength: number | null
 }
 
-export default function DispatchViewer({ skill, durationSecs, content }: DispatchViewerProps) {
+export default function DispatchViewer({ transitionId, skill, durationSecs, contentLength }: DispatchViewerProps) {
   const [expanded, setExpanded] = useState(false)
+  // Content is fetched on first expand, not shipped with the transition
+  const { data: content, isLoading } = useDispatchContent(transitionId, expanded && !!contentLength)
 
   return (
     <div className="rounded border border-gray-200 dark:border-gray-700 bg-white dark:bg-gray-900 mt-2">
@@ -30,7 +34,9 @@ export default function DispatchViewer({ skill, durationSecs, content }: Dispatc
       </button>
       {expanded && (
         <div className="border-t border-gray-100 dark:border-gray-800 p-2">
-          {content ? (
+          {isLoading ? (
+            <p className="text-xs text-gray-400 italic px-2 py-1">Loading dispatch...</p>
+          ) : content ? (
             <pre className="bg-gray-900 text-gray-100 p-4 rounded text-sm font-mono overflow-x-auto whitespace-pre-wrap max-h-96 overflow-y-auto">
               <code>{content}</code>
             </pre>
@@ -1,9 +1,12 @@
 import { useStepHandoff } from '../api/hooks'
 import { parseJsonArray } from '../utils'
+import type { HandoffOut } from '../types'
 
 interface HandoffViewerProps {
   runId: number
   stepNumber: number
+  /** Handoff already loaded by the page (null: none); skips the request */
+  handoff?: HandoffOut | null
 }
 
 function renderItem(item: unknown, i: number): React.ReactNode {
@@ -31,8 +34,12 @@ function HandoffSection({ title, json }: { title: string; json: string | null })
   )
 }
 
-export default function HandoffViewer({ runId, stepNumber }: HandoffViewerProps) {
-  const { data: handoff, isLoading, error } = useStepHandoff(runId, stepNumber)
+export default function HandoffViewer({ runId, stepNumber, handoff: preloaded }: HandoffViewerProps) {
+  const loaded = preloaded !== undefined
+  const query = useStepHandoff(loaded ? 0 : runId, stepNumber)
+  const handoff = loaded ? preloaded : query.data
+  const isLoading = !loaded && query.isLoading
+  const error = !loaded && query.error
 
   if (isLoading) {
     return <p className="text-sm text-gray-500 dark:text-gray-400">Loading handoff...</p>
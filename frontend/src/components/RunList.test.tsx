@@ -2,6 +2,10 @@ import { describe, it, expect } from 'vitest'
 import { render, screen } from '@testing-library/react'
 import { QueryClient, QueryClientProvider } from '@tanstack/react-query'
 import { MemoryRouter } from 'react-router-dom'
+import { http, HttpResponse } from 'msw'
+import userEvent from '@testing-library/user-event'
+import { server } from '../test/server'
+import { makeRun } from '../test/handlers'
 import RunList from './RunList'
 
 function renderWithProviders(ui: React.ReactElement, initialRoute = '/') {
@@ -39,4 +43,33 @@ describe('RunList', () => {
     const link = screen.getByRole('link')
     expect(link).toHaveAttribute('href', '/runs/1')
   })
+
+  it('loads the next page from the cursor header', async () => {
+    server.use(
+      http.get('/api/runs', ({ request }) => {
+        const cursor = new URL(request.url).searchParams.get('cursor')
+        if (cursor === 'page-2') {
+          return HttpResponse.json([makeRun({ id: 2, project: 'older-project' })])
+        }
+        return HttpResponse.json([makeRun()], { headers: { 'X-Next-Cursor': 'page-2' } })
+      })
+    )
+    renderWithProviders(<RunList />)
+    await userEvent.click(await screen.findByRole('button', { name: 'Load more runs' }))
+    expect(await screen.findByText(/older-project/)).toBeInTheDocument()
+    expect(screen.queryByRole('button', { name: 'Load more runs' })).not.toBeInTheDocument()
+  })
+
+  it('filters by status on the server', async () => {
+    server.use(
+      http.get('/api/runs', ({ request }) => {
+        const status = new URL(request.url).searchParams.get('status')
+        return HttpResponse.json(status === 'halted' ? [] : [makeRun()])
+      })
+    )
+    renderWithProviders(<RunList />)
+    await screen.findByText(/my-project/)
+    await userEvent.click(screen.getByRole('button', { name: 'Halted' }))
+    expect(await screen.findByText('0 of 0 runs')).toBeInTheDocument()
+  })
 })
@@ -1,6 +1,6 @@
 import { useState } from 'react'
 import { Link, useParams } from 'react-router-dom'
-import { useRuns } from '../api/hooks'
+import { useRunPages } from '../api/hooks'
 import { formatTimestamp } from '../utils'
 import StatusBadge from './StatusBadge'
 import Skeleton from './Skeleton'
@@ -16,8 +16,11 @@ const STATUS_FILTERS: { value: StatusFilter; label: string }[] = [
 export default function RunList() {
   const { runId } = useParams<{ runId: string }>()
   const selectedId = runId ? Number(runId) : null
-  const { data: runs, isLoading, error } = useRuns()
   const [statusFilter, setStatusFilter] = useState<StatusFilter>('all')
+  const { data, isLoading, error, hasNextPage, fetchNextPage, isFetchingNextPage } = useRunPages(
+    statusFilter === 'all' ? {} : { status: statusFilter },
+  )
+  const runs = data?.pages.flatMap((page) => page.runs)
   const [hideEmpty, setHideEmpty] = useState(true)
   const [search, setSearch] = useState('')
 
@@ -39,13 +42,12 @@ export default function RunList() {
     return <p className="p-4 text-sm text-red-600">Failed to load runs.</p>
   }
 
-  if (!runs || runs.length === 0) {
+  if (!runs || (runs.length === 0 && statusFilter === 'all')) {
     return <p className="p-4 text-sm text-gray-500">No runs found.</p>
   }
 
   const q = search.toLowerCase()
   const filtered = runs.filter((run) => {
-    if (statusFilter !== 'all' && run.status !== statusFilter) return false
     if (hideEmpty && run.steps_attempted === 0) return false
     if (q && !(run.project ?? '').toLowerCase().includes(q) && !String(run.id).includes(q)) return false
     return true
@@ -121,6 +123,16 @@ export default function RunList() {
           )
         })}
       </ul>
+      {hasNextPage && (
+        <button
+          type="button"
+          onClick={() => fetchNextPage()}
+          disabled={isFetchingNextPage}
+          className="w-full px-4 py-2 text-xs font-medium text-blue-600 dark:text-blue-400 hover:bg-gray-50 dark:hover:bg-gray-800 disabled:text-gray-400"
+        >
+          {isFetchingNextPage ? 'Loading...' : 'Load more runs'}
+        </button>
+      )}
     </div>
   )
 }
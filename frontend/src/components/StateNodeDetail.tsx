@@ -70,11 +70,12 @@ export default function StateNodeDetail({ state, transitions, arbiterEvents }: S
                   ))}
                 </ul>
               )}
-              {t.dispatch_skill && t.dispatch_content && (
+              {t.dispatch_skill && !!t.dispatch_content_length && (
                 <DispatchViewer
+                  transitionId={t.id}
                   skill={t.dispatch_skill}
                   durationSecs={t.dispatch_duration_secs}
-                  content={t.dispatch_content}
+                  contentLength={t.dispatch_content_length}
                 />
               )}
             </li>
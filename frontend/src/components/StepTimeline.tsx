@@ -2,16 +2,22 @@ import { useRunSteps } from '../api/hooks'
 import { formatDuration, computeStepDuration, formatTimestamp } from '../utils'
 import StepCard from './StepCard'
 import Skeleton from './Skeleton'
+import type { StepSummary } from '../types'
 
 interface StepTimelineProps {
   runId: number
+  /** Steps already loaded by the page; skips the separate steps request */
+  steps?: StepSummary[]
   runStatus?: string | null
   runStartedAt?: string | null
   runEndedAt?: string | null
 }
 
-export default function StepTimeline({ runId, runStatus, runStartedAt, runEndedAt }: StepTimelineProps) {
-  const { data: steps, isLoading, error } = useRunSteps(runId)
+export default function StepTimeline({ runId, steps: preloaded, runStatus, runStartedAt, runEndedAt }: StepTimelineProps) {
+  const query = useRunSteps(preloaded ? 0 : runId)
+  const steps = preloaded ?? query.data
+  const isLoading = !preloaded && query.isLoading
+  const error = !preloaded && query.error
 
   if (isLoading) {
     return (
@@ -1,5 +1,5 @@
 import { useParams } from 'react-router-dom'
-import { useRun, useRunSteps } from '../api/hooks'
+import { useRunFull } from '../api/hooks'
 import { formatDuration, computeStepDuration, formatTimestamp } from '../utils'
 import Breadcrumb from '../components/Breadcrumb'
 import StatusBadge from '../components/StatusBadge'
@@ -9,8 +9,7 @@ import StepTimeline from '../components/StepTimeline'
 export default function RunDetailPage() {
   const { runId } = useParams<{ runId: string }>()
   const id = Number(runId)
-  const { data: run, isLoading, error } = useRun(isNaN(id) ? 0 : id)
-  const { data: steps } = useRunSteps(isNaN(id) ? 0 : id)
+  const { data: run, isLoading, error } = useRunFull(isNaN(id) ? 0 : id)
 
   if (isNaN(id)) {
     return <p className="text-red-600">Invalid run ID.</p>
@@ -69,6 +68,7 @@ export default function RunDetailPage() {
 
       <StepTimeline
         runId={id}
+        steps={run.steps}
         runStatus={run.status}
         runStartedAt={run.started_at}
         runEndedAt={run.ended_at}
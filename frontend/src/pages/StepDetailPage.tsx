@@ -1,6 +1,6 @@
 import { useState } from 'react'
 import { useParams } from 'react-router-dom'
-import { useRun, useStepDetail } from '../api/hooks'
+import { useStepFull } from '../api/hooks'
 import Breadcrumb from '../components/Breadcrumb'
 import StepDetailHeader from '../components/StepDetailHeader'
 import StateFlowPipeline from '../components/StateFlowPipeline'
@@ -11,8 +11,7 @@ export default function StepDetailPage() {
   const { runId, stepNumber } = useParams<{ runId: string; stepNumber: string }>()
   const sn = Number(stepNumber)
   const rid = Number(runId)
-  const { data: step, isLoading, error } = useStepDetail(isNaN(rid) ? 0 : rid, isNaN(sn) ? 0 : sn)
-  const { data: run } = useRun(isNaN(rid) ? 0 : rid)
+  const { data: step, isLoading, error } = useStepFull(isNaN(rid) ? 0 : rid, isNaN(sn) ? 0 : sn)
   const [activeState, setActiveState] = useState<string | null>(null)
 
   if (isNaN(sn) || isNaN(rid)) {
@@ -29,7 +28,7 @@ export default function StepDetailPage() {
 
   const breadcrumbItems = [
     { label: 'Dashboard', to: '/' },
-    { label: run ? `${run.project ?? 'Run'} #${run.id}` : `Run #${rid}`, to: `/runs/${rid}` },
+    { label: step.run ? `${step.run.project ?? 'Run'} #${step.run.id}` : `Run #${rid}`, to: `/runs/${rid}` },
     { label: `Step ${step.step_number}${step.title ? `: ${step.title}` : ''}` },
   ]
 
@@ -54,7 +53,7 @@ export default function StepDetailPage() {
           arbiterEvents={step.arbiter_events}
         />
       )}
-      <HandoffViewer runId={rid} stepNumber={step.step_number} />
+      <HandoffViewer runId={rid} stepNumber={step.step_number} handoff={step.handoff} />
     </div>
   )
 }
@@ -64,7 +64,8 @@ export function makeTransition(overrides?: Partial<TransitionOut>): TransitionOu
     note: null,
     dispatch_skill: '/parse-roadmap',
     dispatch_duration_secs: 45,
-    dispatch_content: null,
+    dispatch_content_length: null,
+    dispatch_content_hash: null,
     is_self_transition: false,
     ...overrides,
   }
@@ -150,7 +151,9 @@ export function makeStateDuration(overrides?: Partial<StateDurationStats>): Stat
   return {
     avg: 180,
     p50: 160,
+    p90: 300,
     p95: 340,
+    p99: 420,
     ...overrides,
   }
 }
@@ -179,6 +182,34 @@ export function makeRecentFailureItem(overrides?: Partial<RecentFailureItem>): R
   }
 }
 
+// Default panel data, served both per endpoint and by /api/dashboard
+function makeDurationTrend(): DurationTrendItem[] {
+  return [
+    makeDurationTrendItem(),
+    makeDurationTrendItem({ step: 56, title: 'Enemy AI Framework', duration_secs: 950, status: 'completed' }),
+    makeDurationTrendItem({ step: 57, title: 'Battle Resolution', duration_secs: 1200, status: 'halted' }),
+  ]
+}
+
+function makeStateDurations(): Record<string, StateDurationStats> {
+  return {
+    CREATE_SPEC: makeStateDuration(),
+    REVIEW_SPEC: makeStateDuration({ avg: 95, p50: 90, p95: 150 }),
+    PLAN_WORK: makeStateDuration({ avg: 110, p50: 100, p95: 200 }),
+    EXECUTE_TASKS: makeStateDuration({ avg: 450, p50: 380, p95: 800 }),
+    MERGE_PRS: makeStateDuration({ avg: 180, p50: 120, p95: 400 }),
+    VERIFY_COMPLETION: makeStateDuration({ avg: 30, p50: 25, p95: 60 }),
+    HANDOFF: makeStateDuration({ avg: 45, p50: 40, p95: 80 }),
+  }
+}
+
+function makeRecentFailures(): RecentFailureItem[] {
+  return [
+    makeRecentFailureItem(),
+    makeRecentFailureItem({ step: 88, title: 'Inventory System', state: 'EXECUTE_TASKS', verdict: 'TASKS_FAILED', arbiter_attempts: 0, timestamp: '2026-02-16T18:30:00-08:00' }),
+  ]
+}
+
 const defaultStats: StatsOverview = {
   total_steps: 93,
   completed: 90,
@@ -191,6 +222,20 @@ const defaultStats: StatsOverview = {
   total_runs: 1,
 }
 
+const defaultRunSteps: StepSummary[] = [
+  makeStep(),
+  makeStep({
+    id: 2,
+    step_number: 90,
+    title: 'Character Stat Sheet',
+    status: 'halted',
+    final_state: 'MERGE_PRS',
+    final_verdict: 'MERGE_BLOCKED',
+    started_at: '2026-02-17T07:40:00-08:00',
+    ended_at: '2026-02-17T08:00:00-08:00',
+  }),
+]
+
 export const handlers = [
   http.get('/api/runs', () => {
     return HttpResponse.json([makeRun()])
@@ -200,20 +245,12 @@ export const handlers = [
     return HttpResponse.json(makeRun())
   }),
 
+  http.get('/api/runs/:id/full', () => {
+    return HttpResponse.json({ ...makeRun(), steps: defaultRunSteps })
+  }),
+
   http.get('/api/runs/:id/steps', () => {
-    return HttpResponse.json([
-      makeStep(),
-      makeStep({
-        id: 2,
-        step_number: 90,
-        title: 'Character Stat Sheet',
-        status: 'halted',
-        final_state: 'MERGE_PRS',
-        final_verdict: 'MERGE_BLOCKED',
-        started_at: '2026-02-17T07:40:00-08:00',
-        ended_at: '2026-02-17T08:00:00-08:00',
-      }),
-    ])
+    return HttpResponse.json(defaultRunSteps)
   }),
 
   http.get('/api/steps/:id', () => {
@@ -228,46 +265,29 @@ export const handlers = [
     return HttpResponse.json(makeStepDetail())
   }),
 
-  http.get('/api/runs/:runId/steps/:stepNumber/handoff', () => {
-    return HttpResponse.json(makeHandoff())
+  http.get('/api/runs/:runId/steps/:stepNumber/full', () => {
+    return HttpResponse.json({ ...makeStepDetail(), run: makeRun(), handoff: makeHandoff() })
   }),
 
-  http.get('/api/stats', () => {
-    return HttpResponse.json(defaultStats)
+  http.get('/api/runs/:runId/steps/:stepNumber/handoff', () => {
+    return HttpResponse.json(makeHandoff())
   }),
 
-  http.get('/api/stats/overview', () => {
-    return HttpResponse.json(makeEnhancedStats())
+  http.get('/api/transitions/:id/dispatch', () => {
+    return HttpResponse.text('=== Dispatch: /parse-roadmap ===\nroadmap parsed')
   }),
 
-  http.get('/api/stats/duration-trend', () => {
-    return HttpResponse.json([
-      makeDurationTrendItem(),
-      makeDurationTrendItem({ step: 56, title: 'Enemy AI Framework', duration_secs: 950, status: 'completed' }),
-      makeDurationTrendItem({ step: 57, title: 'Battle Resolution', duration_secs: 1200, status: 'halted' }),
-    ])
+  http.get('/api/stats', () => {
+    return HttpResponse.json(defaultStats)
   }),
 
-  http.get('/api/stats/state-durations', () => {
+  http.get('/api/dashboard', () => {
     return HttpResponse.json({
-      CREATE_SPEC: makeStateDuration(),
-      REVIEW_SPEC: makeStateDuration({ avg: 95, p50: 90, p95: 150 }),
-      PLAN_WORK: makeStateDuration({ avg: 110, p50: 100, p95: 200 }),
-      EXECUTE_TASKS: makeStateDuration({ avg: 450, p50: 380, p95: 800 }),
-      MERGE_PRS: makeStateDuration({ avg: 180, p50: 120, p95: 400 }),
-      VERIFY_COMPLETION: makeStateDuration({ avg: 30, p50: 25, p95: 60 }),
-      HANDOFF: makeStateDuration({ avg: 45, p50: 40, p95: 80 }),
+      overview: makeEnhancedStats(),
+      duration_trend: makeDurationTrend(),
+      state_durations: makeStateDurations(),
+      failure_breakdown: makeFailureBreakdown(),
+      recent_failures: makeRecentFailures(),
     })
   }),
-
-  http.get('/api/stats/failure-breakdown', () => {
-    return HttpResponse.json(makeFailureBreakdown())
-  }),
-
-  http.get('/api/stats/recent-failures', () => {
-    return HttpResponse.json([
-      makeRecentFailureItem(),
-      makeRecentFailureItem({ step: 88, title: 'Inventory System', state: 'EXECUTE_TASKS', verdict: 'TASKS_FAILED', arbiter_attempts: 0, timestamp: '2026-02-16T18:30:00-08:00' }),
-    ])
-  }),
 ]
@@ -41,7 +41,8 @@ export interface TransitionOut {
   note: string | null
   dispatch_skill: string | null
   dispatch_duration_secs: number | null
-  dispatch_content: string | null
+  dispatch_content_length: number | null
+  dispatch_content_hash: string | null
   is_self_transition: boolean
 }
 
@@ -61,6 +62,26 @@ export interface StepDetail extends StepSummary {
   arbiter_events: ArbiterEventOut[]
 }
 
+export interface RunFilters {
+  status?: string
+  project?: string
+}
+
+// One keyset page of /api/runs; nextCursor is null on the last page
+export interface RunPage {
+  runs: RunSummary[]
+  nextCursor: string | null
+}
+
+export interface RunFull extends RunSummary {
+  steps: StepSummary[]
+}
+
+export interface StepFull extends StepDetail {
+  run: RunSummary | null
+  handoff: HandoffOut | null
+}
+
 export interface StatsOverview {
   total_steps: number
   completed: number
@@ -96,7 +117,9 @@ export interface DurationTrendItem {
 export interface StateDurationStats {
   avg: number
   p50: number
+  p90: number
   p95: number
+  p99: number
 }
 
 export interface FailureBreakdown {
@@ -130,6 +153,15 @@ export interface RecentFailureItem {
   timestamp: string | null
 }
 
+// Panels not requested via ?panels= are null
+export interface Dashboard {
+  overview: EnhancedStatsOverview | null
+  duration_trend: DurationTrendItem[] | null
+  state_durations: Record<string, StateDurationStats> | null
+  failure_breakdown: FailureBreakdown | null
+  recent_failures: RecentFailureItem[] | null
+}
+
 // ── Live streaming types ──────────────────────────────────────
 
 export interface OrderEvent {
@@ -160,6 +192,15 @@ export interface OrderEvent {
   log_file?: string
 }
 
+// Sent after each ingest commit; null runs/steps means any may have changed
+export interface DataChangedEvent {
+  type: 'data_changed'
+  generation: number
+  runs: number[] | null
+  steps: number[] | null
+  stats: boolean
+}
+
 export type ConnectionStatus = 'connecting' | 'connected' | 'disconnected'
 
 export interface LiveSnapshot {
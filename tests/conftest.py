@@ -1,3 +1,5 @@
+from pathlib import Path
+
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
@@ -16,3 +18,116 @@ def db():
     session = sessionmaker(bind=engine)()
     yield session
     session.close()
+
+
+@pytest.fixture(autouse=True)
+def empty_stats_cache():
+    """Test DBs built by create_all() share an empty database id and start at
+    generation 0, so cached stats must not carry over between them."""
+    from backend.main import stats_cache
+
+    stats_cache.invalidate()
+    yield
+    stats_cache.invalidate()
+
+
+# ── Synthetic ORDER data ────────────────────────────────────────
+
+SEP = "────────"
+
+
+def handoff_yaml(step_number: int, title: str, status: str = "COMPLETE") -> str:
+    return (
+        "step_completed:\n"
+        f"  number: {step_number}\n"
+        f'  title: "{title}"\n'
+        '  phase: "Phase One"\n'
+        f"  status: {status}\n"
+        "execution_summary:\n"
+        "  prs_merged:\n"
+        f"    numbers: [{step_number + 100}]\n"
+        "  tasks_completed: 1\n"
+        "key_decisions: []\n"
+        "next_step:\n"
+        f"  number: {step_number + 1}\n"
+    )
+
+
+def step_log_lines(step_number: int, start: str, minutes: int = 0, complete: bool = True) -> str:
+    """Render a step log that walks INIT → CREATE_SPEC → EXECUTE_TASKS → HANDOFF."""
+    def ts(offset_min: int) -> str:
+        return f"{start}:{offset_min:02d}:00-08:00"
+
+    lines = [
+        f"[{ts(minutes)}] [INFO] [step:{step_number}/INIT] === Step {step_number}: Step {step_number} Title ===",
+        f"[{ts(minutes)}] [INFO] [step:{step_number}/CREATE_SPEC] {SEP} CREATE_SPEC (verdict: SPEC_CREATED) ────",
+        "",
+        f"=== Dispatch: /create-spec {step_number} ===",
+        f"Spec body for step {step_number}",
+        "=== End Dispatch ===",
+        "",
+        f"[{ts(minutes + 1)}] [INFO] [step:{step_number}/CREATE_SPEC] Dispatch OK (60s): /create-spec {step_number}",
+        f"[{ts(minutes + 2)}] [INFO] [step:{step_number}/EXECUTE_TASKS] {SEP} EXECUTE_TASKS (verdict: TASKS_READY) ────",
+        f"[{ts(minutes + 3)}] [INFO] [step:{step_number}/MERGE_PRS] Fix attempt 1/3 for PR #{step_number + 100} (tier: arbiter)",
+        f"[{ts(minutes + 3)}] [INFO] [step:{step_number}/MERGE_PRS] Arbiter: FIXED",
+        f"[{ts(minutes + 4)}] [INFO] [step:{step_number}/HANDOFF] {SEP} HANDOFF (verdict: HANDOFF_WRITTEN) ────",
+    ]
+    if complete:
+        lines.append(f"[{ts(minutes + 5)}] [INFO] [step:{step_number}/HANDOFF] {SEP} Step {step_number} Complete ────")
+    return "\n".join(lines) + "\n"
+
+
+def run_log_lines(start: str, step_numbers: list[int], halted: bool = False) -> str:
+    lines = [f"[{start}:00:00-08:00] [INFO] [step:?/?] ORDER Lifecycle Orchestrator v3.0"]
+    for i, sn in enumerate(step_numbers):
+        lines.append(f"[{start}:{10 * i + 1:02d}:00-08:00] [INFO] [step:{sn}/INIT] Starting step {sn}")
+    lines.append(
+        f"[{start}:59:00-08:00] [INFO] [step:?/?] "
+        + ("HALT requested" if halted else "Run finished")
+    )
+    return "\n".join(lines) + "\n"
+
+
+def write_order_dir(root: Path) -> Path:
+    """Write a small but complete ORDER directory and return its path.
+
+    Two runs; steps 1-2 have handoffs, step 3 only a log, step 4 only
+    appears in state.json.
+    """
+    order_dir = root / "order"
+    (order_dir / "logs").mkdir(parents=True)
+    (order_dir / "handoffs").mkdir()
+
+    (order_dir / "handoffs" / "step-1_HANDOFF.yml").write_text(handoff_yaml(1, "First Step"))
+    (order_dir / "handoffs" / "step-2_HANDOFF.yml").write_text(handoff_yaml(2, "Second Step"))
+
+    logs = order_dir / "logs"
+    (logs / "step-1-first-20260217T080000.log").write_text(step_log_lines(1, "2026-02-17T08"))
+    (logs / "step-2-second-20260217T081000.log").write_text(step_log_lines(2, "2026-02-17T08", 10))
+    (logs / "step-3-third-20260217T100000.log").write_text(
+        step_log_lines(3, "2026-02-17T10", complete=False)
+    )
+    (logs / "order-run-20260217T080000.log").write_text(run_log_lines("2026-02-17T08", [1, 2]))
+    (logs / "order-run-20260217T100000.log").write_text(
+        run_log_lines("2026-02-17T10", [3], halted=True)
+    )
+
+    (order_dir / "history.jsonl").write_text(
+        '{"from":"INIT","to":"CREATE_SPEC","at":"2026-02-17T08:00:00-08:00"}\n'
+        '{"from":"CREATE_SPEC","to":"CREATE_SPEC","at":"2026-02-17T08:01:00-08:00"}\n'
+    )
+    (order_dir / "history-prs.jsonl").write_text(
+        '{"step":1,"task":"step-1-task-1","pr":101,"title":"PR one","merged":"2026-02-17T08:03:00-08:00"}\n'
+        '{"step":2,"task":"step-2-task-1","pr":102,"title":"PR two","merged":"2026-02-17T08:13:00-08:00"}\n'
+    )
+    (order_dir / "state.json").write_text(
+        '{"current_state":"INIT","step_number":4,"prs":{},'
+        '"completed":["step-4-task-1"]}'
+    )
+    return order_dir
+
+
+@pytest.fixture
+def order_dir(tmp_path):
+    """Synthetic ORDER directory (see write_order_dir)."""
+    return write_order_dir(tmp_path)
@@ -1,16 +1,24 @@
 """Tests for the PEACE FastAPI endpoints."""
 
+import gzip
+import hashlib
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, event
+from sqlalchemy import Engine, create_engine, event
 from sqlalchemy.orm import sessionmaker
 
+from backend.content import compress_content, content_digest
 from backend.database import Base
-from backend.main import app, get_db
-from backend.models import Handoff, Run, Step, Transition
+from backend.generation import bump_generation
+from backend.ingest import ingest
+from backend.main import API_VERSION, app, get_db
+from backend.models import DispatchBlob, Handoff, Run, Step, Transition
 
 import backend.models  # noqa: F401
 
+ROADMAP_HASH = hashlib.sha256(b"Parsed roadmap OK").hexdigest()
+
 
 @pytest.fixture
 def client(tmp_path):
@@ -36,10 +44,12 @@ def client(tmp_path):
 
     t1 = Transition(step_id=step1.id, from_state="INIT", to_state="PARSE_ROADMAP",
                      verdict="STEP_FOUND", is_self_transition=False,
-                     dispatch_skill="/parse-roadmap", dispatch_content="Parsed roadmap OK")
+                     dispatch_skill="/parse-roadmap", dispatch_content_length=17,
+                     dispatch_content_hash=ROADMAP_HASH)
     t2 = Transition(step_id=step1.id, from_state="PARSE_ROADMAP", to_state="PARSE_ROADMAP",
                      is_self_transition=True)
     session.add_all([t1, t2])
+    session.add(DispatchBlob(hash=ROADMAP_HASH, size=17, data=compress_content("Parsed roadmap OK")))
 
     handoff = Handoff(step_id=step1.id, step_number=1,
                       key_decisions='[{"decision":"test"}]',
@@ -71,6 +81,17 @@ def test_list_runs(client):
     assert data[0]["steps_attempted"] == 2
 
 
+def test_list_runs_pages_and_filters(client):
+    resp = client.get("/api/runs", params={"limit": 1})
+    assert len(resp.json()) == 1
+    assert "X-Next-Cursor" not in resp.headers
+    assert client.get("/api/runs", params={"status": "halted"}).json() == []
+    assert len(client.get("/api/runs", params={"project": "testproject"}).json()) == 1
+    assert client.get("/api/runs", params={"since": "2026-01-01T00:00:00Z"}).json() == []
+    assert client.get("/api/runs", params={"cursor": "!!"}).status_code == 400
+    assert client.get("/api/runs", params={"limit": 0}).status_code == 422
+
+
 def test_get_run(client):
     resp = client.get("/api/runs/1")
     assert resp.status_code == 200
@@ -99,10 +120,10 @@ def test_get_step(client):
     assert data["final_state"] == "HANDOFF"
     # Should include transitions
     assert len(data["transitions"]) == 2
-    # First transition has dispatch content
-    assert data["transitions"][0]["dispatch_content"] == "Parsed roadmap OK"
-    # Second transition has no dispatch content
-    assert data["transitions"][1]["dispatch_content"] is None
+    # Dispatch content is summarised, not inlined
+    assert "dispatch_content" not in data["transitions"][0]
+    assert data["transitions"][0]["dispatch_content_length"] == 17
+    assert data["transitions"][1]["dispatch_content_length"] is None
 
 
 def test_get_step_not_found(client):
@@ -116,10 +137,22 @@ def test_list_step_transitions(client):
     data = resp.json()
     assert len(data) == 2
     assert data[0]["to_state"] == "PARSE_ROADMAP"
-    assert data[0]["dispatch_content"] == "Parsed roadmap OK"
+    assert data[0]["dispatch_content_hash"] == ROADMAP_HASH
     assert data[1]["is_self_transition"] is True
 
 
+def test_step_transitions_page_with_cursor(client):
+    resp = client.get("/api/runs/1/steps/1/transitions", params={"limit": 1})
+    assert [t["to_state"] for t in resp.json()] == ["PARSE_ROADMAP"]
+    cursor = resp.headers["X-Next-Cursor"]
+    resp = client.get("/api/runs/1/steps/1/transitions", params={"limit": 1, "cursor": cursor})
+    assert [t["is_self_transition"] for t in resp.json()] == [True]
+    assert "X-Next-Cursor" not in resp.headers
+
+    resp = client.get("/api/steps/1/transitions", params={"to_state": "HANDOFF"})
+    assert resp.json() == []
+
+
 def test_get_step_handoff(client):
     resp = client.get("/api/steps/1/handoff")
     assert resp.status_code == 200
@@ -172,6 +205,200 @@ def test_get_run_step_handoff_not_found(client):
     assert resp.status_code == 404
 
 
+def _count_statements(fn):
+    statements = []
+
+    def record(conn, cursor, stmt, *args):
+        statements.append(stmt)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        result = fn()
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+    return result, len(statements)
+
+
+def test_get_run_full(client):
+    resp, n = _count_statements(lambda: client.get("/api/runs/1/full"))
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["project"] == "testproject"
+    assert [s["step_number"] for s in data["steps"]] == [1, 2]
+    assert n == 1 + 2  # generation for the ETag, run, steps
+
+
+def test_conditional_get_by_ingest_generation(client):
+    resp = client.get("/api/runs")
+    tag = resp.headers["ETag"]
+    # Persisted state only, so tags survive a restart
+    assert tag == f'"-0-v{API_VERSION}"'
+    assert resp.headers["Cache-Control"] == "no-cache"
+
+    resp, n = _count_statements(lambda: client.get("/api/runs", headers={"If-None-Match": tag}))
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["ETag"] == tag
+    assert n == 1  # just the generation
+    # One generation covers every read endpoint
+    assert client.get("/api/stats/overview", headers={"If-None-Match": f'"x", W/{tag}'}).status_code == 304
+    assert "ETag" not in client.get("/api/live/status").headers
+
+    db = next(app.dependency_overrides[get_db]())
+    bump_generation(db)
+    db.commit()
+    db.close()
+    resp = client.get("/api/runs", headers={"If-None-Match": tag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != tag
+
+
+def test_rebuilt_database_gets_new_etags(tmp_path, order_dir):
+    db_path = tmp_path / "rebuilt.db"
+    ingest(order_dir, "test", db_path)
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    TestSession = sessionmaker(bind=engine)
+
+    def override_db():
+        db = TestSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_db
+    try:
+        client = TestClient(app)
+        first = client.get("/api/stats/overview")
+
+        # As the CLI does: delete the file and ingest changed data from scratch
+        (order_dir / "logs" / "step-3-third-20260217T100000.log").unlink()
+        engine.dispose()
+        db_path.unlink()
+        ingest(order_dir, "test", db_path)
+
+        resp = client.get("/api/stats/overview", headers={"If-None-Match": first.headers["ETag"]})
+        assert resp.status_code == 200
+        assert resp.headers["ETag"].endswith(f'-1-v{API_VERSION}"')
+        assert resp.headers["ETag"] != first.headers["ETag"]
+        # Not the cached body of the old file's generation 1
+        assert resp.json()["total_steps"] == first.json()["total_steps"] - 1
+    finally:
+        engine.dispose()
+        app.dependency_overrides.clear()
+
+
+def test_changes_since_generation(client):
+    assert client.get("/api/changes").status_code == 422
+    assert client.get("/api/changes", params={"since_generation": 0}).json() == {
+        "generation": 0, "reset": False, "runs": [], "steps": [], "transitions": [],
+        "deleted": {"runs": [], "steps": [], "transitions": []},
+    }
+
+    db = next(app.dependency_overrides[get_db]())
+    step = db.query(Step).filter_by(step_number=2).one()
+    step.generation = bump_generation(db)
+    db.commit()
+    db.close()
+    data = client.get("/api/changes", params={"since_generation": 0}).json()
+    assert data["generation"] == 1
+    assert [s["step_number"] for s in data["steps"]] == [2]
+    assert data["runs"] == data["transitions"] == []
+    assert client.get("/api/changes", params={"since_generation": 2}).json()["reset"] is True
+
+
+def test_get_run_full_not_found(client):
+    assert client.get("/api/runs/999/full").status_code == 404
+
+
+def test_get_run_step_full(client):
+    resp, n = _count_statements(lambda: client.get("/api/runs/1/steps/1/full"))
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["title"] == "First Step"
+    assert data["run"]["project"] == "testproject"
+    assert len(data["transitions"]) == 2
+    assert data["arbiter_events"] == []
+    assert data["handoff"]["next_step_number"] == 2
+    assert n == 1 + 5
+
+    data = client.get("/api/runs/1/steps/2/full").json()
+    assert data["handoff"] is None and data["transitions"] == []
+
+
+def test_get_run_step_full_not_found(client):
+    assert client.get("/api/runs/1/steps/99/full").status_code == 404
+
+
+def test_transition_dispatch(client):
+    resp = client.get("/api/transitions/1/dispatch")
+    assert resp.status_code == 200
+    assert resp.text == "Parsed roadmap OK"
+    assert resp.headers["content-type"] == "text/plain; charset=utf-8"
+    assert resp.headers["accept-ranges"] == "bytes"
+    etag = resp.headers["etag"]
+
+    resp = client.get("/api/transitions/1/dispatch", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+
+    assert client.get("/api/transitions/2/dispatch").status_code == 404
+    assert client.get("/api/transitions/999/dispatch").status_code == 404
+
+
+def test_transition_dispatch_ranges(client):
+    url = "/api/transitions/1/dispatch"
+    resp = client.get(url, headers={"Range": "bytes=0-5"})
+    assert resp.status_code == 206
+    assert resp.content == b"Parsed"
+    assert resp.headers["content-range"] == "bytes 0-5/17"
+
+    assert client.get(url, headers={"Range": "bytes=7-"}).content == b"roadmap OK"
+    assert client.get(url, headers={"Range": "bytes=-2"}).content == b"OK"
+    assert client.get(url, headers={"Range": "bytes=11-99"}).content == b"map OK"
+
+    resp = client.get(url, headers={"Range": "bytes=17-"})
+    assert resp.status_code == 416
+    assert resp.headers["content-range"] == "bytes */17"
+
+    # Multiple ranges are not supported: the whole body is served
+    assert client.get(url, headers={"Range": "bytes=0-1,4-5"}).status_code == 200
+
+
+def test_transition_dispatch_compression(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'gz.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    TestSession = sessionmaker(bind=engine)
+    content = "dispatch line\n" * 500
+    length, digest = content_digest(content)
+    with TestSession() as session:
+        session.add(DispatchBlob(hash=digest, size=length, data=compress_content(content)))
+        session.add(Transition(dispatch_content_length=length, dispatch_content_hash=digest))
+        session.commit()
+
+    def override_db():
+        with TestSession() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_db
+    try:
+        client = TestClient(app)
+        resp = client.get("/api/transitions/1/dispatch", headers={"Accept-Encoding": "gzip"})
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.text == content
+        assert int(resp.headers["content-length"]) < len(content) // 10
+
+        # The stored zlib stream is HTTP's deflate coding, sent as-is
+        resp = client.get("/api/transitions/1/dispatch", headers={"Accept-Encoding": "deflate, gzip"})
+        assert resp.headers["content-encoding"] == "deflate"
+        assert resp.text == content
+
+        resp = client.get("/api/transitions/1/dispatch", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in resp.headers
+        assert resp.text == content
+    finally:
+        app.dependency_overrides.clear()
+
+
 def test_get_stats(client):
     resp = client.get("/api/stats")
     assert resp.status_code == 200
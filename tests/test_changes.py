@@ -0,0 +1,99 @@
+"""Tests for backend.changes (the /api/changes feed)."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.changes import changes_since, prune_tombstones, record_tombstones
+from backend.database import Base
+from backend.generation import current_generation, delta_floor
+from backend.ingest import IngestWatcher
+from backend.models import Run, Step, Tombstone, Transition
+
+import backend.models  # noqa: F401
+
+STEP_3_LOG = "step-3-third-20260217T100000.log"
+
+
+@pytest.fixture
+def env(tmp_path, order_dir):
+    """Synthetic ORDER dir after a baseline ingest, and its session factory."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'changes.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    watcher = IngestWatcher(order_dir, "test", factory)
+    watcher._do_reingest()
+    return order_dir, factory, watcher
+
+
+def _ids(rows) -> list[int]:
+    return [row.id for row in rows]
+
+
+def test_full_ingest_sets_floor(env):
+    _, factory, _ = env
+    session = factory()
+    generation = current_generation(session)
+    assert delta_floor(session) == generation == 1
+
+    assert changes_since(session, 0)["reset"] is True
+    session.close()
+    # Nothing after the rebuild: an empty delta, not a reset
+    session = factory()
+    changes = changes_since(session, generation)
+    assert changes["reset"] is False and changes["generation"] == generation
+    assert changes["steps"] == changes["runs"] == changes["transitions"] == []
+    session.close()
+
+
+def test_incremental_changes_since(env):
+    order_dir, factory, watcher = env
+    session = factory()
+    before = current_generation(session)
+    step3 = session.query(Step).filter_by(step_number=3).one()
+    old_transitions = set(_ids(step3.transitions))
+    session.close()
+
+    with open(order_dir / "logs" / STEP_3_LOG, "a") as f:
+        f.write("[2026-02-17T10:07:00-08:00] [INFO] [step:3/HANDOFF] ──────── Step 3 Complete ────\n")
+    watcher._do_reingest()
+
+    session = factory()
+    step3 = session.query(Step).filter_by(step_number=3).one()
+    changes = changes_since(session, before)
+    assert changes["generation"] == before + 1 and changes["reset"] is False
+    assert _ids(changes["steps"]) == [step3.id]
+    assert _ids(changes["runs"]) == [step3.run_id]
+    new_transitions = _ids(step3.transitions)
+    assert sorted(_ids(changes["transitions"])) == sorted(new_transitions)
+    # Reused IDs come back as rows, not as deletions
+    assert changes["deleted"]["transitions"] == sorted(old_transitions - set(new_transitions))
+    assert changes["deleted"]["steps"] == changes["deleted"]["runs"] == []
+    assert session.query(Tombstone).count() == len(old_transitions)
+    session.close()
+
+    # Already up to date
+    session = factory()
+    assert changes_since(session, before + 1)["transitions"] == []
+    session.close()
+
+
+def test_tombstones_pruned_past_retention(db):
+    db.add_all([Transition(step_id=1), Transition(step_id=2)])
+    db.flush()
+    record_tombstones(db, Transition, Transition.step_id == 1, 3)
+    record_tombstones(db, Transition, Transition.step_id == 2, 6)
+
+    prune_tombstones(db, 7, retention=3)
+    assert delta_floor(db) == 4
+    assert [t.generation for t in db.query(Tombstone)] == [6]
+    # The floor never moves back
+    prune_tombstones(db, 5, retention=3)
+    assert delta_floor(db) == 4
+
+
+def test_future_generation_resets(db):
+    db.add(Run(project="p", generation=0))
+    db.flush()
+    assert changes_since(db, 0)["reset"] is False
+    assert changes_since(db, 1)["reset"] is True
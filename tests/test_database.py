@@ -0,0 +1,73 @@
+"""Tests for SQLite connection tuning and the read-only engine."""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from backend import config
+from backend.database import Base, is_wal, make_engine
+from backend.models import Run
+
+import backend.models  # noqa: F401
+
+
+@pytest.fixture
+def engines(tmp_path):
+    db_path = tmp_path / "tuned.db"
+    writer = make_engine(db_path)
+    Base.metadata.create_all(bind=writer)
+    reader = make_engine(db_path, read_only=True)
+    yield db_path, writer, reader
+    reader.dispose()
+    writer.dispose()
+
+
+def _pragma(conn, name):
+    return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def test_writer_pragmas(engines):
+    db_path, writer, _ = engines
+    with writer.connect() as conn:
+        assert _pragma(conn, "journal_mode") == "wal"
+        assert _pragma(conn, "synchronous") == 1  # NORMAL
+        assert _pragma(conn, "temp_store") == 2  # MEMORY
+        assert _pragma(conn, "cache_size") == -config.SQLITE_CACHE_SIZE_KB
+        assert _pragma(conn, "busy_timeout") == config.SQLITE_BUSY_TIMEOUT_MS
+    assert is_wal(db_path)
+
+
+def test_reader_is_read_only(engines):
+    _, writer, reader = engines
+    with writer.begin() as conn:
+        conn.execute(Run.__table__.insert().values(project="p", log_file="a.log"))
+
+    with reader.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM runs")).scalar() == 1
+        assert _pragma(conn, "mmap_size") == config.SQLITE_MMAP_SIZE
+        with pytest.raises(OperationalError, match="readonly"):
+            conn.execute(Run.__table__.insert().values(project="p", log_file="b.log"))
+
+
+def test_reader_not_blocked_by_open_write(engines):
+    _, writer, reader = engines
+    with writer.connect() as wconn:
+        wconn.exec_driver_sql("BEGIN IMMEDIATE")
+        wconn.execute(Run.__table__.insert().values(project="p", log_file="a.log"))
+
+        with reader.connect() as conn:
+            assert conn.execute(text("SELECT count(*) FROM runs")).scalar() == 0
+
+        wconn.exec_driver_sql("COMMIT")
+
+    with reader.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM runs")).scalar() == 1
+
+
+def test_custom_pragmas_override_defaults(tmp_path):
+    eng = make_engine(tmp_path / "plain.db", pragmas={"synchronous": "OFF"})
+    with eng.connect() as conn:
+        assert _pragma(conn, "journal_mode") == "delete"
+        assert _pragma(conn, "synchronous") == 0
+    eng.dispose()
+    assert not is_wal(tmp_path / "plain.db")
@@ -0,0 +1,54 @@
+"""Tests for backend.downsample."""
+
+import math
+import random
+
+from backend.downsample import downsample, lttb
+
+
+def test_short_series_returned_whole():
+    assert lttb([0, 1, 2], [5, 6, 7], 10) == [0, 1, 2]
+    assert downsample([0, 1, 2], [5, 6, 7], 3, keep=[1]) == [0, 1, 2]
+
+
+def test_tiny_thresholds():
+    xs = list(range(10))
+    assert lttb(xs, xs, 0) == []
+    assert lttb(xs, xs, 1) == [0]
+    assert lttb(xs, xs, 2) == [0, 9]
+
+
+def test_keeps_endpoints_and_size():
+    rng = random.Random(1)
+    xs = list(range(5000))
+    ys = [rng.random() for _ in xs]
+    for threshold in (3, 10, 250, 4999):
+        picked = lttb(xs, ys, threshold)
+        assert len(picked) == threshold
+        assert picked[0] == 0 and picked[-1] == len(xs) - 1
+        assert picked == sorted(set(picked))
+
+
+def test_preserves_spikes():
+    xs = list(range(1000))
+    ys = [math.sin(x / 50) for x in xs]
+    ys[437] = 40.0
+    ys[812] = -40.0
+    picked = lttb(xs, ys, 50)
+    assert 437 in picked and 812 in picked
+
+
+def test_keep_counts_against_budget():
+    xs = list(range(200))
+    ys = [float(x % 7) for x in xs]
+    keep = [5, 50, 150]
+    picked = downsample(xs, ys, 20, keep=keep)
+    assert len(picked) == 20
+    assert set(keep) <= set(picked)
+    assert picked == sorted(picked)
+
+
+def test_keep_beyond_budget_is_returned_whole():
+    xs = list(range(100))
+    keep = list(range(0, 100, 5))
+    assert downsample(xs, xs, 10, keep=keep) == keep
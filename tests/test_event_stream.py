@@ -6,7 +6,12 @@ from pathlib import Path
 
 import pytest
 
-from backend.event_stream import EventBroadcaster, EventFileWatcher
+from backend.event_stream import (
+    EventBroadcaster,
+    EventFileWatcher,
+    data_changed_event,
+    event_stream_generator,
+)
 
 
 @pytest.fixture
@@ -83,6 +88,52 @@ class TestEventBroadcaster:
 
         asyncio.run(run())
 
+    def test_subscriber_event_types(self, fresh_broadcaster):
+        async def run():
+            await fresh_broadcaster.publish({"seq": 1, "type": "step_start"})
+            q = fresh_broadcaster.subscribe(last_event_id=0, event_types=["data_changed"])
+            await fresh_broadcaster.publish({"seq": 2, "type": "step_complete"})
+            await fresh_broadcaster.publish(data_changed_event(3, [1], [4]))
+            assert q.get_nowait()["type"] == "data_changed"
+            assert q.empty()
+
+        asyncio.run(run())
+
+    def test_unsequenced_events_are_not_replayed(self, fresh_broadcaster):
+        async def run():
+            await fresh_broadcaster.publish({"seq": 1, "type": "test"})
+            await fresh_broadcaster.publish(data_changed_event(1, None, None))
+            assert fresh_broadcaster.recent_event_count == 1
+            assert fresh_broadcaster.last_event_id == 1
+            q = fresh_broadcaster.subscribe(last_event_id=0)
+            assert q.get_nowait()["seq"] == 1
+            assert q.empty()
+
+        asyncio.run(run())
+
+
+class TestEventStreamGenerator:
+    def test_frames(self):
+        async def run():
+            queue: asyncio.Queue[dict] = asyncio.Queue()
+            queue.put_nowait({"seq": 4, "type": "step_start"})
+            queue.put_nowait(data_changed_event(2, {3, 1}, None))
+
+            async def connected():
+                return False
+
+            frames = event_stream_generator(queue, connected)
+            return [await anext(frames), await anext(frames)]
+
+        ordered, changed = asyncio.run(run())
+        assert ordered.startswith("id: 4\nevent: step_start\n")
+        # No id line: it would reset the client's Last-Event-ID
+        assert changed.startswith("event: data_changed\ndata: ")
+        payload = json.loads(changed.split("data: ", 1)[1])
+        assert payload == {
+            "type": "data_changed", "generation": 2, "runs": [1, 3], "steps": None, "stats": True,
+        }
+
 
 class TestEventFileWatcher:
     def test_reads_new_lines(self, tmp_path):
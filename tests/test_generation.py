@@ -0,0 +1,46 @@
+"""Tests for backend.generation."""
+
+from backend.generation import (
+    bump_generation,
+    current_generation,
+    current_version,
+    delta_floor,
+    set_delta_floor,
+    set_generation,
+)
+from backend.ingest import _clear_tables
+
+
+def test_bump_from_empty_database(db):
+    assert current_generation(db) == 0
+    assert bump_generation(db) == 1
+    assert bump_generation(db) == 2
+    assert current_generation(db) == 2
+
+
+def test_set_and_survive_clear(db):
+    set_generation(db, 41)
+    set_generation(db, 7)
+    assert current_generation(db) == 7
+    # A rebuild in place wipes the data, not the counter
+    _clear_tables(db)
+    assert bump_generation(db) == 8
+
+
+def test_delta_floor_is_independent_of_generation(db):
+    assert delta_floor(db) == 0
+    set_delta_floor(db, 3)
+    assert current_generation(db) == 0
+    assert bump_generation(db) == 1
+    assert delta_floor(db) == 3
+
+
+def test_version_carries_database_id(db):
+    assert current_version(db) == ("", 0)
+    bump_generation(db)
+    database_id, generation = current_version(db)
+    assert len(database_id) == 16 and generation == 1
+    # Kept by every later write to the row
+    set_generation(db, 5)
+    set_delta_floor(db, 5)
+    assert current_version(db) == (database_id, 5)
@@ -1,6 +1,8 @@
 """Integration tests for backend.ingest against real ORDER data."""
 
 import os
+import random
+from datetime import datetime, timedelta
 from pathlib import Path
 
 import pytest
@@ -11,6 +13,7 @@ from backend.database import Base
 from backend.ingest import ingest
 from backend.models import (
     ArbiterEvent,
+    DispatchBlob,
     Handoff,
     PullRequest,
     Run,
@@ -101,9 +104,148 @@ def test_dispatch_content_stored(ingested_db):
     """Transitions matched to dispatch blocks should have content populated."""
     session, _ = ingested_db
     with_content = session.query(Transition).filter(
-        Transition.dispatch_content.isnot(None),
-        Transition.dispatch_content != "",
+        Transition.dispatch_content_hash.isnot(None),
+        Transition.dispatch_content_length > 0,
     ).all()
     assert len(with_content) > 0
     for t in with_content:
         assert t.dispatch_skill is not None
+        assert t.dispatch_content_length == len(t.dispatch_content.encode("utf-8"))
+        assert len(t.dispatch_content_hash) == 64
+
+
+def test_bulk_writer_flushes_in_batches(db):
+    from backend.ingest import _BulkWriter, _empty_counts
+
+    counts = _empty_counts()
+    writer = _BulkWriter(db, counts, batch_size=2)
+    for n in range(5):
+        writer.add(PullRequest, {"step_id": None, "pr_number": n, "task_id": None,
+                                 "title": None, "status": "merged", "merged_at": None})
+    # Two full batches written, one row still buffered
+    assert db.query(PullRequest).count() == 4
+    writer.flush()
+    assert db.query(PullRequest).count() == 5
+    assert counts["prs"] == 5
+
+
+def test_synthetic_ingest_links_children(order_dir, tmp_path):
+    counts = ingest(order_dir, "synthetic", tmp_path / "synthetic.db")
+    assert counts == {"steps": 4, "transitions": 11, "prs": 2, "handoffs": 2,
+                      "arbiter_events": 3, "runs": 2}
+    session = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / 'synthetic.db'}"))()
+    step1 = session.query(Step).filter(Step.step_number == 1).one()
+    assert len(step1.transitions) == 3
+    assert step1.transitions[0].dispatch_skill == "/create-spec"
+    # Each transition lasts until the next; the last until the step ended
+    assert [t.duration_secs for t in step1.transitions] == [120.0, 120.0, 60.0]
+    assert len(step1.arbiter_events) == 1
+    assert step1.handoff.next_step_number == 2
+    assert {pr.step_id for pr in step1.pull_requests} == {step1.id}
+    # One blob per distinct dispatch block
+    dispatched = session.query(Transition).filter(Transition.dispatch_content_hash.isnot(None)).all()
+    assert session.query(DispatchBlob).count() == len({t.dispatch_content_hash for t in dispatched})
+    assert "Spec body for step 1" in step1.transitions[0].dispatch_content
+    session.close()
+
+
+def _reference_assign(steps, runs):
+    """The original nested-loop run association, for comparison."""
+    for run, step_numbers in runs:
+        if run.started_at and run.ended_at:
+            for step in steps:
+                if step.started_at and step.run_id is None:
+                    if run.started_at <= step.started_at <= run.ended_at:
+                        step.run_id = run.id
+        for sn in step_numbers:
+            for step in steps:
+                if step.step_number == sn and step.run_id is None:
+                    step.run_id = run.id
+    runs_by_start = sorted((r for r, _ in runs if r.started_at), key=lambda r: r.started_at)
+    for step in steps:
+        if step.run_id is None and step.started_at:
+            best = None
+            for run in runs_by_start:
+                if run.started_at <= step.started_at:
+                    best = run
+                else:
+                    break
+            if best is not None:
+                step.run_id = best.id
+
+
+def test_assign_steps_to_runs_matches_nested_loops():
+    from types import SimpleNamespace
+
+    from backend.ingest import _assign_steps_to_runs
+
+    rng = random.Random(11)
+    base = datetime(2026, 2, 17, 8, 0)
+    for _ in range(100):
+        runs = []
+        for rid in range(1, rng.randint(1, 10)):
+            start = base + timedelta(minutes=rng.randint(0, 300))
+            end = rng.choice([None, start + timedelta(minutes=rng.randint(0, 90))])
+            numbers = rng.sample(range(1, 30), rng.randint(0, 3))
+            runs.append((SimpleNamespace(id=rid, started_at=start, ended_at=end), numbers))
+
+        def make_steps():
+            r = random.Random(len(runs))
+            return [
+                SimpleNamespace(
+                    step_number=n, run_id=None,
+                    started_at=r.choice([None, base + timedelta(minutes=r.randint(-30, 400))]),
+                )
+                for n in range(1, 30)
+            ]
+
+        expected, actual = make_steps(), make_steps()
+        _reference_assign(expected, runs)
+        _assign_steps_to_runs(actual, runs)
+        assert [s.run_id for s in actual] == [s.run_id for s in expected]
+
+
+def test_compute_run_aggregates_subset(db):
+    from backend.ingest import _compute_run_aggregates
+
+    run_a, run_b, run_c = Run(log_file="a"), Run(log_file="b"), Run(log_file="c", steps_attempted=9)
+    db.add_all([run_a, run_b, run_c])
+    db.flush()
+    db.add_all([
+        Step(run_id=run_a.id, step_number=1, status="completed"),
+        Step(run_id=run_a.id, step_number=2, status="halted"),
+        Step(run_id=run_a.id, step_number=3, status="failed"),
+        Step(run_id=run_b.id, step_number=4, status="completed"),
+        Step(run_id=None, step_number=5, status="completed"),
+    ])
+    db.commit()
+
+    _compute_run_aggregates(db, [run_a.id, run_c.id])
+    db.commit()
+    db.expire_all()
+    assert (run_a.steps_attempted, run_a.steps_completed, run_a.steps_failed) == (3, 1, 2)
+    assert run_b.steps_attempted == 0  # not in the subset
+    assert run_c.steps_attempted == 0  # in the subset, no steps
+
+    _compute_run_aggregates(db)
+    db.commit()
+    db.expire_all()
+    assert (run_b.steps_attempted, run_b.steps_completed, run_b.steps_failed) == (1, 1, 0)
+
+
+def test_dwell_times_sorted_pass():
+    from datetime import timezone
+
+    from backend.ingest import _dwell_times
+
+    tz = timezone(timedelta(hours=-8))
+    base = datetime(2026, 2, 17, 8, 0, tzinfo=tz)
+    at = [base + timedelta(seconds=s) for s in (0, 300, 60, 300)]
+
+    # Out-of-order input; ties last 0s and keep log order
+    assert _dwell_times(at, base + timedelta(seconds=400)) == [60.0, 0.0, 240.0, 100.0]
+    # Naive ended_at (as read back from SQLite) compares on the wall clock
+    assert _dwell_times(at[:1], datetime(2026, 2, 17, 8, 1)) == [60.0]
+    assert _dwell_times(at, None)[3] is None
+    assert _dwell_times([None, base], base) == [None, 0.0]
+    assert _dwell_times([base], base - timedelta(seconds=1)) == [None]
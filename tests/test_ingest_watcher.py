@@ -1,14 +1,32 @@
 """Tests for the IngestWatcher class."""
 
 import asyncio
+import json
+import sqlite3
 from pathlib import Path
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 
-from backend.database import Base
-from backend.ingest import IngestWatcher
+from backend.database import Base, make_engine
+from backend.generation import current_generation, set_generation
+from backend.ingest import IngestChanges, IngestWatcher, ingest
+from backend.manifest import scan_files
+from backend.models import (
+    ArbiterEvent,
+    DispatchBlob,
+    Handoff,
+    IngestedFile,
+    PullRequest,
+    QuantileSketch,
+    Run,
+    StateRollup,
+    Step,
+    StepRollup,
+    Transition,
+)
+from tests.conftest import handoff_yaml, run_log_lines, step_log_lines
 
 import backend.models  # noqa: F401 — ensure models registered with Base
 
@@ -86,3 +104,320 @@ class TestCheck:
         # If _do_reingest were called it would fail on the empty ORDER
         # dir (no real data to parse), so a clean run means it was skipped.
         asyncio.run(watcher._check())
+
+
+def _dump(session) -> dict:
+    """Snapshot table contents keyed by natural keys rather than row IDs."""
+    steps = {s.id: s.step_number for s in session.query(Step).all()}
+    runs = {r.id: r.log_file for r in session.query(Run).all()}
+
+    def cols(obj, *names):
+        return tuple(getattr(obj, n) for n in names)
+
+    return {
+        "runs": sorted(
+            cols(r, "log_file", "started_at", "ended_at", "status",
+                 "steps_attempted", "steps_completed", "steps_failed")
+            for r in session.query(Run).all()
+        ),
+        "steps": sorted(
+            (s.step_number, runs.get(s.run_id))
+            + cols(s, "title", "phase", "started_at", "ended_at", "final_state",
+                   "final_verdict", "status", "tasks_completed", "prs_merged",
+                   "handoff_file")
+            for s in session.query(Step).all()
+        ),
+        "transitions": sorted(
+            (steps.get(t.step_id) or 0,)
+            + cols(t, "timestamp", "from_state", "to_state", "verdict", "note", "duration_secs",
+                   "dispatch_skill", "dispatch_duration_secs", "dispatch_content",
+                   "dispatch_content_length", "dispatch_content_hash",
+                   "is_self_transition")
+            for t in session.query(Transition).all()
+        ),
+        "arbiter_events": sorted(
+            (steps.get(a.step_id),) + cols(a, "attempt", "max_attempts", "verdict", "pr_number")
+            for a in session.query(ArbiterEvent).all()
+        ),
+        "handoffs": sorted(
+            (steps.get(h.step_id),) + cols(h, "step_number", "key_decisions", "next_step_number")
+            for h in session.query(Handoff).all()
+        ),
+        "prs": sorted(
+            (steps.get(p.step_id) or 0,) + cols(p, "pr_number", "task_id", "status")
+            for p in session.query(PullRequest).all()
+        ),
+        "dispatch_blobs": sorted(b.hash for b in session.query(DispatchBlob).all()),
+        "sketches": sorted(
+            cols(q, "kind", "project", "key", "count")
+            + (json.loads(q.sketch)["zero"], str(json.loads(q.sketch)["bins"]))
+            for q in session.query(QuantileSketch).all()
+        ),
+        "step_rollups": sorted(
+            cols(r, "grain", "bucket_start", "steps", "completed", "failed", "halted",
+                 "duration_count", "duration_sum_secs", "arbiter_attempts", "prs_merged")
+            for r in session.query(StepRollup).all()
+        ),
+        "state_rollups": sorted(
+            cols(r, "grain", "bucket_start", "to_state", "count", "total_secs")
+            for r in session.query(StateRollup).all()
+        ),
+    }
+
+
+def _full_ingest_dump(tmp_path, order_dir) -> dict:
+    db_path = tmp_path / "full.db"
+    ingest(order_dir, "test", db_path)
+    session = sessionmaker(bind=create_engine(f"sqlite:///{db_path}"))()
+    try:
+        return _dump(session)
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def ingested_env(tmp_path, order_dir):
+    """Synthetic ORDER dir with a baseline ingest already committed."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'watch.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    watcher = IngestWatcher(order_dir, "test", factory)
+    watcher._do_reingest()
+    return order_dir, factory, watcher
+
+
+class TestIncrementalReingest:
+    def test_baseline_records_manifest(self, ingested_env):
+        order_dir, factory, _ = ingested_env
+        session = factory()
+        assert session.query(IngestedFile).count() == len(scan_files(order_dir))
+        assert session.query(Step).count() == 4
+        session.close()
+
+    def test_appended_step_log_matches_full_ingest(self, ingested_env, tmp_path):
+        order_dir, factory, watcher = ingested_env
+        session = factory()
+        before_ids = {s.step_number: s.id for s in session.query(Step).all()}
+        untouched = {
+            t.id for t in session.query(Transition)
+            .join(Step).filter(Step.step_number == 1).all()
+        }
+        session.close()
+
+        log = order_dir / "logs" / "step-3-third-20260217T100000.log"
+        with open(log, "a") as f:
+            f.write(
+                "[2026-02-17T10:07:00-08:00] [INFO] [step:3/HANDOFF] "
+                "──────── Step 3 Complete ────\n"
+            )
+        watcher._do_reingest()
+
+        session = factory()
+        assert {s.step_number: s.id for s in session.query(Step).all()} == before_ids
+        step1_ids = {
+            t.id for t in session.query(Transition)
+            .join(Step).filter(Step.step_number == 1).all()
+        }
+        assert step1_ids == untouched
+        assert _dump(session) == _full_ingest_dump(tmp_path, order_dir)
+        session.close()
+
+    def test_new_files_match_full_ingest(self, ingested_env, tmp_path):
+        order_dir, factory, watcher = ingested_env
+        (order_dir / "handoffs" / "step-3_HANDOFF.yml").write_text(
+            handoff_yaml(3, "Third Step", status="FAILED")
+        )
+        (order_dir / "logs" / "step-5-fifth-20260217T110000.log").write_text(
+            step_log_lines(5, "2026-02-17T11")
+        )
+        (order_dir / "logs" / "order-run-20260217T110000.log").write_text(
+            run_log_lines("2026-02-17T11", [5])
+        )
+        with open(order_dir / "history-prs.jsonl", "a") as f:
+            f.write('{"step":3,"task":"step-3-task-1","pr":103,"title":"PR three"}\n')
+        watcher._do_reingest()
+
+        session = factory()
+        assert _dump(session) == _full_ingest_dump(tmp_path, order_dir)
+        run = session.query(Run).filter(Run.log_file == "order-run-20260217T100000.log").one()
+        assert run.steps_failed == 1
+        session.close()
+
+    def test_deleted_file_falls_back_to_full_rebuild(self, ingested_env, tmp_path):
+        order_dir, factory, watcher = ingested_env
+        (order_dir / "handoffs" / "step-2_HANDOFF.yml").unlink()
+        watcher._do_reingest()
+
+        session = factory()
+        assert session.query(Handoff).count() == 1
+        assert _dump(session) == _full_ingest_dump(tmp_path, order_dir)
+        session.close()
+
+    def test_unchanged_content_skips_reparse(self, ingested_env):
+        order_dir, factory, watcher = ingested_env
+        session = factory()
+        ids = sorted(t.id for t in session.query(Transition).all())
+        session.close()
+
+        (order_dir / "state.json").touch()
+        watcher._do_reingest()
+
+        session = factory()
+        assert sorted(t.id for t in session.query(Transition).all()) == ids
+        session.close()
+
+    def test_generation_advances_on_data_commits(self, ingested_env):
+        order_dir, factory, watcher = ingested_env
+
+        def generation():
+            session = factory()
+            try:
+                return current_generation(session)
+            finally:
+                session.close()
+
+        assert generation() == 1
+        (order_dir / "state.json").touch()
+        watcher._do_reingest()
+        assert generation() == 1
+
+        with open(order_dir / "logs" / "step-3-third-20260217T100000.log", "a") as f:
+            f.write("[2026-02-17T10:07:00-08:00] [INFO] [step:3/HANDOFF] ──────── Step 3 Complete ────\n")
+        watcher._do_reingest()
+        assert generation() == 2
+
+        (order_dir / "handoffs" / "step-2_HANDOFF.yml").unlink()
+        watcher._do_reingest()
+        assert generation() == 3
+
+    def test_on_commit_reports_changes(self, ingested_env):
+        order_dir, factory, _ = ingested_env
+        calls = []
+        watcher = IngestWatcher(order_dir, "test", factory, on_commit=calls.append)
+
+        (order_dir / "state.json").touch()
+        watcher._do_reingest()
+        assert calls == []
+
+        with open(order_dir / "logs" / "step-3-third-20260217T100000.log", "a") as f:
+            f.write("[2026-02-17T10:07:00-08:00] [INFO] [step:3/HANDOFF] ──────── Step 3 Complete ────\n")
+        watcher._do_reingest()
+        session = factory()
+        step3 = session.query(Step).filter_by(step_number=3).one()
+        assert calls[-1] == IngestChanges(current_generation(session), {step3.run_id}, {3})
+        session.close()
+
+        # A rebuild may have changed anything
+        (order_dir / "handoffs" / "step-2_HANDOFF.yml").unlink()
+        watcher._do_reingest()
+        assert len(calls) == 2
+        assert calls[-1].run_ids is None and calls[-1].step_numbers is None
+        assert calls[-1].generation == calls[0].generation + 1
+
+    def test_parallel_jobs_match_serial(self, ingested_env, tmp_path):
+        order_dir, _, _ = ingested_env
+        engine = create_engine(f"sqlite:///{tmp_path / 'parallel.db'}")
+        Base.metadata.create_all(bind=engine)
+        factory = sessionmaker(bind=engine)
+        IngestWatcher(order_dir, "test", factory, jobs=2)._do_reingest()
+
+        session = factory()
+        assert _dump(session) == _full_ingest_dump(tmp_path, order_dir)
+        session.close()
+
+
+@pytest.fixture
+def swap_env(tmp_path, order_dir):
+    """File-backed live DB whose watcher rebuilds via shadow file + rename."""
+    db_path = tmp_path / "live.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    watcher = IngestWatcher(order_dir, "test", factory, db_path=db_path)
+    return order_dir, db_path, factory, watcher
+
+
+class TestBuildAndSwap:
+    def test_rebuild_swaps_in_analyzed_db(self, swap_env, tmp_path):
+        order_dir, db_path, factory, watcher = swap_env
+        watcher._do_reingest()
+
+        assert not db_path.with_name("live.db.building").exists()
+        session = factory()
+        assert _dump(session) == _full_ingest_dump(tmp_path, order_dir)
+        assert session.execute(text("SELECT count(*) FROM sqlite_stat1")).scalar() > 0
+        session.close()
+
+    def test_rebuild_continues_live_generation(self, swap_env):
+        order_dir, db_path, factory, watcher = swap_env
+        session = factory()
+        set_generation(session, 5)
+        session.commit()
+        session.close()
+
+        watcher._do_reingest()
+
+        session = factory()
+        assert current_generation(session) == 6
+        session.close()
+
+    def test_open_reader_keeps_old_snapshot(self, swap_env):
+        order_dir, db_path, factory, watcher = swap_env
+        reader = factory()
+        assert reader.query(Step).count() == 0  # holds a connection to the old file
+
+        watcher._do_reingest()
+
+        assert reader.query(Step).count() == 0
+        reader.close()
+        fresh = factory()
+        assert fresh.query(Step).count() == 4
+        fresh.close()
+
+    def test_failed_rebuild_leaves_live_db(self, swap_env, monkeypatch):
+        order_dir, db_path, factory, watcher = swap_env
+        watcher._do_reingest()
+        before = db_path.stat().st_ino
+
+        (order_dir / "handoffs" / "step-2_HANDOFF.yml").unlink()  # forces a rebuild
+
+        def boom(*args, **kwargs):
+            raise RuntimeError("parse failed")
+
+        monkeypatch.setattr("backend.ingest._ingest", boom)
+        with pytest.raises(RuntimeError):
+            watcher._do_reingest()
+
+        assert db_path.stat().st_ino == before
+        assert not db_path.with_name("live.db.building").exists()
+        session = factory()
+        assert session.query(Handoff).count() == 2
+        session.close()
+
+    def test_wal_db_swapped_in_place(self, tmp_path, order_dir):
+        db_path = tmp_path / "wal.db"
+        engine = make_engine(db_path)
+        Base.metadata.create_all(bind=engine)
+        factory = sessionmaker(bind=engine)
+        watcher = IngestWatcher(order_dir, "test", factory, db_path=db_path)
+        before = db_path.stat().st_ino
+
+        reader = sqlite3.connect(db_path)
+        reader.execute("BEGIN")
+        assert reader.execute("SELECT count(*) FROM steps").fetchone()[0] == 0
+
+        watcher._do_reingest()
+
+        # Contents replaced inside the same file; the open read txn keeps its snapshot
+        assert db_path.stat().st_ino == before
+        assert not db_path.with_name("wal.db.building").exists()
+        assert reader.execute("SELECT count(*) FROM steps").fetchone()[0] == 0
+        reader.execute("COMMIT")
+        assert reader.execute("SELECT count(*) FROM steps").fetchone()[0] == 4
+        reader.close()
+
+        session = factory()
+        assert _dump(session) == _full_ingest_dump(tmp_path, order_dir)
+        assert session.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        session.close()
+        engine.dispose()
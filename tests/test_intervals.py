@@ -0,0 +1,70 @@
+"""Tests for backend.intervals."""
+
+import random
+
+from backend.intervals import IntervalIndex
+
+
+def _brute_first(intervals, t):
+    for s, e, payload in intervals:
+        if e is not None and s <= t <= e:
+            return payload
+    return None
+
+
+def _brute_last_started(intervals, t):
+    best = None
+    for s, _, payload in sorted(intervals, key=lambda iv: iv[0]):
+        if s <= t:
+            best = payload
+    return best
+
+
+def test_empty_index():
+    index = IntervalIndex([])
+    assert len(index) == 0
+    assert index.first_covering(5) is None
+    assert index.last_started(5) is None
+
+
+def test_closed_bounds():
+    index = IntervalIndex([(10, 20, "a")])
+    assert index.first_covering(9) is None
+    assert index.first_covering(10) == "a"
+    assert index.first_covering(15) == "a"
+    assert index.first_covering(20) == "a"
+    assert index.first_covering(21) is None
+
+
+def test_overlap_prefers_earlier_interval():
+    index = IntervalIndex([(10, 30, "first"), (0, 50, "second"), (20, 25, "third")])
+    assert index.first_covering(5) == "second"
+    assert index.first_covering(22) == "first"
+    assert index.first_covering(40) == "second"
+
+
+def test_open_ended_interval_only_counts_as_start():
+    index = IntervalIndex([(10, None, "open"), (0, 5, "closed")])
+    assert index.first_covering(12) is None
+    assert index.last_started(12) == "open"
+    assert index.last_started(7) == "closed"
+    assert index.last_started(-1) is None
+
+
+def test_last_started_ties_prefer_later_interval():
+    index = IntervalIndex([(10, 11, "a"), (10, 12, "b")])
+    assert index.last_started(10) == "b"
+
+
+def test_matches_brute_force():
+    rng = random.Random(3)
+    for _ in range(200):
+        intervals = []
+        for n in range(rng.randint(0, 12)):
+            s = rng.randint(0, 60)
+            e = rng.choice([None, s + rng.randint(-3, 20)])
+            intervals.append((s, e, n))
+        index = IntervalIndex(intervals)
+        for t in range(-2, 85):
+            assert index.first_covering(t) == _brute_first(intervals, t)
+            assert index.last_started(t) == _brute_last_started(intervals, t)
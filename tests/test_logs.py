@@ -1,9 +1,14 @@
 """Tests for backend.parser.logs."""
 
 import os
+import random
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 from backend.parser.logs import (
+    DispatchBlock,
+    LogTransition,
+    match_dispatches,
     parse_log_file,
     parse_log_line,
     parse_run_logs,
@@ -192,3 +197,69 @@ def test_parse_real_run_logs():
     for r in runs:
         assert r.started_at is not None
         assert r.log_file.startswith("order-run-")
+
+
+def test_parse_step_logs_parallel_matches_serial(order_dir):
+    serial = parse_step_logs(order_dir)
+    parallel = parse_step_logs(order_dir, jobs=2)
+    assert [s.step_number for s in parallel] == [1, 2, 3]
+    assert parallel == serial
+
+
+def test_parse_run_logs_parallel_matches_serial(order_dir):
+    serial = parse_run_logs(order_dir)
+    parallel = parse_run_logs(order_dir, jobs=2)
+    assert [r.log_file for r in parallel] == [r.log_file for r in serial]
+    assert parallel == serial
+
+
+def _scan_match(transitions, dispatches, tolerance=600):
+    """Reference implementation: first unmatched transition within tolerance."""
+    ordered = sorted(range(len(transitions)), key=lambda i: transitions[i].timestamp.replace(tzinfo=None))
+    matches = {}
+    for d in dispatches:
+        if d.duration_secs is None or not d.started_at:
+            continue
+        for i in ordered:
+            if i in matches:
+                continue
+            delta = d.started_at.replace(tzinfo=None) - transitions[i].timestamp.replace(tzinfo=None)
+            if abs(delta.total_seconds()) < tolerance:
+                matches[i] = d
+                break
+    return matches
+
+
+def test_match_dispatches_takes_earliest_within_tolerance():
+    base = datetime(2026, 2, 17, 8, 0, tzinfo=timezone(timedelta(hours=-8)))
+    transitions = [
+        LogTransition(timestamp=base, step_number=1, from_state=None, to_state="A"),
+        LogTransition(timestamp=base + timedelta(seconds=300), step_number=1, from_state="A", to_state="B"),
+        LogTransition(timestamp=base + timedelta(seconds=2000), step_number=1, from_state="B", to_state="C"),
+    ]
+    dispatches = [
+        DispatchBlock(skill="/a", duration_secs=1, started_at=base + timedelta(seconds=400)),
+        DispatchBlock(skill="/b", duration_secs=1, started_at=base + timedelta(seconds=400)),
+        DispatchBlock(skill="/c", duration_secs=1, started_at=base + timedelta(seconds=400)),
+        DispatchBlock(skill="/untimed", started_at=base + timedelta(seconds=2000)),
+        DispatchBlock(skill="/d", duration_secs=1, started_at=base + timedelta(seconds=2600)),
+    ]
+    matches = match_dispatches(transitions, dispatches)
+    assert {i: d.skill for i, d in matches.items()} == {0: "/a", 1: "/b"}
+
+
+def test_match_dispatches_agrees_with_linear_scan():
+    rng = random.Random(7)
+    base = datetime(2026, 2, 17, 8, 0)
+    for _ in range(50):
+        transitions = [
+            LogTransition(timestamp=base + timedelta(seconds=rng.randint(0, 5000)),
+                          step_number=1, from_state="A", to_state="A")
+            for _ in range(rng.randint(0, 40))
+        ]
+        dispatches = [
+            DispatchBlock(skill=f"/s{n}", duration_secs=rng.choice([None, 5.0]),
+                          started_at=base + timedelta(seconds=rng.randint(-700, 5700)))
+            for n in range(rng.randint(0, 40))
+        ]
+        assert match_dispatches(transitions, dispatches) == _scan_match(transitions, dispatches)
@@ -0,0 +1,84 @@
+"""Tests for backend.manifest."""
+
+import json
+import os
+
+from backend.manifest import (
+    diff_manifest,
+    load_step_numbers,
+    record_manifest,
+    scan_files,
+    snapshot_files,
+)
+from backend.models import IngestedFile
+
+
+def test_scan_files_tracks_parsed_inputs(order_dir):
+    (order_dir / "logs" / "notes.log").write_text("not an ORDER log")
+    states = scan_files(order_dir)
+    assert "history.jsonl" in states
+    assert "state.json" in states
+    assert "handoffs/step-1_HANDOFF.yml" in states
+    assert "logs/step-3-third-20260217T100000.log" in states
+    assert "logs/order-run-20260217T080000.log" in states
+    assert "logs/notes.log" not in states
+    assert all(s.content_hash is None for s in states.values())
+
+
+def test_scan_files_missing_dir(tmp_path):
+    assert scan_files(tmp_path) == {}
+
+
+def test_diff_against_empty_manifest_is_baseline(db, order_dir):
+    diff = diff_manifest(db, order_dir)
+    assert diff.baseline
+    assert diff.requires_rebuild
+    assert diff.dirty == set(diff.snapshot)
+
+
+def test_diff_unchanged_after_record(db, order_dir):
+    record_manifest(db, snapshot_files(order_dir))
+    db.commit()
+    diff = diff_manifest(db, order_dir)
+    assert not diff.baseline
+    assert not diff.dirty
+    assert not diff.deleted
+
+
+def test_diff_detects_append(db, order_dir):
+    record_manifest(db, snapshot_files(order_dir))
+    with open(order_dir / "history.jsonl", "a") as f:
+        f.write('{"from":"CREATE_SPEC","to":"REVIEW_SPEC","at":"2026-02-17T08:02:00-08:00"}\n')
+    diff = diff_manifest(db, order_dir)
+    assert diff.changed == ["history.jsonl"]
+    assert diff.added == []
+    assert not diff.requires_rebuild
+
+
+def test_diff_ignores_touch_with_same_content(db, order_dir):
+    record_manifest(db, snapshot_files(order_dir))
+    path = order_dir / "state.json"
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+    diff = diff_manifest(db, order_dir)
+    assert not diff.dirty
+
+
+def test_diff_detects_added_and_deleted(db, order_dir):
+    record_manifest(db, snapshot_files(order_dir))
+    (order_dir / "handoffs" / "step-3_HANDOFF.yml").write_text("step_completed: {}\n")
+    (order_dir / "history-prs.jsonl").unlink()
+    diff = diff_manifest(db, order_dir)
+    assert diff.added == ["handoffs/step-3_HANDOFF.yml"]
+    assert diff.deleted == ["history-prs.jsonl"]
+    assert diff.requires_rebuild
+
+
+def test_record_manifest_keeps_step_numbers(db, order_dir):
+    run_log = "logs/order-run-20260217T080000.log"
+    record_manifest(db, snapshot_files(order_dir), {run_log: [1, 2]})
+    record_manifest(db, snapshot_files(order_dir))
+    assert load_step_numbers(db) == {run_log: [1, 2]}
+    row = db.query(IngestedFile).filter(IngestedFile.path == run_log).one()
+    assert json.loads(row.step_numbers) == [1, 2]
+    assert row.size == (order_dir / run_log).stat().st_size
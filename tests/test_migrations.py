@@ -0,0 +1,195 @@
+"""Tests for the schema migration runner."""
+
+import hashlib
+import zlib
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from backend.database import Base, create_tables
+from backend.ingest import _dwell_times
+from backend.migrations import LATEST_VERSION, get_version, run_migrations
+
+import backend.models  # noqa: F401
+
+
+def _indexes(eng) -> set[tuple[str, str]]:
+    with eng.connect() as conn:
+        rows = conn.execute(
+            text("SELECT tbl_name, name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")
+        ).all()
+    return {(r[0], r[1]) for r in rows}
+
+
+# Tables that existed before migration 1
+LEGACY_TABLES = (
+    "runs", "steps", "transitions", "arbiter_events", "pull_requests", "handoffs",
+    "ingest_manifest",
+)
+
+
+# Columns added to, and removed from, legacy tables by later migrations
+LEGACY_MISSING_COLUMNS = {
+    "runs": ("generation",),
+    "steps": ("generation",),
+    "transitions": ("dispatch_content_length", "dispatch_content_hash", "generation"),
+}
+LEGACY_DROPPED_COLUMNS = {
+    "transitions": (("dispatch_content", "TEXT"),),
+}
+
+
+def _columns(eng, table: str) -> list[tuple]:
+    with eng.connect() as conn:
+        return sorted(
+            (r[1], r[2]) for r in conn.exec_driver_sql(f"PRAGMA table_info({table})")
+        )
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """A database created before the indexes were declared, with some data."""
+    eng = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    Base.metadata.create_all(
+        bind=eng, tables=[Base.metadata.tables[name] for name in LEGACY_TABLES]
+    )
+    with eng.begin() as conn:
+        for _, name in _indexes(eng):
+            conn.exec_driver_sql(f"DROP INDEX {name}")
+        for table, columns in LEGACY_MISSING_COLUMNS.items():
+            for column in columns:
+                conn.exec_driver_sql(f"ALTER TABLE {table} DROP COLUMN {column}")
+        for column, sql_type in LEGACY_DROPPED_COLUMNS["transitions"]:
+            conn.exec_driver_sql(f"ALTER TABLE transitions ADD COLUMN {column} {sql_type}")
+        conn.exec_driver_sql("INSERT INTO steps (step_number, status, tasks_total, tasks_completed) VALUES (7, 'completed', 0, 0)")
+    yield eng
+    eng.dispose()
+
+
+def test_migrations_add_indexes_to_existing_db(legacy_engine):
+    assert ("steps", "ix_steps_step_number") not in _indexes(legacy_engine)
+
+    Base.metadata.create_all(bind=legacy_engine)  # new tables, as create_tables() does
+    assert run_migrations(legacy_engine) == LATEST_VERSION
+    with legacy_engine.connect() as conn:
+        assert get_version(conn) == LATEST_VERSION
+        assert conn.execute(text("SELECT step_number FROM steps")).scalar() == 7
+
+    assert run_migrations(legacy_engine) == 0
+
+
+def test_migrated_schema_matches_fresh_schema(legacy_engine, tmp_path):
+    fresh = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    create_tables(fresh)
+    create_tables(legacy_engine)
+
+    assert _indexes(legacy_engine) == _indexes(fresh)
+    for table in LEGACY_TABLES:
+        assert _columns(legacy_engine, table) == _columns(fresh, table)
+    with fresh.connect() as conn:
+        assert get_version(conn) == LATEST_VERSION
+    fresh.dispose()
+
+
+@pytest.mark.parametrize(
+    "sql, index",
+    [
+        ("SELECT * FROM steps WHERE step_number = 3", "ix_steps_step_number"),
+        ("SELECT * FROM steps WHERE run_id = 1 AND step_number = 3", "ix_steps_run_id_step_number"),
+        ("SELECT * FROM transitions WHERE step_id = 1 ORDER BY timestamp", "ix_transitions_step_id_timestamp"),
+        (
+            "SELECT to_state, count(*) FROM transitions WHERE is_self_transition = 1 "
+            "AND to_state = 'MERGE_PRS'",
+            "ix_transitions_to_state_self",
+        ),
+        ("SELECT count(*) FROM arbiter_events WHERE step_id = 1", "ix_arbiter_events_step_id"),
+    ],
+)
+def test_hot_queries_use_indexes(tmp_path, sql, index):
+    eng = create_engine(f"sqlite:///{tmp_path / 'plan.db'}")
+    create_tables(eng)
+    with eng.connect() as conn:
+        plan = " ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+    eng.dispose()
+    assert index in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_backfill_transition_durations(legacy_engine):
+    ended_at = datetime(2026, 2, 17, 8, 10)
+    times = ["08:00:00", "08:04:30.250", "08:01:00.125", "08:04:30.250"]
+    with legacy_engine.begin() as conn:
+        conn.exec_driver_sql(
+            f"UPDATE steps SET ended_at = '{ended_at}.000000' WHERE step_number = 7"
+        )
+        for ts in times:
+            conn.exec_driver_sql(
+                "INSERT INTO transitions (step_id, timestamp, is_self_transition) "
+                f"VALUES (1, '2026-02-17 {ts}', 0)"
+            )
+        conn.exec_driver_sql(
+            "INSERT INTO transitions (step_id, timestamp, is_self_transition, duration_secs) "
+            "VALUES (NULL, '2026-02-17 09:00:00.000000', 0, NULL)"
+        )
+
+    create_tables(legacy_engine)
+
+    with legacy_engine.connect() as conn:
+        durations = conn.execute(
+            text("SELECT duration_secs FROM transitions ORDER BY id")
+        ).scalars().all()
+    # Ties keep log order: the first 08:04:30.25 lasts 0s, the second until ended_at
+    assert durations == [60.125, 0.0, 210.125, 329.75, None]
+    # Exactly what a fresh ingest stores for the same timestamps
+    stamps = [datetime.fromisoformat(f"2026-02-17 {ts}") for ts in times]
+    assert durations[:4] == _dwell_times(stamps, ended_at)
+
+
+def test_dispatch_content_moves_to_blobs(legacy_engine):
+    with legacy_engine.begin() as conn:
+        for content in ("héllo", None, "héllo", "other"):
+            conn.execute(
+                text("INSERT INTO transitions (dispatch_content, is_self_transition) VALUES (:c, 0)"),
+                {"c": content},
+            )
+
+    create_tables(legacy_engine)
+
+    hello = hashlib.sha256("héllo".encode()).hexdigest()
+    with legacy_engine.connect() as conn:
+        rows = conn.execute(
+            text("SELECT dispatch_content_length, dispatch_content_hash FROM transitions ORDER BY id")
+        ).all()
+        blobs = conn.execute(text("SELECT hash, size, data FROM dispatch_blobs")).all()
+    assert rows[:3] == [(6, hello), (None, None), (6, hello)]
+    assert {b.hash: (b.size, zlib.decompress(b.data).decode()) for b in blobs} == {
+        hello: (6, "héllo"),
+        rows[3][1]: (5, "other"),
+    }
+
+
+def test_deltas_start_after_migration(legacy_engine):
+    Base.metadata.create_all(bind=legacy_engine)
+    with legacy_engine.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO ingest_generation (id, generation, delta_floor) VALUES (1, 5, 0)")
+    run_migrations(legacy_engine)
+    with legacy_engine.connect() as conn:
+        # Rows written before the stamps existed can't be diffed
+        assert conn.exec_driver_sql("SELECT delta_floor FROM ingest_generation").scalar() == 5
+        assert conn.exec_driver_sql("SELECT generation FROM steps").scalar() == 0
+
+
+def test_every_database_gets_an_id(legacy_engine, tmp_path):
+    create_tables(legacy_engine)
+    other = create_engine(f"sqlite:///{tmp_path / 'other.db'}")
+    create_tables(other)
+    ids = []
+    for eng in (legacy_engine, other):
+        with eng.connect() as conn:
+            ids.append(conn.exec_driver_sql(
+                "SELECT database_id, generation FROM ingest_generation"
+            ).one())
+    other.dispose()
+    assert ids[0][1] == ids[1][1] == 0
+    assert len(ids[0][0]) == 16 and ids[0][0] != ids[1][0]
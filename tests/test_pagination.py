@@ -0,0 +1,79 @@
+"""Tests for backend.pagination."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.models import Run, Transition
+from backend.pagination import decode_cursor, encode_cursor, paginate, time_range
+
+START = datetime(2026, 3, 1, 9)
+
+
+def _walk(query, column, id_column, limit, descending):
+    """Every page of query, following cursors to the end."""
+    pages, cursor = [], None
+    while True:
+        rows, cursor = paginate(query, column, id_column, cursor, limit, descending)
+        pages.append([r.id for r in rows])
+        if cursor is None:
+            return pages
+
+
+@pytest.fixture
+def runs(db):
+    # Ties on started_at and a few runs without one
+    starts = [START, START, START + timedelta(hours=1), None, START - timedelta(days=1), None, START]
+    db.add_all(Run(project="p", started_at=s) for s in starts)
+    db.flush()
+    return db.query(Run).all()
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7, 10])
+def test_pages_match_full_ordering(db, runs, limit):
+    newest_first = sorted(
+        runs, key=lambda r: (r.started_at is not None, r.started_at or START, r.id), reverse=True
+    )
+    pages = _walk(db.query(Run), Run.started_at, Run.id, limit, descending=True)
+    assert [i for page in pages for i in page] == [r.id for r in newest_first]
+    assert all(len(page) == limit for page in pages[:-1])
+
+    oldest_first = list(reversed(newest_first))
+    pages = _walk(db.query(Run), Run.started_at, Run.id, limit, descending=False)
+    assert [i for page in pages for i in page] == [r.id for r in oldest_first]
+
+
+def test_exact_final_page_has_no_cursor(db, runs):
+    rows, cursor = paginate(db.query(Run), Run.started_at, Run.id, None, len(runs), True)
+    assert len(rows) == len(runs) and cursor is None
+
+
+def test_filters_apply_to_every_page(db):
+    db.add_all(
+        Transition(step_id=1, to_state=state, timestamp=START + timedelta(minutes=i))
+        for i, state in enumerate(["A", "B", "A", "A", "B", "A"])
+    )
+    db.flush()
+    query = db.query(Transition).filter(
+        Transition.to_state == "A", *time_range(Transition.timestamp, START, START + timedelta(minutes=5))
+    )
+    pages = _walk(query, Transition.timestamp, Transition.id, 2, descending=False)
+    assert pages == [[1, 3], [4]]
+
+
+def test_time_range_is_half_open_wall_clock(db, runs):
+    aware = START.replace(tzinfo=timezone(timedelta(hours=-8)))
+    query = db.query(Run).filter(*time_range(Run.started_at, aware, START + timedelta(hours=1)))
+    assert sorted(r.id for r in query) == [1, 2, 7]
+    assert time_range(Run.started_at, None, None) == []
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(START, 12)) == (START, 12)
+    assert decode_cursor(encode_cursor(None, 3)) == (None, 3)
+
+
+@pytest.mark.parametrize("cursor", ["!!", "bm90IGpzb24", encode_cursor(START, 1)[:-3], "WzEsMl0"])
+def test_malformed_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -0,0 +1,71 @@
+"""Tests for backend.response_cache."""
+
+from backend.response_cache import ResponseCache
+
+
+def _builder(body: bytes, calls: list):
+    def build(session):
+        calls.append(session)
+        return body
+    return build
+
+
+def test_hit_only_for_same_generation():
+    cache = ResponseCache(max_bytes=100)
+    calls = []
+    build = _builder(b"abc", calls)
+    assert cache.get("k", 1, build, "db") == b"abc"
+    assert cache.get("k", 1, build, "db") == b"abc"
+    assert len(calls) == 1
+    cache.get("k", 2, build, "db")
+    assert len(calls) == 2
+    assert len(cache) == 1 and cache.size == 3
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = ResponseCache(max_bytes=10)
+    for key in "abc":
+        cache.get(key, 1, _builder(b"1234", []), None)
+    # c pushed the total to 12 bytes, so a (least recently used) went
+    assert len(cache) == 2 and cache.size == 8
+    calls = []
+    cache.get("b", 1, _builder(b"1234", calls), None)
+    cache.get("d", 1, _builder(b"1234", []), None)
+    cache.get("b", 1, _builder(b"1234", calls), None)
+    assert calls == []  # b was touched, so c was evicted for d
+
+
+def test_oversized_body_is_not_stored():
+    cache = ResponseCache(max_bytes=4)
+    assert cache.get("k", 1, _builder(b"12345", []), None) == b"12345"
+    assert len(cache) == 0 and cache.size == 0
+
+
+def test_invalidate_then_warm_for_new_generation():
+    cache = ResponseCache(max_bytes=100)
+    calls = []
+    cache.get("a", 1, _builder(b"A", calls), "old")
+    cache.get("b", 1, _builder(b"B", calls), "old")
+    recipes = cache.invalidate()
+    assert [key for key, _ in recipes] == ["a", "b"]
+    assert len(cache) == 0 and cache.size == 0
+
+    cache.warm(recipes, "new", 2)
+    assert calls == ["old", "old", "new", "new"]
+    assert cache.get("a", 2, _builder(b"X", calls), "new") == b"A"
+
+
+def test_older_generation_does_not_replace_newer():
+    cache = ResponseCache(max_bytes=100)
+    cache.get("k", 2, _builder(b"new", []), None)
+    cache._store("k", 1, b"old", _builder(b"old", []))
+    assert cache.get("k", 2, _builder(b"rebuilt", []), None) == b"new"
+
+
+def test_failed_warm_skips_entry():
+    def boom(session):
+        raise RuntimeError("query failed")
+
+    cache = ResponseCache(max_bytes=100)
+    cache.warm([("bad", boom), ("good", _builder(b"ok", []))], None, 1)
+    assert len(cache) == 1
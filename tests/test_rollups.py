@@ -0,0 +1,171 @@
+"""Tests for the hourly/daily rollups and the trend endpoints built on them."""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import stats_service
+from backend.database import Base
+from backend.ingest import _ingest
+from backend.main import app, get_db
+from backend.models import ArbiterEvent, PullRequest, StateRollup, Step, StepRollup, Transition
+from backend.rollups import refresh_rollups, rollups_built, touched_days
+
+import backend.models  # noqa: F401
+
+DAY = datetime(2026, 3, 1)
+
+
+def _seed(db) -> None:
+    """Three steps over two days, with transitions, arbiter events and PRs."""
+    for i, (start, secs, status) in enumerate([
+        (DAY + timedelta(hours=9), 600, "completed"),
+        (DAY + timedelta(hours=9, minutes=30), 1200, "failed"),
+        (DAY + timedelta(days=1, hours=14), None, "halted"),
+    ]):
+        step = Step(
+            step_number=i + 1, status=status, started_at=start,
+            ended_at=start + timedelta(seconds=secs) if secs else None,
+        )
+        db.add(step)
+        db.flush()
+        db.add(Transition(step_id=step.id, to_state="CREATE_SPEC", timestamp=start,
+                          duration_secs=60.0 * (i + 1), is_self_transition=False))
+        db.add(Transition(step_id=step.id, to_state="CREATE_SPEC", timestamp=start,
+                          duration_secs=999.0, is_self_transition=True))
+        db.add(ArbiterEvent(step_id=step.id, verdict="FIXED"))
+        db.add(PullRequest(step_id=step.id, pr_number=100 + i, status="merged",
+                           merged_at=start + timedelta(minutes=5)))
+    db.flush()
+
+
+def _dump(db) -> list:
+    steps = [
+        (r.grain, r.bucket_start, r.steps, r.completed, r.failed, r.halted,
+         r.duration_count, r.duration_sum_secs, r.arbiter_attempts, r.prs_merged)
+        for r in db.query(StepRollup).order_by(StepRollup.grain, StepRollup.bucket_start)
+    ]
+    states = [
+        (r.grain, r.bucket_start, r.to_state, r.count, r.total_secs, r.sketch)
+        for r in db.query(StateRollup).order_by(
+            StateRollup.grain, StateRollup.bucket_start, StateRollup.to_state
+        )
+    ]
+    return steps + states
+
+
+def test_refresh_buckets_by_hour_and_day(db):
+    _seed(db)
+    assert not rollups_built(db)
+    refresh_rollups(db)
+    assert rollups_built(db)
+
+    trend = stats_service.get_trend(db, bucket="hour")
+    assert [(b["bucket_start"], b["steps"]) for b in trend] == [
+        (DAY + timedelta(hours=9), 2),
+        (DAY + timedelta(days=1, hours=14), 1),
+    ]
+    assert trend[0] == {
+        "bucket_start": DAY + timedelta(hours=9),
+        "steps": 2, "completed": 1, "failed": 1, "halted": 0,
+        "avg_step_duration_secs": 900.0,
+        "arbiter_attempts": 2, "prs_merged": 2,
+    }
+    assert trend[1]["avg_step_duration_secs"] is None
+
+    daily = stats_service.get_trend(db)
+    assert [(b["bucket_start"], b["steps"], b["halted"]) for b in daily] == [
+        (DAY, 2, 0),
+        (DAY + timedelta(days=1), 1, 1),
+    ]
+
+
+def test_state_trend_excludes_self_transitions(db):
+    _seed(db)
+    refresh_rollups(db)
+    assert stats_service.get_state_trend(db) == [
+        {"bucket_start": DAY, "state": "CREATE_SPEC", "count": 2,
+         "avg": 90.0, "p50": pytest.approx(60.0, rel=0.01), "p95": pytest.approx(60.0, rel=0.01)},
+        {"bucket_start": DAY + timedelta(days=1), "state": "CREATE_SPEC", "count": 1,
+         "avg": 180.0, "p50": 180.0, "p95": 180.0},
+    ]
+
+
+def test_range_is_half_open(db):
+    _seed(db)
+    refresh_rollups(db)
+    until = DAY + timedelta(days=1)
+    assert [b["bucket_start"] for b in stats_service.get_trend(db, DAY, until)] == [DAY]
+    assert stats_service.get_trend(db, until, bucket="hour")[0]["steps"] == 1
+
+
+def test_touched_days(db):
+    _seed(db)
+    ids = [s.id for s in db.query(Step).order_by(Step.step_number)]
+    assert touched_days(db, ids[:1]) == {date(2026, 3, 1)}
+    assert touched_days(db, []) == set()
+    assert touched_days(db, [], unlinked=True) == {date(2026, 3, 1), date(2026, 3, 2)}
+
+
+def test_partial_refresh_matches_full_rebuild(db):
+    _seed(db)
+    refresh_rollups(db)
+
+    step = db.query(Step).filter_by(step_number=3).one()
+    step.status = "completed"
+    step.ended_at = step.started_at + timedelta(seconds=30)
+    db.add(Step(step_number=4, status="completed", started_at=DAY + timedelta(days=1, hours=15)))
+    db.flush()
+    refresh_rollups(db, touched_days(db, [step.id]))
+    partial = _dump(db)
+
+    refresh_rollups(db)
+    assert _dump(db) == partial
+
+
+def test_ingest_builds_rollups(db, order_dir):
+    _ingest(db, order_dir, "proj")
+    hours = stats_service.get_trend(db, bucket="hour")
+    assert [(b["bucket_start"].hour, b["steps"]) for b in hours] == [(8, 2), (10, 1)]
+    assert sum(b["prs_merged"] for b in hours) == 2
+
+
+@pytest.fixture
+def client(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'rollups.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    TestSession = sessionmaker(bind=engine)
+    session = TestSession()
+    _seed(session)
+    refresh_rollups(session)
+    session.commit()
+    session.close()
+
+    def override_get_db():
+        db = TestSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_trend_endpoints(client):
+    resp = client.get("/api/stats/trend", params={
+        "since": "2026-03-01T00:00:00Z", "until": "2026-03-02T00:00:00Z", "bucket": "hour",
+    })
+    assert resp.status_code == 200
+    assert [b["bucket_start"] for b in resp.json()] == ["2026-03-01T09:00:00"]
+
+    resp = client.get("/api/stats/state-trend")
+    assert [(b["state"], b["count"]) for b in resp.json()] == [("CREATE_SPEC", 2), ("CREATE_SPEC", 1)]
+
+    assert client.get("/api/stats/trend", params={"bucket": "week"}).status_code == 422
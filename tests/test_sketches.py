@@ -0,0 +1,197 @@
+"""Tests for the mergeable quantile sketches."""
+
+import math
+import random
+
+import pytest
+
+from backend import stats_service
+from backend.ingest import _ingest
+from backend.models import QuantileSketch, Run, Step, Transition
+from backend.sketches import RELATIVE_ACCURACY, DDSketch, ProjectSketches
+from backend.stats_service import PERCENTILES, _percentile
+
+ALPHA = RELATIVE_ACCURACY
+EPS = 1e-9
+
+
+def _sketch(values) -> DDSketch:
+    sketch = DDSketch()
+    for v in values:
+        sketch.add(v)
+    return sketch
+
+
+def _assert_within_bound(sketch: DDSketch, values: list[float]) -> None:
+    values = sorted(values)
+    for pct in PERCENTILES:
+        k = (len(values) - 1) * pct / 100.0
+        lo, hi = values[math.floor(k)], values[math.ceil(k)]
+        est = sketch.quantile(pct)
+        assert lo * (1 - ALPHA) - EPS <= est <= hi * (1 + ALPHA) + EPS
+        if lo == hi:
+            assert est == pytest.approx(_percentile(values, pct), rel=ALPHA, abs=EPS)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_quantiles_within_documented_bound(seed):
+    rng = random.Random(seed)
+    n = rng.choice([1, 2, 7, 100, 5000])
+    values = [rng.lognormvariate(4, 1.5) for _ in range(n)]
+    values += [0.0] * rng.randint(0, 3)
+    _assert_within_bound(_sketch(values), values)
+
+
+def test_empty_sketch():
+    sketch = DDSketch()
+    assert sketch.quantile(50) is None
+    assert sketch.mean is None
+
+
+def test_merge_equals_sketch_of_union():
+    rng = random.Random(3)
+    a = [rng.uniform(1, 900) for _ in range(300)]
+    b = [rng.uniform(50, 5000) for _ in range(200)]
+
+    merged = _sketch(a)
+    merged.merge(_sketch(b))
+    union = _sketch(a + b)
+
+    assert merged.bins == union.bins
+    assert merged.count == union.count == 500
+    for pct in PERCENTILES:
+        assert merged.quantile(pct) == union.quantile(pct)
+
+
+def test_merge_rejects_mismatched_accuracy():
+    with pytest.raises(ValueError):
+        DDSketch(0.01).merge(DDSketch(0.02))
+
+
+def test_remove_undoes_add():
+    keep = [10.0, 20.0, 30.0]
+    sketch = _sketch(keep + [500.0, 0.0])
+    sketch.add(500.0, -1)
+    sketch.add(0.0, -1)
+    assert sketch.bins == _sketch(keep).bins
+    assert sketch.zero == 0
+    assert sketch.mean == pytest.approx(20.0)
+
+    for v in keep:
+        sketch.add(v, -1)
+    assert sketch.count == 0 and not sketch.bins
+
+
+def test_json_round_trip():
+    sketch = _sketch([0.0, 1.5, 80.0, 80.0, 4000.0])
+    clone = DDSketch.from_json(sketch.to_json())
+    assert clone.to_json() == sketch.to_json()
+    assert clone.quantile(95) == sketch.quantile(95)
+
+
+def _seed_transitions(db, rng, project_steps: int = 40) -> dict[str, list[float]]:
+    values: dict[str, list[float]] = {"EXECUTE_TASKS": [], "/work": []}
+    for sn in range(project_steps):
+        step = Step(step_number=sn, status="completed")
+        db.add(step)
+        db.flush()
+        for _ in range(10):
+            d = rng.uniform(5, 3000)
+            dispatch = rng.uniform(1, 600)
+            db.add(Transition(
+                step_id=step.id, to_state="EXECUTE_TASKS", duration_secs=d,
+                is_self_transition=False, dispatch_skill="/work",
+                dispatch_duration_secs=dispatch,
+            ))
+            values["EXECUTE_TASKS"].append(d)
+            values["/work"].append(dispatch)
+        db.add(Transition(step_id=step.id, to_state="EXECUTE_TASKS", duration_secs=1e6,
+                          is_self_transition=True))
+    db.flush()
+    return values
+
+
+def test_endpoints_answer_from_sketches(db):
+    values = _seed_transitions(db, random.Random(5))
+    sketches = ProjectSketches(db, "p")
+    sketches.add_transitions()
+    sketches.save()
+    db.commit()
+    assert db.query(QuantileSketch).count() == 2
+
+    states = stats_service.get_state_durations(db)
+    skills = stats_service.get_skill_latency(db)
+
+    assert skills["/work"]["count"] == 400
+    for result, raw in ((states["EXECUTE_TASKS"], values["EXECUTE_TASKS"]),
+                        (skills["/work"], values["/work"])):
+        ordered = sorted(raw)
+        assert result["avg"] == pytest.approx(sum(raw) / len(raw), abs=0.06)
+        for pct in PERCENTILES:
+            k = (len(ordered) - 1) * pct / 100.0
+            lo, hi = ordered[math.floor(k)], ordered[math.ceil(k)]
+            assert lo * (1 - ALPHA) - 0.05 <= result[f"p{pct}"] <= hi * (1 + ALPHA) + 0.05
+
+
+def test_skill_latency_exact_without_sketches(db):
+    values = _seed_transitions(db, random.Random(8), project_steps=3)
+    db.commit()
+
+    result = stats_service.get_skill_latency(db)["/work"]
+    ordered = sorted(values["/work"])
+    assert result["count"] == 30
+    for pct in PERCENTILES:
+        assert result[f"p{pct}"] == round(_percentile(ordered, pct), 1)
+
+
+def test_full_ingest_builds_sketches(db, order_dir):
+    _ingest(db, order_dir, "proj")
+    sketch = db.query(QuantileSketch).filter_by(kind="skill", key="/create-spec").one()
+    assert sketch.project == "proj"
+    assert sketch.count == 3
+    assert stats_service.get_skill_latency(db, project="proj")["/create-spec"]["p50"] == 60.0
+    assert stats_service.get_skill_latency(db, project="other") == {}
+
+
+
+def test_project_stats_match_exact_fallback(db):
+    rng = random.Random(11)
+    proj = Run(project="proj")
+    db.add(proj)
+    db.flush()
+    # In a run, outside any run (before the first run log) and without a step
+    steps = [Step(step_number=1, run_id=proj.id), Step(step_number=2), None]
+    db.add_all([s for s in steps if s is not None])
+    db.flush()
+    for step in steps:
+        for _ in range(15):
+            db.add(Transition(
+                step_id=step and step.id, to_state="EXECUTE_TASKS",
+                duration_secs=rng.uniform(5, 3000), is_self_transition=False,
+                dispatch_skill="/work", dispatch_duration_secs=rng.uniform(1, 600),
+            ))
+    db.flush()
+    sketches = ProjectSketches(db, "proj")
+    sketches.add_transitions()
+    sketches.save()
+
+    def stats():
+        return [
+            (stats_service.get_state_durations(db, project=p),
+             stats_service.get_skill_latency(db, project=p))
+            for p in ("proj", "other")
+        ]
+
+    with_sketches = stats()
+    db.query(QuantileSketch).delete()
+    exact = stats()
+
+    assert exact[0][1]["/work"]["count"] == 45
+    assert exact[1][1] == {}
+    # Same transitions either way: sketch means and counts are exact
+    for sketched, computed in zip(with_sketches, exact):
+        for sketched_by_key, computed_by_key in zip(sketched, computed):
+            assert sketched_by_key.keys() == computed_by_key.keys()
+            for key, values in computed_by_key.items():
+                assert sketched_by_key[key].get("count") == values.get("count")
+                assert sketched_by_key[key]["avg"] == pytest.approx(values["avg"], abs=0.05)
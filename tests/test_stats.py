@@ -1,14 +1,21 @@
 """Tests for the PEACE stats API endpoints."""
 
+import asyncio
+import random
+from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, event
 from sqlalchemy.orm import sessionmaker
 
+from backend import stats_service
 from backend.database import Base
-from backend.main import app, get_db
+from backend.event_stream import broadcaster
+from backend.generation import bump_generation
+from backend.ingest import IngestChanges
+from backend.main import _on_ingest_commit, app, get_db, stats_cache
 from backend.models import ArbiterEvent, PullRequest, Run, Step, Transition
 
 import backend.models  # noqa: F401
@@ -220,6 +227,103 @@ def test_stats_overview_self_transitions(stats_client):
     assert data["total_self_transitions"] == 1
 
 
+def test_stats_overview_is_one_statement(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'count.db'}")
+    Base.metadata.create_all(bind=engine)
+    statements = []
+    event.listen(
+        engine, "before_cursor_execute",
+        lambda conn, cursor, stmt, *args: statements.append(stmt),
+    )
+    session = sessionmaker(bind=engine)()
+
+    overview = stats_service.get_overview(session)
+    session.close()
+
+    assert len(statements) == 1
+    assert overview["total_steps"] == 0
+    assert overview["pass_rate"] == 0.0
+    assert overview["avg_step_duration_secs"] is None
+    assert overview["avg_dispatch_duration_secs"] is None
+
+
+def _statement_count(fn):
+    statements = []
+
+    def record(conn, cursor, stmt, *args):
+        statements.append(stmt)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        result = fn()
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+    return result, len(statements)
+
+
+def test_stats_served_from_cache_until_ingest(stats_client, monkeypatch):
+    first = stats_client.get("/api/stats/overview")
+    again, n = _statement_count(lambda: stats_client.get("/api/stats/overview"))
+    assert n == 1  # the generation; the body comes from the cache
+    assert again.content == first.content
+    assert again.headers["ETag"] == first.headers["ETag"]
+    assert again.headers["content-type"] == "application/json"
+
+    # An ingest commit bumps the generation, then rebuilds what was cached
+    sessions = app.dependency_overrides[get_db]
+    db = next(sessions())
+    db.add(Step(step_number=50, status="completed"))
+    generation = bump_generation(db)
+    db.commit()
+    db.close()
+    monkeypatch.setattr("backend.main.ReadSessionLocal", lambda: next(sessions()))
+    _on_ingest_commit(IngestChanges(generation, set(), {50}))
+    assert len(stats_cache) == 1
+
+    resp, n = _statement_count(lambda: stats_client.get("/api/stats/overview"))
+    assert n == 1
+    assert resp.json()["total_steps"] == first.json()["total_steps"] + 1
+
+
+def test_ingest_commit_notifies_after_warming(stats_client, monkeypatch):
+    stats_client.get("/api/stats/overview")
+    sessions = app.dependency_overrides[get_db]
+    monkeypatch.setattr("backend.main.ReadSessionLocal", lambda: next(sessions()))
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        monkeypatch.setattr("backend.main._loop", loop)
+        queue = broadcaster.subscribe(event_types=["data_changed"])
+        try:
+            # Called from the ingest worker thread, published on the loop
+            await loop.run_in_executor(None, _on_ingest_commit, IngestChanges(7, {1}, {2, 3}))
+            return await asyncio.wait_for(queue.get(), timeout=1)
+        finally:
+            broadcaster.unsubscribe(queue)
+
+    event = asyncio.run(run())
+    assert event == {
+        "type": "data_changed", "generation": 7, "runs": [1], "steps": [2, 3], "stats": True,
+    }
+    assert len(stats_cache) == 1
+
+
+def test_stats_cache_keys_on_arguments(stats_client):
+    assert len(stats_client.get("/api/stats/recent-failures").json()) > 0
+    assert stats_client.get("/api/stats/recent-failures", params={"offset": 50}).json() == []
+    assert len(stats_client.get("/api/stats/recent-failures", params={"limit": 20}).json()) > 0
+    assert len(stats_cache) == 2
+
+
+def test_stats_totals_match_overview(stats_client):
+    totals = stats_client.get("/api/stats").json()
+    overview = stats_client.get("/api/stats/overview").json()
+    assert totals["total_steps"] == overview["total_steps"] == 3
+    assert totals["failed"] == overview["failed"] == 1
+    assert totals["total_self_transitions"] == overview["total_self_transitions"]
+    assert totals["total_arbiter_events"] == overview["total_arbiter_interventions"] == 3
+
+
 # --- /api/stats/duration-trend ---
 
 
@@ -241,6 +345,12 @@ def test_duration_trend_values(stats_client):
     assert data[2]["status"] == "halted"
 
 
+def test_duration_trend_params(stats_client):
+    data = stats_client.get("/api/stats/duration-trend", params={"from_step": 2}).json()
+    assert [d["step"] for d in data] == [2, 3]
+    assert stats_client.get("/api/stats/duration-trend", params={"max_points": 2}).status_code == 422
+
+
 # --- /api/stats/state-durations ---
 
 
@@ -273,6 +383,39 @@ def test_state_durations_excludes_self_transitions(stats_client):
     assert data["CREATE_SPEC"]["avg"] == pytest.approx(190.0, abs=0.5)
 
 
+def test_state_durations_match_python_percentiles(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pct.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    rng = random.Random(11)
+
+    expected: dict[str, list[float]] = defaultdict(list)
+    sizes = {"CREATE_SPEC": 1, "REVIEW_SPEC": 2, "PLAN_WORK": 21, "EXECUTE_TASKS": 400}
+    for state, n in sizes.items():
+        for _ in range(n):
+            value = float(rng.choice([30, 60, 90])) if rng.random() < 0.3 else rng.uniform(1, 5000)
+            is_self = rng.random() < 0.2
+            session.add(Transition(to_state=state, duration_secs=value, is_self_transition=is_self))
+            if not is_self:
+                expected[state].append(value)
+    session.add(Transition(to_state="UNTRACKED", duration_secs=5.0))
+    session.add(Transition(to_state="MERGE_PRS", duration_secs=None))
+    session.commit()
+
+    result = stats_service.get_state_durations(session)
+    session.close()
+
+    assert set(result) == set(stats_service.TARGET_STATES)
+    for state in stats_service.TARGET_STATES:
+        values = sorted(expected.get(state, []))
+        if not values:
+            assert result[state] == {"avg": 0.0, "p50": 0.0, "p90": 0.0, "p95": 0.0, "p99": 0.0}
+            continue
+        assert result[state]["p50"] == round(stats_service._percentile(values, 50), 1)
+        assert result[state]["p95"] == round(stats_service._percentile(values, 95), 1)
+        assert result[state]["avg"] == pytest.approx(sum(values) / len(values), abs=0.051)
+
+
 # --- /api/stats/failure-breakdown ---
 
 
@@ -316,3 +459,69 @@ def test_recent_failures_excludes_completed(stats_client):
     for item in data:
         assert item["step"] != 1  # Step 1 is completed
         assert item["step"] != 2  # Step 2 is completed
+
+
+def test_recent_failures_pages_in_one_statement_each(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'failures.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    base = datetime(2026, 2, 1)
+    for i in range(25):
+        step = Step(step_number=i + 1, status="failed" if i % 2 else "halted",
+                    ended_at=base + timedelta(hours=i))
+        session.add(step)
+        session.flush()
+        for _ in range(i % 4):
+            session.add(ArbiterEvent(step_id=step.id, verdict="CI_FAILED"))
+    session.add(Step(step_number=99, status="completed", ended_at=base + timedelta(days=9)))
+    session.commit()
+
+    statements = []
+    event.listen(
+        engine, "before_cursor_execute",
+        lambda conn, cursor, stmt, *args: statements.append(stmt),
+    )
+    first = stats_service.get_recent_failures(session, limit=10)
+    rest = stats_service.get_recent_failures(session, limit=20, offset=10)
+    session.close()
+
+    assert len(statements) == 2
+    steps = [f["step"] for f in first + rest]
+    assert steps == list(range(25, 0, -1))
+    assert [f["arbiter_attempts"] for f in first[:4]] == [0, 3, 2, 1]
+
+
+def test_recent_failures_params(stats_client):
+    assert stats_client.get("/api/stats/recent-failures", params={"offset": 1}).json() == []
+    assert stats_client.get("/api/stats/recent-failures", params={"limit": 0}).status_code == 422
+
+
+# --- /api/dashboard ---
+
+
+def test_dashboard_matches_panel_endpoints(stats_client):
+    data = stats_client.get("/api/dashboard", params={"max_points": 10}).json()
+    assert data == {
+        "overview": stats_client.get("/api/stats/overview").json(),
+        "duration_trend": stats_client.get(
+            "/api/stats/duration-trend", params={"max_points": 10}
+        ).json(),
+        "state_durations": stats_client.get("/api/stats/state-durations").json(),
+        "failure_breakdown": stats_client.get("/api/stats/failure-breakdown").json(),
+        "recent_failures": stats_client.get("/api/stats/recent-failures").json(),
+    }
+
+
+def test_dashboard_panels_param(stats_client):
+    resp = stats_client.get("/api/dashboard", params={"panels": "recent_failures, overview"})
+    data = resp.json()
+    assert data["overview"]["total_steps"] == 3
+    assert len(data["recent_failures"]) == 1
+    assert data["duration_trend"] is data["state_durations"] is data["failure_breakdown"] is None
+    # Same selection in another order is the same cache entry
+    stats_client.get("/api/dashboard", params={"panels": "overview,recent_failures"})
+    assert len(stats_cache) == 1
+
+    resp = stats_client.get("/api/dashboard", params={"panels": "overview,bogus"})
+    assert resp.status_code == 422
+    assert "bogus" in resp.json()["detail"]
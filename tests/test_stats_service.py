@@ -1,11 +1,22 @@
 """Unit tests for the stats service layer."""
 
+import random
+from datetime import datetime, timedelta
+
 import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
 
-from backend.models import Step, Transition
+from backend.database import Base, make_engine
+from backend.models import ArbiterEvent, PullRequest, Step, Transition
 from backend.stats_service import (
+    DASHBOARD_PANELS,
     _percentile,
+    get_dashboard,
+    get_duration_trend,
+    get_failure_breakdown,
     get_overview,
+    get_recent_failures,
     get_state_durations,
 )
 
@@ -58,7 +69,7 @@ def test_get_state_durations_no_transitions(db):
         "HANDOFF",
     ]:
         assert state in result
-        assert result[state] == {"avg": 0.0, "p50": 0.0, "p95": 0.0}
+        assert result[state] == {"avg": 0.0, "p50": 0.0, "p90": 0.0, "p95": 0.0, "p99": 0.0}
 
 
 def test_get_state_durations_with_data(db):
@@ -97,3 +108,123 @@ def test_get_state_durations_with_data(db):
     # Self-transition should be excluded
     assert result["CREATE_SPEC"]["avg"] == 100.0
     assert result["REVIEW_SPEC"]["avg"] == 80.0
+
+
+def _seed_steps(db, n: int) -> None:
+    base = datetime(2026, 1, 1)
+    for i in range(n):
+        start = base + timedelta(hours=i)
+        db.add(Step(
+            step_number=i + 1,
+            status="failed" if i % 97 == 13 else "completed",
+            started_at=start,
+            ended_at=start + timedelta(seconds=600 + (i * 37) % 900),
+        ))
+    db.add(Step(step_number=n + 1, status="halted"))
+    db.flush()
+
+
+def test_duration_trend_downsamples_keeping_failures(db):
+    _seed_steps(db, 2000)
+    full = get_duration_trend(db)
+    assert len(full) == 2001
+
+    points = get_duration_trend(db, max_points=100)
+    assert len(points) == 100
+    failures = [p["step"] for p in full if p["status"] in ("failed", "halted")]
+    assert [p["step"] for p in points if p["status"] != "completed"] == failures
+    assert points[0] == full[0]
+    assert [p["step"] for p in points] == sorted(p["step"] for p in points)
+
+
+def test_duration_trend_ranges(db):
+    _seed_steps(db, 50)
+    by_step = get_duration_trend(db, from_step=10, to_step=12)
+    assert [p["step"] for p in by_step] == [10, 11, 12]
+
+    by_time = get_duration_trend(
+        db, since=datetime(2026, 1, 1, 3), until=datetime(2026, 1, 1, 5)
+    )
+    assert [p["step"] for p in by_time] == [4, 5]
+
+
+def _seed_random(db, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    base = datetime(2026, 2, 1)
+    step_ids = []
+    for i in range(60):
+        start = base + timedelta(minutes=rng.randrange(0, 5000)) if rng.random() < 0.9 else None
+        ended = start + timedelta(seconds=rng.randrange(30, 3000)) if start and rng.random() < 0.8 else None
+        step = Step(
+            step_number=rng.randrange(1, 40), title=f"Step {i}",
+            status=rng.choice(["completed", "completed", "failed", "halted", None]),
+            final_state=rng.choice(["MERGE_PRS", "EXECUTE_TASKS", None]),
+            final_verdict=rng.choice(["MERGE_BLOCKED", "TASKS_FAILED", None]),
+            started_at=start, ended_at=ended,
+        )
+        db.add(step)
+        db.flush()
+        step_ids.append(step.id)
+    for _ in range(200):
+        db.add(Transition(
+            step_id=rng.choice(step_ids),
+            to_state=rng.choice(["CREATE_SPEC", "REVIEW_SPEC", "MERGE_PRS", None]),
+            is_self_transition=rng.random() < 0.3,
+            duration_secs=rng.uniform(1, 500),
+            dispatch_duration_secs=rng.choice([None, rng.uniform(1, 300)]),
+        ))
+    for _ in range(40):
+        db.add(ArbiterEvent(
+            step_id=rng.choice(step_ids + [None]),
+            verdict=rng.choice(["FIXED", "CI_FAILED", "HANDOFF_WRITTEN.", None]),
+        ))
+    for n in range(30):
+        db.add(PullRequest(pr_number=n % 20, status=rng.choice(["merged", "open"])))
+    db.flush()
+
+
+def test_dashboard_matches_individual_stats(db):
+    _seed_random(db)
+    assert get_dashboard(db, max_points=25) == {
+        "overview": get_overview(db),
+        "duration_trend": get_duration_trend(db, 25),
+        "state_durations": get_state_durations(db),
+        "failure_breakdown": get_failure_breakdown(db),
+        "recent_failures": get_recent_failures(db),
+    }
+
+
+def test_dashboard_shares_grouped_scans(db):
+    _seed_random(db)
+    statements = []
+    event.listen(db.bind, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    get_dashboard(db, ["overview", "failure_breakdown"])
+    # One grouped pass over steps, one over transitions, one for events and PRs
+    assert len(statements) == 3
+    assert all("GROUP BY" in sql for sql in statements[:2])
+
+
+def test_dashboard_panel_selection(db):
+    _seed_random(db)
+    result = get_dashboard(db, ["recent_failures"])
+    assert list(result) == list(DASHBOARD_PANELS)
+    assert result["recent_failures"] == get_recent_failures(db)
+    assert all(result[p] is None for p in DASHBOARD_PANELS if p != "recent_failures")
+
+
+def test_dashboard_reads_one_snapshot(tmp_path):
+    engine = make_engine(tmp_path / "wal.db")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    reader, writer = Session(), Session()
+    writer.add(Step(step_number=1, status="completed"))
+    writer.commit()
+
+    assert get_dashboard(reader, ["overview"])["overview"]["total_steps"] == 1
+    # A commit landing mid-dashboard is not seen by the rest of it
+    writer.add(Step(step_number=2, status="failed", ended_at=datetime(2026, 2, 1)))
+    writer.commit()
+    assert get_dashboard(reader, ["recent_failures"])["recent_failures"] == []
+    reader.close()
+    assert get_dashboard(Session(), ["recent_failures"])["recent_failures"][0]["step"] == 2
+    writer.close()